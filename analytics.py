@@ -0,0 +1,352 @@
+# analytics.py - Success rates and failure clusters over application_log.csv, as incrementally updated aggregates
+import csv, datetime, hashlib, logging, math, os, re, sqlite3, threading
+from dedup import normalize_posting
+from log_stats import csv_record_batches
+from logger import LOG_FILE
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_FILE = 'analytics.db'
+DIMENSIONS = ('company', 'keyword', 'hour', 'portal')
+STATUSES = ('success', 'failed', 'manual_required', 'partial')
+PRIOR_WEIGHT = 5.0        # a key's rate is pulled towards the overall rate as if it had this many extra attempts
+PRIORITY_WINDOW = 25      # jobs reordered together (about one search page)
+CLUSTER_SIMILARITY = 0.6  # share of equal tokens for an error to join a failure cluster
+FINGERPRINT_BYTES = 4096  # head of the log compared to tell an appended file from a replaced one
+MEMO_SIZE = 100000        # raw company/title/host strings remembered with their normalized keys while loading
+
+_STOPWORDS = frozenset(['and', 'the', 'for', 'with', 'of', 'in', 'at', 'to', 'a', 'an', 'or'])
+_MASKS = [
+    (re.compile(r'https?://\S+'), '<url>'),
+    (re.compile(r'\{.*\}'), '<json>'),                  # selenium: Unable to locate element: {"method": ...}
+    (re.compile(r'"[^"]*"|\'[^\']*\''), '<str>'),
+    (re.compile(r'\b0x[0-9a-f]+\b|\b[0-9a-f]{12,}\b'), '<id>'),
+    (re.compile(r'\d+(?:\.\d+)*'), '<num>'),
+]
+NO_ERROR = '(no error recorded)'
+_HOST = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*://(?:[^@/?#]*@)?([^/:?#]*)')  # scheme://[user@]host
+
+def title_keywords(title):
+    """Distinct words of a normalized title (repost noise and stopwords dropped)"""
+    words, _, _ = normalize_posting({'title': title})
+    return sorted({w for w in words.split() if w not in _STOPWORDS and len(w) > 1})
+
+def portal_of(link):
+    """Portal name from a job link's host: www.linkedin.com -> linkedin, in.indeed.com -> indeed"""
+    match = _HOST.match(link or '')
+    return _portal_of_host(match.group(1).lower()) if match else ''
+
+def _portal_of_host(host):
+    labels = [l for l in host.split('.') if l]
+    if len(labels) < 2:
+        return ''
+    if len(labels) > 2 and labels[-2] in ('co', 'com', 'org', 'net'):  # indeed.co.uk
+        return labels[-3]
+    return labels[-2]
+
+def error_template(error):
+    """The first line of an error with its variable parts (URLs, quoted text, numbers, IDs) masked"""
+    lines = (error or '').strip().splitlines()
+    if not lines:
+        return NO_ERROR
+    text = lines[0].strip().lower()
+    if text.startswith('message:'):  # selenium exceptions
+        text = text[len('message:'):].strip()
+    for pattern, mask in _MASKS:
+        text = pattern.sub(mask, text)
+    return ' '.join(text.split())[:200]
+
+def _company_key(company):
+    return normalize_posting({'company': company})[1]
+
+def _memo(cache, fn, value):
+    """fn(value), remembered in `cache` (emptied when it reaches MEMO_SIZE)"""
+    result = cache.get(value)
+    if result is None:
+        if len(cache) >= MEMO_SIZE:
+            cache.clear()
+        result = cache[value] = fn(value)
+    return result
+
+def _logit(p):
+    return math.log(p / (1.0 - p))
+
+class FailureClusters:
+    """
+    Groups error messages into templates, Drain-style: an error's masked first
+    line joins the cluster of the same token count sharing at least
+    CLUSTER_SIMILARITY of its tokens, and the positions where they differ become
+    <*> in the cluster's template. Clusters are kept as [id, tokens, count, example, last_seen].
+    """
+
+    def __init__(self, clusters=()):
+        self.clusters = [list(c) for c in clusters]
+        self._by_length = {}
+        for cluster in self.clusters:
+            self._by_length.setdefault(len(cluster[1]), []).append(cluster)
+        self._next_id = max((c[0] for c in self.clusters), default=0) + 1
+
+    def add(self, error, when=''):
+        """Count one error; returns its cluster"""
+        tokens = error_template(error).split(' ')
+        best, best_similarity = None, 0.0
+        for cluster in self._by_length.get(len(tokens), ()):
+            same = sum(a == b for a, b in zip(cluster[1], tokens))
+            similarity = same / len(tokens)
+            if similarity >= CLUSTER_SIMILARITY and similarity > best_similarity:
+                best, best_similarity = cluster, similarity
+        if best is None:
+            best = [self._next_id, tokens, 0, (error or '').strip().splitlines()[0][:300] if error else '', when]
+            self._next_id += 1
+            self.clusters.append(best)
+            self._by_length.setdefault(len(tokens), []).append(best)
+        elif best_similarity < 1.0:
+            best[1] = [a if a == b else '<*>' for a, b in zip(best[1], tokens)]
+        best[2] += 1
+        best[4] = max(best[4], when)
+        return best
+
+    def top(self, n=10):
+        ranked = sorted(self.clusters, key=lambda c: (-c[2], c[0]))[:n]
+        return [{'template': ' '.join(c[1]), 'count': c[2], 'example': c[3], 'last_seen': c[4]} for c in ranked]
+
+class ApplicationAnalytics:
+    """
+    Success rates by company, title keyword, hour of day and portal, and failure
+    clusters from the `error` column, materialized in SQLite next to the byte
+    offset of the application log they cover. refresh() reads only the rows
+    appended since, updates the counters in memory and writes the changed ones
+    back in the same transaction as the new offset; a replaced or truncated log
+    (its first bytes differ) is rebuilt from scratch.
+
+    Each counter is [attempts, success, failed, manual_required, partial]; the
+    portal comes from the job link, the company is normalized like dedup.py's.
+    """
+
+    def __init__(self, log_path=LOG_FILE, path=ANALYTICS_FILE, prior_weight=PRIOR_WEIGHT, window=PRIORITY_WINDOW):
+        self.log_path = log_path
+        self.path = path
+        self.prior_weight = prior_weight
+        self.window = window  # prioritize() batch size
+        self._memos = ({}, {}, {})  # company, title, link host -> key(s); log rows repeat them
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS rates (dimension TEXT NOT NULL, key TEXT NOT NULL,'
+                           ' attempts INTEGER NOT NULL, success INTEGER NOT NULL, failed INTEGER NOT NULL,'
+                           ' manual_required INTEGER NOT NULL, partial INTEGER NOT NULL,'
+                           ' PRIMARY KEY (dimension, key)) WITHOUT ROWID')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS failure_clusters (id INTEGER PRIMARY KEY, template TEXT NOT NULL,'
+                           ' count INTEGER NOT NULL, example TEXT NOT NULL, last_seen TEXT NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        meta = dict(self._conn.execute('SELECT key, value FROM meta'))
+        if meta and meta.get('log') != os.path.abspath(self.log_path):
+            logger.info(f"{self.path} was built from {meta.get('log')}; rebuilding it from {self.log_path}")
+            self._clear()
+            self._conn.commit()
+            return
+        self.offset = int(meta.get('offset', 0))
+        self.fingerprint = meta.get('fingerprint', '')
+        self.fieldnames = meta['fieldnames'].split(',') if meta.get('fieldnames') else None
+        self.rates = {d: {} for d in DIMENSIONS + ('all',)}
+        for dimension, key, *counts in self._conn.execute('SELECT * FROM rates'):
+            self.rates.setdefault(dimension, {})[key] = counts
+        self.failures = FailureClusters(
+            (cid, template.split(' '), count, example, last_seen)
+            for cid, template, count, example, last_seen in self._conn.execute('SELECT * FROM failure_clusters'))
+
+    def _clear(self):
+        self._conn.execute('DELETE FROM rates')
+        self._conn.execute('DELETE FROM failure_clusters')
+        self._conn.execute('DELETE FROM meta')
+        self.offset, self.fingerprint, self.fieldnames = 0, '', None
+        self.rates = {d: {} for d in DIMENSIONS + ('all',)}
+        self.failures = FailureClusters()
+
+    def _head_fingerprint(self, f, size):
+        f.seek(0)
+        return hashlib.sha1(f.read(min(size, FINGERPRINT_BYTES))).hexdigest()
+
+    def refresh(self):
+        """Fold rows appended to the log since the last refresh into the aggregates; returns how many"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.log_path)
+            except OSError:
+                return 0
+            with open(self.log_path, 'rb') as f:
+                if self.offset and (size < self.offset or
+                                    self._head_fingerprint(f, self.offset) != self.fingerprint):
+                    logger.info(f"{self.log_path} was replaced or truncated; rebuilding {self.path}")
+                    self._clear()
+                if size == self.offset:
+                    return 0
+                dirty, added, end = set(), 0, None
+                for records in csv_record_batches(f, self.offset, size):
+                    for row in csv.reader(text for _, _, text in records):
+                        if not row:
+                            continue
+                        if self.fieldnames is None:
+                            self.fieldnames = row
+                            continue
+                        self._add(dict(zip(self.fieldnames, row)), dirty)
+                        added += 1
+                    end = records[-1][1]
+                if end is None:
+                    return 0
+                fingerprint = self._head_fingerprint(f, min(end, FINGERPRINT_BYTES)) \
+                    if self.offset < FINGERPRINT_BYTES else self.fingerprint
+            self.offset, self.fingerprint = end, fingerprint
+            self._save(dirty)
+            return added
+
+    def _add(self, row, dirty):
+        status = row.get('status') or ''
+        column = STATUSES.index(status) + 1 if status in STATUSES else None
+        companies, titles, hosts = self._memos
+        match = _HOST.match(row.get('link') or '')
+        keys = [('all', ''), ('company', _memo(companies, _company_key, row.get('company') or '')),
+                ('hour', (row.get('time') or '')[11:13]),
+                ('portal', _memo(hosts, _portal_of_host, match.group(1).lower()) if match else '')]
+        keys += [('keyword', w) for w in _memo(titles, title_keywords, row.get('title') or '')]
+        for dimension, key in keys:
+            counts = self.rates[dimension].get(key)
+            if counts is None:
+                counts = self.rates[dimension][key] = [0] * (len(STATUSES) + 1)
+            counts[0] += 1
+            if column:
+                counts[column] += 1
+            dirty.add((dimension, key))
+        if status == 'failed':
+            cluster = self.failures.add(row.get('error'), row.get('time') or '')
+            dirty.add(('cluster', cluster[0]))
+
+    def _save(self, dirty):
+        rows = [(d, k, *self.rates[d][k]) for d, k in dirty if d != 'cluster']
+        self._conn.executemany('INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        changed = {k for d, k in dirty if d == 'cluster'}
+        self._conn.executemany('INSERT OR REPLACE INTO failure_clusters VALUES (?, ?, ?, ?, ?)',
+                               [(c[0], ' '.join(c[1]), c[2], c[3], c[4]) for c in self.failures.clusters
+                                if c[0] in changed])
+        self._conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', [
+            ('log', os.path.abspath(self.log_path)), ('offset', str(self.offset)),
+            ('fingerprint', self.fingerprint), ('fieldnames', ','.join(self.fieldnames or []))])
+        self._conn.commit()
+
+    # Rates
+    def overall_rate(self):
+        attempts, success = (self.rates['all'].get('') or [0, 0])[:2]
+        return (success + 1.0) / (attempts + 2.0)
+
+    def rate(self, dimension, key, overall=None):
+        """Success rate of one key, smoothed towards the overall rate (so few attempts say little)"""
+        overall = self.overall_rate() if overall is None else overall
+        counts = self.rates[dimension].get(key)
+        if not counts:
+            return overall
+        return (counts[1] + self.prior_weight * overall) / (counts[0] + self.prior_weight)
+
+    def expected_success(self, job, hour=None):
+        """
+        Estimated chance that applying to `job` now succeeds: the overall rate,
+        shifted (in log-odds) by how the job's company, portal, title keywords
+        (averaged) and the hour of day have done compared with it.
+        """
+        overall = self.overall_rate()
+        base = _logit(overall)
+        _, company, _ = normalize_posting(job)
+        portal = job.get('portal') or portal_of(job.get('link'))
+        shifts = [self.rate('company', company, overall), self.rate('portal', portal, overall)]
+        if hour is not None:
+            shifts.append(self.rate('hour', f'{hour:02d}', overall))
+        keywords = title_keywords(job.get('title'))
+        if keywords:
+            shifts.append(sum(self.rate('keyword', w, overall) for w in keywords) / len(keywords))
+        return 1.0 / (1.0 + math.exp(-(base + sum(_logit(r) - base for r in shifts))))
+
+    def rank(self, jobs, hour=None):
+        """Jobs sorted by expected success, best first (stable: equal jobs keep their order)"""
+        with self._lock:
+            expected = [self.expected_success(job, hour) for job in jobs]
+        order = sorted(range(len(jobs)), key=lambda i: -expected[i])
+        return [jobs[i] for i in order]
+
+    def report(self, top=10, min_attempts=3):
+        """Aggregates as plain data: overall counts, per-dimension rates and the largest failure clusters"""
+        with self._lock:
+            overall = self.overall_rate()
+            all_counts = self.rates['all'].get('') or [0] * (len(STATUSES) + 1)
+
+            def rows(dimension, keys=None):
+                items = self.rates[dimension].items() if keys is None else \
+                    [(k, self.rates[dimension][k]) for k in keys if k in self.rates[dimension]]
+                return [{'key': key, 'attempts': c[0], 'success': c[1], 'rate': round(c[1] / c[0], 3),
+                         'smoothed': round(self.rate(dimension, key, overall), 3)}
+                        for key, c in items if c[0] >= min_attempts]
+
+            by_rate = lambda rs: sorted(rs, key=lambda r: (-r['smoothed'], -r['attempts'], r['key']))
+            keywords = by_rate(rows('keyword'))
+            return {
+                'total': all_counts[0],
+                'by_status': dict(zip(STATUSES, all_counts[1:])),
+                'success_rate': round(all_counts[1] / all_counts[0], 3) if all_counts[0] else None,
+                'portal': by_rate(rows('portal')),
+                'hour': rows('hour', [f'{h:02d}' for h in range(24)]),
+                'company': sorted(rows('company'), key=lambda r: (-r['attempts'], r['key']))[:top],
+                'best_keywords': keywords[:top],
+                'worst_keywords': list(reversed(keywords[-top:])) if len(keywords) > top else [],
+                'failure_clusters': self.failures.top(top),
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def prioritize(jobs, analytics, window=None, clock=None, progress=None):
+    """
+    Reorder a job stream so the jobs most likely to succeed go first, up to
+    `window` jobs at a time. With `progress` (a portals.SearchProgress), only the
+    jobs already found are reordered: the held jobs are let go as soon as taking
+    another would wait for a search page, so applying never waits for a page load
+    it would not have waited for anyway. The aggregates are refreshed before each
+    window, so results logged earlier in the run count too.
+    """
+    clock = clock or datetime.datetime.now
+    window = window or analytics.window
+    buffer = []
+    for job in jobs:
+        buffer.append(job)
+        if len(buffer) >= window or (progress is not None and progress.available <= 0):
+            analytics.refresh()
+            yield from analytics.rank(buffer, hour=clock().hour)
+            buffer = []
+    if buffer:
+        analytics.refresh()
+        yield from analytics.rank(buffer, hour=clock().hour)
+
+_analytics = {}
+_analytics_lock = threading.Lock()
+
+def get_analytics(config):
+    """
+    Shared ApplicationAnalytics for config 'csv_log_file', from config
+    'analytics' (None when set to false):
+    {"path": "analytics.db", "window": 25, "prior_weight": 5}
+    """
+    options = config.get('analytics', {})
+    if options is False:
+        return None
+    options = options if isinstance(options, dict) else {}
+    log_path = config.get('csv_log_file', LOG_FILE)
+    path = options.get('path', ANALYTICS_FILE)
+    with _analytics_lock:
+        if (path, log_path) not in _analytics:
+            _analytics[(path, log_path)] = ApplicationAnalytics(
+                log_path, path, prior_weight=options.get('prior_weight', PRIOR_WEIGHT),
+                window=options.get('window', PRIORITY_WINDOW))
+        return _analytics[(path, log_path)]
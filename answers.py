@@ -0,0 +1,101 @@
+# answers.py - Persistent cache of answers to application form questions
+import json, logging, os, re, threading, datetime
+
+logger = logging.getLogger(__name__)
+
+ANSWERS_FILE = 'answers.jsonl'
+
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+def _answered(value):
+    """An answer that can go in a field: not None and not blank ("phone": "" means unanswered)"""
+    return value is not None and str(value).strip() != ''
+
+def normalize_question(text):
+    """Cache key for a question: lowercase, with punctuation (and '*' markers) removed"""
+    text = (text or '').lower()
+    return ' '.join(_PUNCT_RE.sub(' ', text).split())
+
+class AnswerCache:
+    """
+    Answers keyed by normalized question text, held in memory and saved incrementally
+    as an append-only JSONL file (later lines win, so answers can be corrected by
+    appending or editing the file). Unanswered questions are stored with a null
+    answer so they can be filled in for later runs.
+
+    `defaults` (config 'answers') map question phrases to answers; a question that
+    is not cached verbatim uses the longest phrase it contains, e.g. "years of
+    experience" answers "How many years of experience do you have with Python?".
+    """
+
+    def __init__(self, path=ANSWERS_FILE, defaults=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.answers = {}
+        self.questions = {}  # key -> question text as first seen
+        if os.path.exists(path):
+            self._load()
+        self.phrases = sorted(
+            ((normalize_question(k), str(v)) for k, v in (defaults or {}).items() if _answered(v)),
+            key=lambda item: len(item[0]), reverse=True,
+        )
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring malformed line {line_no} in {self.path}")
+                    continue
+                key = normalize_question(entry.get('question'))
+                self.questions.setdefault(key, entry.get('question'))
+                self.answers[key] = entry.get('answer')
+        logger.info(f"Loaded {len(self.answers)} cached answers from {self.path}")
+
+    def lookup(self, question):
+        """Answer for a question, or None if unknown or blank (never touches disk)"""
+        key = normalize_question(question)
+        answer = self.answers.get(key)
+        if _answered(answer):
+            return answer
+        for phrase, value in self.phrases:
+            if phrase and phrase in key:
+                return value
+        return None
+
+    def remember(self, question, answer, job=None):
+        """Store an answer (or None for an unanswered question) and append it to the file"""
+        key = normalize_question(question)
+        if not key:
+            return
+        with self._lock:
+            if key in self.answers and (self.answers[key] == answer or answer is None):
+                return  # nothing new; don't overwrite a known answer with "unanswered"
+            self.answers[key] = answer
+            self.questions.setdefault(key, question)
+            entry = {
+                'question': question,
+                'answer': answer,
+                'time': datetime.datetime.now().isoformat(),
+                'job': f"{job.get('title')} at {job.get('company')}" if job else None,
+            }
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def unanswered(self):
+        """Questions recorded without an answer"""
+        return [self.questions[k] for k, v in self.answers.items() if v is None]
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_answer_cache(config):
+    """Shared AnswerCache for the configured answers file (loaded once per process)"""
+    path = config.get('answers_file', ANSWERS_FILE)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = AnswerCache(path, defaults=config.get('answers'))
+        return _caches[path]
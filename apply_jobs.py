@@ -1,94 +1,120 @@
 # apply_jobs.py - Enhanced job application automation with logging
-import time, random, logging, os
+import logging
+from contextlib import nullcontext
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from logger import log_application
+from logger import get_application_log
+from waits import Readiness, WaitMetrics, css
+from easy_apply import EasyApplyFlow, MODAL_LOCATORS
+from job_details import JobDetailFetcher
+from portals import adapter_for
+from scheduler import AdaptiveScheduler, read_page_signals, throttle_reason
+from config import reload_config
+from tracing import span
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-def random_delay(min_sec, max_sec):
-    """Random delay between actions"""
-    t = random.uniform(min_sec, max_sec)
-    logger.info(f"Waiting {t:.2f} seconds before next action...")
-    time.sleep(t)
+# Log banners, built once rather than on every job
+RULE = '=' * 60
+JOB_BANNER = '\n' + RULE
+BATCH_RULE = '#' * 60
 
-def apply_to_job(driver, job, config):
+# Selector fallbacks, tried in order
+EASY_APPLY_LOCATORS = css(
+    'button[aria-label*="Easy Apply"]',
+    'button:contains("Easy Apply")',
+    '[data-test-job-apply-button]',
+    'button.jobs-apply-button'
+) + [(By.XPATH, '//button[contains(text(), "Easy Apply")]')]
+
+def apply_to_job(driver, job, config, index=None, metrics=None, jitter=None, on_page=False, signals=None):
     """
-    Attempt to apply to a job listing.
-    Supports LinkedIn Easy Apply and manual applications.
+    Attempt to apply to a job listing with its portal's adapter (see portals.py):
+    LinkedIn Easy Apply, Indeed Apply, or manual_required for external applications.
+    The outcome is recorded in `index` (a job_index.JobIndex) when given, and the
+    time spent waiting on the page vs idling is added to `metrics` (a waits.WaitMetrics).
+    Jobs the detail cache (job_details.py) knows to apply on an external site are
+    marked manual_required without opening the job page. `jitter` (a waits.JitterPolicy)
+    replaces the configured pauses, e.g. the scheduler's adaptively scaled one.
+    With `on_page`, the job page is already open and rendered (preloaded by
+    async_pipeline during the pacing wait), so it is not navigated to again.
+    When `signals` (a dict) is given, the page's warning signals are read into it
+    for the scheduler. A rate-limit banner or captcha page turns anything but a
+    success into 'failed', so the index does not mark the job done and a later
+    run retries it.
     """
     job_title = job.get('title', 'Unknown')
     company = job.get('company', 'Unknown')
+    ready = Readiness(driver, config, jitter=jitter)
+    details = JobDetailFetcher(driver, config, ready=ready)
     
-    logger.info(f"\n{'='*60}")
-    logger.info(f"Attempting to apply: {job_title} at {company}")
-    logger.info(f"Job link: {job.get('link', 'N/A')}")
-    logger.info(f"{'='*60}")
+    with span('apply', job.get('portal')) as apply_span:
+        logger.info(JOB_BANNER)
+        logger.info(f"Attempting to apply: {job_title} at {company}")
+        logger.info(f"Job link: {job.get('link', 'N/A')}")
+        logger.info(RULE)
     
-    try:
-        # Navigate to job
-        driver.get(job['link'])
-        random_delay(*config['delay_range_sec'])
-        
-        status = apply_to_job_linkedin(driver, job, config)
-        
-        # Log the application
-        log_application(job, status)
-        logger.info(f"Application status: {status}\n")
-        return status
-        
-    except Exception as e:
-        error_msg = str(e)
-        logger.error(f"Error applying to job: {error_msg}")
-        log_application(job, 'failed', error=error_msg)
-        return 'failed'
+        error = ''
+        try:
+            known = details.cached(job)
+            if known and known['apply_type'] == 'external':
+                logger.info("Cached job details: applies on the company website, skipping navigation")
+                status = 'manual_required'
+            else:
+                if not on_page:
+                    # Navigate to job, wait for the job details to render and cache them
+                    details.visit(job)
+                    ready.pause('job_page')
+                status = adapter_for(job, config).apply(driver, job, config, ready)
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Error applying to job: {error}")
+            status = 'failed'
+        
+        try:
+            if signals is not None and (on_page or 'job_page' in ready.metrics.steps):
+                signals.update(read_page_signals(driver))
+                throttle = throttle_reason(signals)
+                if throttle and status != 'success':
+                    # Not manual_required: that would mark the job done and it would never be retried
+                    logger.warning(f"The portal showed a {throttle}; recording the job as failed so it is retried")
+                    status, error = 'failed', f"Throttled: {throttle}"
+            
+            # Log the application
+            get_application_log(config).log(job, status, error=error)
+            if index is not None:
+                index.record(job, status)
+            logger.info(f"Application status: {status}\n")
+            apply_span.set(status=status)
+            return status
+        finally:
+            logger.info(f"Timing: {ready.metrics.format()}")
+            if metrics is not None:
+                metrics.merge(ready.metrics)
 
-def apply_to_job_linkedin(driver, job, config):
+def apply_to_job_linkedin(driver, job, config, ready=None):
     """
     Attempt LinkedIn Easy Apply application.
     """
+    ready = ready or Readiness(driver, config)
     try:
         logger.info("Looking for Easy Apply button...")
         
-        # Multiple selector strategies for Easy Apply button
-        easy_apply_selectors = [
-            'button[aria-label*="Easy Apply"]',
-            'button:contains("Easy Apply")',
-            '[data-test-job-apply-button]',
-            'button.jobs-apply-button'
-        ]
-        
-        apply_button = None
-        for selector in easy_apply_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    apply_button = elements[0]
-                    logger.info(f"Found Easy Apply button with selector: {selector}")
-                    break
-            except:
-                continue
+        # The job page is already rendered, so only wait briefly for the button itself
+        apply_button = ready.clickable('easy_apply_button', EASY_APPLY_LOCATORS, timeout=ready.optional_timeout)
         
         if not apply_button:
-            # Try XPath as fallback
-            try:
-                apply_button = driver.find_element(By.XPATH, '//button[contains(text(), "Easy Apply")]')
-                logger.info("Found Easy Apply button using XPath")
-            except:
-                logger.warning("Easy Apply button not found. This may be a complex application.")
-                return 'manual_required'
+            logger.warning("Easy Apply button not found. This may be a complex application.")
+            return 'manual_required'
         
         # Click Easy Apply button
         logger.info("Clicking Easy Apply button...")
+        ready.pause('easy_apply_button')
         apply_button.click()
-        random_delay(*config['delay_range_sec'])
         
         # Handle application form
         logger.info("Processing application form...")
-        status = handle_application_form(driver, job, config)
+        status = handle_application_form(driver, job, config, ready=ready)
         
         return status
         
@@ -96,94 +122,98 @@ def apply_to_job_linkedin(driver, job, config):
         logger.error(f"Error in LinkedIn Easy Apply: {e}")
         return 'failed'
 
-def handle_application_form(driver, job, config):
+def handle_application_form(driver, job, config, ready=None):
     """
     Handle the application form after clicking Easy Apply.
+    Multi-page forms are walked by easy_apply.EasyApplyFlow, answering known
+    questions from the answer cache.
     """
+    ready = ready or Readiness(driver, config)
     try:
         # Wait for modal/form to appear
         logger.info("Waiting for application form to appear...")
-        time.sleep(2)
+        if not ready.present('modal', MODAL_LOCATORS):
+            # The apply button opened something else, typically the company's own site
+            logger.warning("Application form did not appear. This may be an external application.")
+            return 'manual_required'
         
-        # Try to find and handle file upload if present
-        logger.info("Checking for file upload fields...")
-        upload_inputs = driver.find_elements(By.CSS_SELECTOR, 'input[type="file"]')
-        
-        if upload_inputs and config.get('resume_path'):
-            if os.path.exists(config['resume_path']):
-                logger.info(f"Uploading resume: {config['resume_path']}")
-                upload_inputs[0].send_keys(os.path.abspath(config['resume_path']))
-                random_delay(*config['delay_range_sec'])
-            else:
-                logger.warning(f"Resume file not found: {config['resume_path']}")
-        
-        # Look for submit button
-        submit_selectors = [
-            'button[aria-label*="Submit"]',
-            'button[aria-label*="Finish"]',
-            'button:contains("Submit")',
-            'button[type="submit"]'
-        ]
-        
-        submit_button = None
-        for selector in submit_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    submit_button = elements[0]
-                    logger.info(f"Found submit button with selector: {selector}")
-                    break
-            except:
-                continue
-        
-        if submit_button:
-            logger.info("Submitting application...")
-            submit_button.click()
-            random_delay(3, 5)  # Wait for submission
-            logger.info("Application submitted successfully!")
-            return 'success'
-        else:
-            logger.warning("Submit button not found. Manual completion may be required.")
-            return 'partial'
+        return EasyApplyFlow(driver, job, config, ready).run()
     
     except Exception as e:
         logger.error(f"Error handling application form: {e}")
         return 'failed'
 
-def apply_batch_jobs(driver, jobs, config, max_applications=None):
+def apply_batch_jobs(driver, jobs, config, max_applications=None, index=None, on_result=None, scheduler=None,
+                     sessions=None):
     """
-    Apply to multiple jobs with rate limiting.
+    Apply to multiple jobs, paced by `scheduler` (a scheduler.AdaptiveScheduler,
+    created from config per portal when not given), which adapts to the page signals it sees.
+    With `sessions` (a scraper.PortalSessions), each job is applied to in its portal's
+    browser session instead of `driver`, taking turns with that portal's search.
+    `on_result(job, status)` is called after each application (progress reporting),
+    and with status 'skipped' for jobs that `index` already marks as done.
+    `jobs` may be a list or a generator (e.g. scraper.iter_jobs); jobs are pulled
+    one at a time, so applying starts before the search has finished.
+    Jobs that `index` already marks as done are skipped before any navigation.
     """
-    logger.info(f"\n{'#'*60}")
+    total = len(jobs) if hasattr(jobs, '__len__') else '?'
+    logger.info('\n' + BATCH_RULE)
     logger.info(f"Starting batch application process")
-    logger.info(f"Total jobs to process: {len(jobs)}")
-    logger.info(f"{'#'*60}\n")
+    logger.info(f"Total jobs to process: {total}")
+    logger.info(BATCH_RULE + '\n')
     
     results = {'success': 0, 'failed': 0, 'manual_required': 0, 'partial': 0}
+    metrics = WaitMetrics()
+    schedulers = {}
+    attempted = 0
+    skipped = 0
     
     for idx, job in enumerate(jobs, 1):
-        if max_applications and idx > max_applications:
-            logger.info(f"Reached max applications limit: {max_applications}")
-            break
-        
-        logger.info(f"\nProcessing job {idx}/{len(jobs)}")
-        status = apply_to_job(driver, job, config)
+        reload_config(config)  # a changed config.json applies from this job on
+        if index is not None and index.is_done(job):
+            logger.info(f"Skipping job {idx}: already processed ({job.get('title')} at {job.get('company')})")
+            skipped += 1
+            if on_result:
+                on_result(job, 'skipped')
+            continue
+        
+        portal = adapter_for(job, config)
+        pace = scheduler or schedulers.get(portal.name)
+        if pace is None:
+            pace = schedulers[portal.name] = AdaptiveScheduler(config, portal=portal.display_name)
+        pace.wait()
+        
+        logger.info(f"\nProcessing job {idx}/{total}")
+        job_metrics = WaitMetrics()
+        signals = {}
+        with (sessions.use(portal.name) if sessions is not None else nullcontext(driver)) as job_driver:
+            status = apply_to_job(job_driver, job, config, index=index, metrics=job_metrics, jitter=pace.jitter,
+                                  signals=signals)
+            pace.after_job(0, status, signals=signals)
+        metrics.merge(job_metrics)
+        attempted += 1
         
         if status in results:
             results[status] += 1
+        if on_result:
+            on_result(job, status)
         
-        # Longer delay between applications
-        if idx < len(jobs):
-            delay = random.uniform(10, 20)
-            logger.info(f"Waiting {delay:.0f} seconds before next application...")
-            time.sleep(delay)
+        # Stop before pulling another job, so a lazy search does not fetch a page for nothing
+        if max_applications and attempted >= max_applications:
+            logger.info(f"Reached max applications limit: {max_applications}")
+            break
     
-    logger.info(f"\n{'='*60}")
+    logger.info(JOB_BANNER)
     logger.info("Batch application summary:")
     logger.info(f"  Successful: {results['success']}")
     logger.info(f"  Failed: {results['failed']}")
     logger.info(f"  Manual Required: {results['manual_required']}")
     logger.info(f"  Partial: {results['partial']}")
-    logger.info(f"{'='*60}\n")
+    logger.info(f"  Skipped (already processed): {skipped}")
+    logger.info(f"  Timing: {metrics.format()}")
+    for pace in ([scheduler] if scheduler else schedulers.values()):
+        logger.info(f"  Pace ({pace.portal}): {pace.format()}")
+    get_application_log(config).flush()
+    logger.info(RULE + '\n')
     
     return results
@@ -0,0 +1,309 @@
+# async_pipeline.py - asyncio orchestrator: search, detail prefetch, journaling and browser sessions on one event loop
+import asyncio, logging, logging.handlers, queue, signal, threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from apply_jobs import apply_to_job
+from config import reload_config
+from job_details import JobDetailFetcher, get_detail_cache
+from portals import configured_portals, get_adapter, portal_key
+from scheduler import AdaptiveScheduler
+
+logger = logging.getLogger(__name__)
+
+# config 'async' defaults
+ASYNC_DEFAULTS = {
+    'queue_size': 10,        # jobs searched ahead of the apply sessions, per portal
+    'preload_pages': True,   # open each job page during its pacing wait instead of after it
+}
+_END = object()  # end of the job stream
+
+def async_options(config):
+    """config 'async' (true or a dict) merged over ASYNC_DEFAULTS"""
+    options = config.get('async')
+    return dict(ASYNC_DEFAULTS, **(options if isinstance(options, dict) else {}))
+
+class AsyncDriver:
+    """
+    Async face of a Selenium driver. A WebDriver session takes one command at a
+    time, so every call runs on the driver's own thread, holding `lock` (shared
+    with sync code using the same browser, e.g. multi-portal search threads);
+    the event loop itself never blocks on the browser.
+    """
+
+    def __init__(self, driver, name='browser', portal=None, lock=None):
+        self.driver = driver
+        self.name = name
+        self.portal = portal
+        self.lock = lock or threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def _locked(self, fn, args):
+        with self.lock:
+            return fn(self.driver, *args)
+
+    async def run(self, fn, *args):
+        """fn(driver, *args) on the driver's thread; whole steps (a search page, an application) go through here"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._locked, fn, args)
+
+    async def get(self, url):
+        return await self.run(lambda driver: driver.get(url))
+
+    async def execute_script(self, script, *args):
+        return await self.run(lambda driver: driver.execute_script(script, *args))
+
+    async def page_source(self):
+        return await self.run(lambda driver: driver.page_source)
+
+    async def quit(self):
+        return await self.run(lambda driver: driver.quit())
+
+    def close(self):
+        """Stop the driver's thread once its current call has returned (the browser stays open)"""
+        self._executor.shutdown(wait=True)
+
+@contextmanager
+def queued_logging():
+    """Route the root logger through a queue, so file and console writes happen on a listener thread"""
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    listener.start()
+    try:
+        yield
+    finally:
+        root.handlers = handlers
+        listener.stop()
+
+class AsyncOrchestrator:
+    """
+    The apply stage as tasks on one event loop:
+      search   pulls the lazy job stream (search pages, scoring, checkpoint journal)
+               ahead into a bounded queue per portal, on the search browser's thread
+      apply    one task per browser session; pacing waits are asyncio sleeps, and
+               the job page is opened and its details read (preloaded) while the
+               wait runs, so the application starts on a rendered page; a job
+               found to apply on the company website ends the wait early
+      journal  on_result (checkpoint fsync) runs on its own thread
+    The `max_applications` cap and results counters match apply_batch_jobs.
+    """
+
+    def __init__(self, config, drivers, max_applications=None, index=None, on_result=None):
+        options = async_options(config)
+        self.config = config
+        self.drivers = drivers
+        self.max_applications = max_applications
+        self.index = index
+        self.on_result = on_result
+        self.queue_size = options['queue_size']
+        self.preload = options['preload_pages']
+        self.cache = get_detail_cache(config)
+        self.default_portal = drivers[0].portal
+        self.schedulers = {}
+        self.results = {'success': 0, 'failed': 0, 'manual_required': 0, 'partial': 0}
+        self.attempted = 0
+        self.skipped = 0
+        self.preloaded = 0
+        self.done = False
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='journal')
+        self._search_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='search')
+
+    def scheduler(self, portal):
+        pace = self.schedulers.get(portal)
+        if pace is None:
+            pace = self.schedulers[portal] = AdaptiveScheduler(self.config, portal=get_adapter(portal).display_name)
+        return pace
+
+    def _portal(self, job):
+        key = portal_key(job.get('portal') or self.default_portal)
+        return key if key in self.queues else self.default_portal
+
+    async def _io_call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    async def _search(self, jobs, search):
+        """Producer: the next job from the (blocking) job stream, on the search browser's thread"""
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.done:
+                if search is not None:
+                    job = await search.run(lambda driver: next(jobs, _END))
+                else:  # multi-portal: the stream is fed by the portals' own search threads
+                    job = await loop.run_in_executor(self._search_thread, next, jobs, _END)
+                if job is _END:
+                    break
+                await self.queues[self._portal(job)].put(job)
+        except Exception as e:
+            logger.error(f"Job search failed: {e}")
+        for q in self.queues.values():
+            await q.put(_END)
+
+    def _known_external(self, job):
+        details = self.cache.get(job) if self.cache is not None else None
+        return bool(details) and details['apply_type'] == 'external'
+
+    def _preload(self, driver, job):
+        """Open the job page and read its details; returns (details, URL the browser then shows)"""
+        details = JobDetailFetcher(driver, self.config, cache=self.cache).visit(job)
+        return details, driver.current_url
+
+    def _apply(self, driver, job, session, pace, preloaded_url):
+        # The search (same browser, or a multi-portal search thread) may have navigated away since
+        on_page = preloaded_url is not None and driver.current_url == preloaded_url
+        signals = {}
+        status = apply_to_job(driver, job, self.config, index=self.index, jitter=pace.jitter, on_page=on_page,
+                              signals=signals)
+        pace.after_job(session, status, signals=signals)
+        return status
+
+    async def _wait_and_preload(self, driver, job, pace):
+        """The session's pacing wait, with the job page opened meanwhile; returns the preloaded URL or None"""
+        wait = asyncio.ensure_future(pace.wait_async(driver.name))
+        if not self.preload or await self._io_call(self._known_external, job):
+            await wait
+            return None
+        try:
+            details, url = await driver.run(self._preload, job)
+        except Exception as e:
+            logger.debug(f"[{driver.name}] Preloading {job.get('link')} failed: {e}")
+            await wait
+            return None
+        self.preloaded += 1
+        if details['apply_type'] == 'external' and not wait.done():
+            # Nothing will be submitted, so there is nothing to pace
+            wait.cancel()
+            await asyncio.gather(wait, return_exceptions=True)
+            return None
+        await wait
+        return url
+
+    async def _apply_worker(self, driver):
+        q = self.queues[driver.portal]
+        pace = self.scheduler(driver.portal)
+        while True:
+            job = await q.get()
+            if job is _END:
+                q.put_nowait(_END)  # for the other sessions on this portal
+                break
+            if self.done:
+                continue  # drain, so the search is never left blocked on a full queue
+            if self.index is not None and self.index.is_done(job):
+                self.skipped += 1
+                if self.on_result:
+                    await self._io_call(self.on_result, job, 'skipped')
+                continue
+            if self.max_applications and self.attempted >= self.max_applications:
+                continue
+            self.attempted += 1
+            if self.max_applications and self.attempted >= self.max_applications:
+                logger.info(f"Reached max applications limit: {self.max_applications}")
+
+            reload_config(self.config)
+            preloaded_url = await self._wait_and_preload(driver, job, pace)
+            logger.info(f"[{driver.name}] Applying: {job.get('title')} at {job.get('company')}")
+            try:
+                status = await driver.run(self._apply, job, driver.name, pace, preloaded_url)
+            except Exception as e:
+                logger.error(f"[{driver.name}] Browser session failed: {e}")
+                self.results['failed'] += 1
+                pace.record(driver.name, 'failed')
+                if self.on_result:
+                    await self._io_call(self.on_result, job, 'failed')
+                break
+            if status in self.results:
+                self.results[status] += 1
+            if self.max_applications and self.attempted >= self.max_applications:
+                self.done = True  # stop the search from pulling further ahead
+            if self.on_result:
+                await self._io_call(self.on_result, job, status)
+        logger.info(f"[{driver.name}] Finished")
+
+    async def run(self, jobs, search=None):
+        """
+        Apply to `jobs` (a lazy iterator) with every session; `search` is the
+        AsyncDriver whose browser the stream navigates (None when the stream runs
+        its own search threads). Cancelling this stops all tasks; calls already
+        running in a browser finish first. Returns the results counters.
+        """
+        self.queues = {p: asyncio.Queue(maxsize=self.queue_size) for p in dict.fromkeys(d.portal for d in self.drivers)}
+        producer = asyncio.ensure_future(self._search(jobs, search))
+        workers = [asyncio.ensure_future(self._apply_worker(d)) for d in self.drivers]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            self.done = True
+            for task in [producer] + workers:
+                task.cancel()
+            await asyncio.gather(producer, *workers, return_exceptions=True)
+            self._io.shutdown(wait=True)
+            self._search_thread.shutdown(wait=True)
+        logger.info(f"Async run finished: {self.attempted} attempted, {self.skipped} skipped, "
+                    f"{self.preloaded} job pages preloaded")
+        for pace in self.schedulers.values():
+            logger.info(f"Pace ({pace.portal}): {pace.format()}")
+        return self.results
+
+async def _run_cancellable(orchestrator, jobs, search):
+    """Run the orchestrator; Ctrl-C cancels it (returns None) instead of interrupting a thread mid-call"""
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, task.cancel)
+        handled = True
+    except (NotImplementedError, RuntimeError, ValueError):  # Windows, or not the main thread (gui.py)
+        handled = False
+    try:
+        return await orchestrator.run(jobs, search)
+    except asyncio.CancelledError:
+        return None
+    finally:
+        if handled:
+            loop.remove_signal_handler(signal.SIGINT)
+
+def run_async(jobs, config, driver=None, sessions=None, workers=1, driver_factory=None, max_applications=None,
+              index=None, on_result=None):
+    """
+    apply_batch_jobs / apply_with_worker_pool on the asyncio orchestrator.
+    `driver` is the search browser; it also applies unless `workers` > 1 starts
+    that many browsers per portal (worker_pool.start_portal_workers), each applying
+    to its own portal's jobs. With `sessions` (scraper.PortalSessions) each
+    portal's browser applies to its own jobs.
+    Ctrl-C stops the tasks, lets running browser calls finish and raises
+    KeyboardInterrupt; the checkpoint then resumes the rest.
+    """
+    from worker_pool import PROFILES_DIR, quit_drivers, start_portal_workers
+    if driver_factory is None:
+        from scraper import login_and_prepare_driver as driver_factory
+    portal = configured_portals(config)[0]
+    extra = {}
+    if workers > 1:
+        extra = start_portal_workers(config, workers, driver_factory, config.get('profiles_dir', PROFILES_DIR))
+        drivers = [AsyncDriver(d, f'worker-{i}' + (f'-{portal_key(p)}' if n else ''), portal_key(p))
+                   for n, (p, browsers) in enumerate(extra.items()) for i, d in enumerate(browsers, 1)]
+        search = None if sessions is not None else AsyncDriver(driver, 'search', portal_key(portal))
+    elif sessions is not None:
+        shared = {}
+        drivers = []
+        for key, browser in sessions.drivers.items():
+            if id(browser) not in shared:
+                shared[id(browser)] = AsyncDriver(browser, f'session-{key}', key, sessions.locks[key])
+                drivers.append(shared[id(browser)])
+        search = None
+    else:
+        search = AsyncDriver(driver, 'session-1', portal_key(portal))
+        drivers = [search]
+
+    orchestrator = AsyncOrchestrator(config, drivers, max_applications=max_applications, index=index,
+                                     on_result=on_result)
+    try:
+        with queued_logging():
+            results = asyncio.run(_run_cancellable(orchestrator, jobs, search))
+    finally:
+        for d in set(drivers + ([search] if search is not None else [])):
+            d.close()
+        quit_drivers(extra)
+    if results is None:
+        raise KeyboardInterrupt
+    return results
@@ -0,0 +1 @@
+# benchmarks - Offline benchmarks and fakes (run from the repo root: python -m benchmarks.<name>)
@@ -0,0 +1,93 @@
+# bench_analytics.py - Application analytics (analytics.py): materializing, refreshing and reopening at 1M log rows
+"""
+Writes an N-row application_log.csv with varied companies, titles, hours,
+link hosts and Selenium-style errors, then times the first materialization
+into analytics.db, a refresh after a few appended rows, reopening the
+materialized database (next run) next to rebuilding it from the log, ranking
+a search page's worth of jobs and building the report.
+
+Usage:
+    python -m benchmarks.bench_analytics [--rows 1000000] [--jobs 10000]
+"""
+import argparse, csv, os, random, tempfile, time
+from analytics import ApplicationAnalytics
+from logger import FIELDNAMES
+
+WORDS = ['Python', 'Java', 'Backend', 'Data', 'Software', 'Platform', 'Cloud', 'Intern', 'Engineer', 'Developer',
+         'Senior', 'Junior', 'Analyst', 'Machine', 'Learning', 'QA', 'Automation', 'Full', 'Stack', 'Mobile']
+HOSTS = ['https://www.linkedin.com/jobs/view/{}/', 'https://in.indeed.com/viewjob?jk={:x}',
+         'https://www.naukri.com/job-listings-{}']
+ERRORS = [
+    'Message: no such element: Unable to locate element: {{"method":"css selector","selector":".apply-{}"}}\n'
+    '  (Session info: chrome=120.0.6099.{})',
+    'Message: timeout: Timed out receiving message from renderer: {}.{}',
+    'Message: element click intercepted: Element <button id="ember{}"> is not clickable at point ({}, 300)',
+    'Message: stale element reference: element is not attached to the page document (attempt {} of {})',
+    'Resume upload failed for /home/user/resume_v{}_{}.pdf',
+]
+
+def write_rows(path, start, count, mode='a'):
+    rng = random.Random(start)
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if mode == 'w':
+            writer.writerow(FIELDNAMES)
+        for i in range(start, start + count):
+            title = ' '.join(rng.sample(WORDS, 3))
+            company = f'Company {rng.randrange(3000)}'
+            hour = rng.randrange(24)
+            # Some companies, keywords and hours do better, so the rates have something to find
+            chance = 0.15 + 0.2 * ('Python' in title) + 0.15 * (hour < 6) + 0.2 * (company.endswith('7'))
+            status = 'success' if rng.random() < chance else rng.choice(['failed', 'manual_required', 'partial'])
+            error = rng.choice(ERRORS).format(rng.randrange(1000), rng.randrange(100)) if status == 'failed' else ''
+            writer.writerow([f'2026-{1 + i % 12:02d}-{1 + i % 28:02d}T{hour:02d}:{i % 60:02d}:00', title, company,
+                             HOSTS[i % 3].format(3900000000 + i), status, error])
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--jobs', type=int, default=10000, help='jobs ranked by expected success')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, 'application_log.csv')
+        path = os.path.join(tmp, 'analytics.db')
+        write_rows(log, 0, args.rows, mode='w')
+        print(f"{args.rows} rows, {os.path.getsize(log) / 1e6:.0f} MB")
+        analytics = ApplicationAnalytics(log, path)
+        timed('initial materialization', analytics.refresh)
+        write_rows(log, args.rows, 100)
+        timed('refresh after 100 appended rows', analytics.refresh)
+        timed('refresh with no changes', analytics.refresh)
+        analytics.close()
+        print(f"analytics.db {os.path.getsize(path) / 1e6:.1f} MB")
+
+        reopened = timed('reopen materialized (next run)', lambda: ApplicationAnalytics(log, path))
+        assert reopened.refresh() == 0
+        rebuilt = ApplicationAnalytics(log, os.path.join(tmp, 'rebuilt.db'))
+        timed('rebuild from the log', rebuilt.refresh)
+        assert rebuilt.report() == reopened.report()
+        rebuilt.close()
+
+        rng = random.Random(1)
+        jobs = [{'title': ' '.join(rng.sample(WORDS, 3)), 'company': f'Company {rng.randrange(4000)}',
+                 'link': HOSTS[i % 3].format(i), 'portal': ['linkedin', 'indeed', 'naukri'][i % 3]}
+                for i in range(args.jobs)]
+        start = time.perf_counter()
+        ranked = reopened.rank(jobs, hour=3)
+        elapsed = time.perf_counter() - start
+        print(f"{f'rank() {len(jobs)} jobs':<40} {elapsed * 1000:>10.1f} ms  ({len(jobs) / elapsed:.0f} jobs/s)")
+        assert len(ranked) == len(jobs)
+        report = timed('report()', reopened.report)
+        print(f"{len(report['failure_clusters'])} failure clusters, top: "
+              + '; '.join(f"{c['count']}x {c['template'][:50]}" for c in report['failure_clusters'][:3]))
+        reopened.close()
+
+if __name__ == '__main__':
+    main()
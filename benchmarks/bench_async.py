@@ -0,0 +1,77 @@
+# bench_async.py - Sequential apply loop versus the asyncio orchestrator, on a fake driver with latency
+"""
+Runs search and apply over the recorded LinkedIn pages (FakeDriver, every
+WebDriver round-trip delayed by --latency-ms) with real pacing waits of
+--interval seconds, first through the sequential path (apply_batch_jobs, or
+worker_pool with --sessions > 1) and then through async_pipeline.run_async.
+Every --external-every'th job applies on the company website (0: none); the
+orchestrator finds those while prefetching, so they skip the pacing wait and
+the application attempt.
+
+Usage:
+    python -m benchmarks.bench_async [--latency-ms 5] [--interval 0.3] [--sessions 1 3]
+"""
+import argparse, logging, os, tempfile, time
+from apply_jobs import apply_batch_jobs
+from async_pipeline import run_async
+from scraper import iter_jobs
+from worker_pool import apply_with_worker_pool
+from benchmarks.fake_driver import FakeDriver
+from benchmarks.fake_site import fake_config, linkedin_pages
+
+def bench_config(tmp, name, interval):
+    config = fake_config({'job_portal': 'LinkedIn'}, tmp, name)
+    config.update({
+        'between_jobs_sec': [interval, interval],
+        'pacing': {'portal_jobs_per_hour': 10 ** 9, 'session_jobs_per_hour': 10 ** 9, 'recovery': 1.0},
+        'detail_cache': {'path': os.path.join(tmp, f'{name}-details.db')},
+        'profiles_dir': os.path.join(tmp, 'profiles'),
+    })
+    return config
+
+def run_once(mode, sessions, pages, latency, interval):
+    """Wall seconds and results of one run; `mode` is 'sequential' or 'async'"""
+    drivers = []
+
+    def factory(portal, config, profile_dir=None):
+        drivers.append(FakeDriver(pages=pages, latency=latency))
+        return drivers[-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = bench_config(tmp, f'{mode}-{sessions}', interval)
+        driver = factory('LinkedIn', config)
+        start = time.perf_counter()
+        jobs = iter_jobs(driver, config)
+        if mode == 'async':
+            results = run_async(jobs, config, driver=driver, workers=sessions, driver_factory=factory)
+        elif sessions > 1:
+            results = apply_with_worker_pool(jobs, config, sessions, driver_factory=factory)
+        else:
+            results = apply_batch_jobs(driver, jobs, config)
+        elapsed = time.perf_counter() - start
+    return elapsed, results, sum(d.round_trips for d in drivers)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    parser.add_argument('--interval', type=float, default=0.3, help='pacing wait between jobs (seconds)')
+    parser.add_argument('--external-every', type=int, default=4)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 3])
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    pages = linkedin_pages(args.external_every)
+    latency = args.latency_ms / 1000.0
+    for sessions in args.sessions:
+        timings = {}
+        for mode in ('sequential', 'async'):
+            elapsed, results, trips = run_once(mode, sessions, pages, latency, args.interval)
+            timings[mode] = elapsed
+            jobs = sum(results.values()) if results else 0
+            statuses = ' '.join(f"{k}={v}" for k, v in (results or {}).items() if v)
+            print(f"{sessions} session(s), {mode:<10} {elapsed:>6.2f}s  {jobs / elapsed:>5.1f} jobs/s  "
+                  f"{trips:>5} round-trips  {statuses}")
+        print(f"{sessions} session(s), speedup    {timings['sequential'] / timings['async']:>5.2f}x")
+
+if __name__ == '__main__':
+    main()
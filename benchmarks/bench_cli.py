@@ -0,0 +1,93 @@
+# bench_cli.py - Command line startup: import time per cli.py subcommand, measured with python -X importtime
+"""
+Runs each command --runs times in a fresh interpreter, in a scratch directory
+with a config.json, a resume and an application log of --rows rows, and reports
+the median wall time, the time over a bare `python -c pass`, and the import
+time of the command's own modules (-X importtime, interpreter startup excluded).
+The webdriver column says whether Selenium's WebDriver (~0.3 s to import) was loaded.
+
+`import run` is what every command paid when run.py was the only entry point
+(the whole apply stack), and `import gui` is the web UI's
+startup (Flask included). `stats` and `validate` should stay well under 100 ms.
+
+Usage:
+    python -m benchmarks.bench_cli [--runs 5] [--rows 5000]
+"""
+import argparse, csv, json, os, statistics, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, 'cli.py')
+COMMANDS = [
+    ('cli.py stats', [CLI, 'stats']),
+    ('cli.py validate', [CLI, 'validate']),
+    ('cli.py --help', [CLI, '--help']),
+    ('import run', ['-c', 'import run']),
+    ('import gui', ['-c', 'import gui']),
+]
+
+def parse_importtime(stderr):
+    """{top-level module: cumulative microseconds} and every module name, from -X importtime output"""
+    modules, names = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        names.add(name.strip())
+        if not name.startswith('  '):  # nested imports are indented further
+            modules[name.strip()] = int(cumulative)
+    return modules, names
+
+def measure(args, cwd, env):
+    """(wall seconds, ({top-level module: microseconds}, all modules), exit code) for one interpreter run"""
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=cwd, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - start, parse_importtime(done.stderr), done.returncode
+
+def write_scratch(tmp, rows):
+    with open(os.path.join(ROOT, 'config.json')) as f:
+        config = json.load(f)
+    os.makedirs(os.path.join(tmp, 'resume'))
+    config['resume_path'] = os.path.join('resume', 'resume.pdf')
+    with open(os.path.join(tmp, config['resume_path']), 'wb') as f:
+        f.write(b'%PDF-1.7\n' + b'0' * 50000 + b'\n%%EOF\n')
+    with open(os.path.join(tmp, 'config.json'), 'w') as f:
+        json.dump(config, f)
+    with open(os.path.join(tmp, 'application_log.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['time', 'title', 'company', 'link', 'status', 'error'])
+        for i in range(rows):
+            status = ('success', 'failed', 'manual_required', 'partial')[i % 4]
+            writer.writerow([f'2024-05-{1 + i % 28:02d}T10:00:00', f'Python Developer {i}', f'Company {i % 97}',
+                             f'https://www.linkedin.com/jobs/view/{i}/', status,
+                             'Submit button not found' if status == 'failed' else ''])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--rows', type=int, default=5000, help='application log rows for stats')
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    with tempfile.TemporaryDirectory() as tmp:
+        write_scratch(tmp, args.rows)
+        bare = [measure(['-c', 'pass'], tmp, env) for _ in range(args.runs)]
+        startup = set(bare[0][1][0])  # site, encodings, ...: imported before any command code runs
+        bare_wall = statistics.median(wall for wall, _, _ in bare)
+        print(f"bare interpreter: {bare_wall * 1000:.0f} ms wall\n")
+        print(f"{'command':<17} {'wall ms':>8} {'over bare':>9} {'imports ms':>10}  webdriver  slowest imports")
+        for name, command in COMMANDS:
+            runs = [measure(command, tmp, env) for _ in range(args.runs)]
+            if any(code for _, _, code in runs):
+                print(f"{name:<17} exited with {runs[0][2]} (missing dependency?)")
+                continue
+            wall = statistics.median(w for w, _, _ in runs)
+            own = {m: us for m, us in runs[-1][1][0].items() if m not in startup}
+            imports = statistics.median(sum(us for m, us in r[0].items() if m not in startup) for _, r, _ in runs)
+            webdriver = 'selenium.webdriver.remote.webdriver' in runs[-1][1][1]
+            slowest = ', '.join(f"{m} {us / 1000:.0f}" for m, us in sorted(own.items(), key=lambda i: -i[1])[:3])
+            print(f"{name:<17} {wall * 1000:>8.0f} {(wall - bare_wall) * 1000:>9.0f} {imports / 1000:>10.1f}  "
+                  f"{'yes' if webdriver else 'no':<9}  {slowest}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+# bench_dedup.py - Near-duplicate index (dedup.py): build rate, size, lookup latency and accuracy at 1M postings
+"""
+Generates --postings synthetic historical postings in clusters: a base title
+at a company, then reposts and cross-portal copies of it with noise words,
+"(Remote)", punctuation changes, a typo or a legal form on the company name.
+Loads them with DuplicateIndex.check_many in batches, then reports the build
+rate, the database size, the lookup latency of check() on new postings next to
+a brute-force scan of every stored posting, and precision/recall of the
+clusters found against the generated ones. Copies with a typo mostly fall
+below the default 0.8 threshold, which caps recall near 0.9 by design.
+
+Usage:
+    python -m benchmarks.bench_dedup [--postings 1000000] [--batch 10000] [--queries 1000]
+"""
+import argparse, os, random, statistics, tempfile, time
+from dedup import DuplicateIndex, jaccard, normalize_posting, shingles
+
+SENIORITY = ['', 'Senior ', 'Junior ', 'Lead ', 'Staff ', 'Principal ', 'Associate ']
+TECH = ['Python', 'Java', 'Go', 'Rust', 'C++', 'Node.js', 'React', 'Angular', 'Data', 'Machine Learning', 'DevOps',
+        'Cloud', 'Backend', 'Frontend', 'Full Stack', 'Android', 'iOS', 'QA', 'Security', 'Embedded', 'SRE',
+        'Salesforce', 'SAP', 'Django', 'Kotlin', '.NET', 'Scala', 'Spark', 'Platform', 'Database']
+ROLE = ['Developer', 'Engineer', 'Architect', 'Consultant', 'Analyst', 'Specialist']
+TEAM = ['', ', Payments', ' - Platform', ' - Growth', ', Search', ' (Core Banking)', ', Infrastructure', ' II']
+SYLLABLES = ['ac', 'me', 'glo', 'bex', 'ini', 'tech', 'um', 'bra', 'vo', 'zen', 'qua', 'lix', 'nor', 'tal', 'pix',
+             'ora', 'sol', 'vex', 'kin', 'dra']
+LEGAL = [' Inc', ' Inc.', ' Pvt Ltd', ' Pvt. Ltd.', ' LLC', ' Limited', ' Private Limited', ' Corp']
+PORTALS = ['linkedin', 'indeed', 'naukri']
+
+def perturb(title, company, rng):
+    """A repost or cross-portal copy: the same role, spelled the way another listing would"""
+    kind = rng.randrange(7)
+    if kind == 0:
+        title = title + rng.choice([' - Urgent Hiring', ' | Immediate Joiners', ' (Hybrid)'])
+    elif kind == 1:
+        title = rng.choice(['Urgent Opening: ', 'Hiring: ', 'WFH - ']) + title
+    elif kind == 2:
+        title = title.replace(' - ', ', ').replace(', ', ' - ') + ' (Remote)'
+    elif kind == 3:
+        title = title.upper() if rng.random() < 0.5 else title.lower()
+    elif kind == 4 and len(title) > 12:  # swap two adjacent letters
+        i = rng.randrange(1, len(title) - 2)
+        title = title[:i] + title[i + 1] + title[i] + title[i + 2:]
+    if rng.random() < 0.5:
+        company = company + rng.choice(LEGAL)
+    return title, company
+
+def generate(n, rng):
+    """n postings as (true cluster, job), in arrival order; each cluster's first posting is its original"""
+    companies = list(dict.fromkeys(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+                                   for _ in range(n // 20 + 10)))
+    used = set()
+    clusters, total = [], 0
+    while total < n:
+        company = rng.choice(companies)
+        title = (rng.choice(SENIORITY) + rng.choice(TECH) + ' ' + rng.choice(ROLE) + rng.choice(TEAM)).strip()
+        key = normalize_posting({'title': title, 'company': company})
+        if key in used:
+            continue
+        used.add(key)
+        size = rng.choice([1, 1, 1, 2, 2, 3, 4, 6])
+        clusters.append((title, company, size))
+        total += size
+    postings = []
+    for cluster, (title, company, size) in enumerate(clusters):
+        for copy in range(size):
+            t, c = (title, company) if copy == 0 else perturb(title, company, rng)
+            postings.append((cluster, copy, t, c))
+    # Copies arrive later than their original, interleaved with everything else
+    order = sorted(range(len(postings)), key=lambda i: (postings[i][1] > 0) * rng.random() + rng.random())
+    jobs = []
+    for i in order[:n]:
+        cluster, _, title, company = postings[i]
+        jobs.append((cluster, {'title': title, 'company': company, 'portal': rng.choice(PORTALS),
+                               'job_id': str(len(jobs)), 'link': f'https://jobs.example/{len(jobs)}'}))
+    return jobs
+
+def brute_force(dedup, job, threshold):
+    """Best match by scanning every stored posting (what a lookup costs without the LSH buckets)"""
+    title, company, location = normalize_posting(job)
+    grams = shingles(title, location)
+    best, best_similarity = None, 0.0
+    for cluster, other_company, text in dedup._conn.execute('SELECT cluster, company, text FROM postings'):
+        if other_company != company:
+            continue
+        other_title, _, other_location = text.partition('\t')
+        similarity = jaccard(grams, shingles(other_title, other_location))
+        if similarity >= threshold and similarity > best_similarity:
+            best, best_similarity = cluster, similarity
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--postings', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=10000, help='postings per check_many transaction')
+    parser.add_argument('--queries', type=int, default=1000, help='new postings timed with check()')
+    parser.add_argument('--brute-force', type=int, default=5, help='of those, also looked up by a full scan')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    jobs = generate(args.postings + args.queries, rng)
+    history, queries = jobs[:args.postings], jobs[args.postings:]
+    print(f"Generated {len(history)} postings in {len({c for c, _ in history})} clusters "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'postings.db')
+        dedup = DuplicateIndex(path)
+        truth = {}  # cluster (representative's row id) -> generated cluster
+        found = true_dups = correct = 0
+        start = time.perf_counter()
+        for offset in range(0, len(history), args.batch):
+            batch = history[offset:offset + args.batch]
+            for (cluster, job), posting in zip(batch, dedup.check_many([job for _, job in batch])):
+                if posting.duplicate_of is None:
+                    truth[posting.cluster] = cluster
+                else:
+                    found += 1
+                    correct += truth[posting.cluster] == cluster
+            done = offset + len(batch)
+            if done % (args.batch * 20) == 0 or done == len(history):
+                print(f"  {done:>9} postings  {done / (time.perf_counter() - start):>8.0f}/s")
+        elapsed = time.perf_counter() - start
+        seen = set()
+        for cluster, _ in history:
+            true_dups += cluster in seen
+            seen.add(cluster)
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        print(f"Built in {elapsed:.1f} s ({len(history) / elapsed:.0f} postings/s), {dedup.clusters()} clusters, "
+              f"{size / 1e6:.1f} MB ({size / len(history):.0f} bytes/posting)")
+        print(f"Precision {correct / found if found else 1:.4f}  recall {correct / true_dups if true_dups else 1:.4f}  "
+              f"({found} flagged, {true_dups} true duplicates)")
+
+        probes = [job for _, job in queries[:args.brute_force]]
+        start = time.perf_counter()
+        expected = [brute_force(dedup, job, dedup.threshold) for job in probes]
+        scan = (time.perf_counter() - start) / max(len(probes), 1)
+
+        timings, results = [], []
+        for _, job in queries:
+            start = time.perf_counter()
+            results.append(dedup.check(job))
+            timings.append(time.perf_counter() - start)
+        agree = sum((p.cluster if p.duplicate_of else None) == e for p, e in zip(results, expected))
+        timings.sort()
+        print(f"check(): median {statistics.median(timings) * 1e3:.2f} ms, "
+              f"p99 {timings[int(len(timings) * 0.99) - 1] * 1e3:.2f} ms over {len(timings)} new postings")
+        print(f"Brute-force scan: {scan * 1e3:.0f} ms per lookup over {len(history)} postings "
+              f"({scan / statistics.median(timings):.0f}x check()), same match for {agree}/{len(probes)}")
+        dedup.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# bench_extract.py - Job card extraction: per-element WebDriver calls vs one round-trip
+"""
+Compares the legacy per-card/per-selector find_element loop with the
+single execute_script extraction and the page_source parser mode.
+
+Usage:
+    python -m benchmarks.bench_extract [--latency-ms 2] [--repeat 20]
+"""
+import argparse, time
+from selenium.webdriver.common.by import By
+from benchmarks.fake_driver import FakeDriver, load_fixture
+from extract import LINKEDIN_SELECTORS, extract_job_cards, parse_job_cards
+
+SEARCH_URL = 'https://www.linkedin.com/jobs/'
+
+def legacy_extract(driver, selectors=LINKEDIN_SELECTORS):
+    """The pre-extract.py loop from search_linkedin_jobs, kept for comparison"""
+    job_cards = []
+    for selector in selectors.cards:
+        try:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                job_cards = elements
+                break
+        except Exception:
+            continue
+    jobs = []
+    for card in job_cards:
+        fields = {}
+        for key, sels in (('title', selectors.title), ('company', selectors.company)):
+            fields[key] = None
+            for sel in sels:
+                try:
+                    fields[key] = card.find_element(By.CSS_SELECTOR, sel).text
+                    if fields[key]:
+                        break
+                except Exception:
+                    continue
+        try:
+            fields['link'] = card.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
+        except Exception:
+            fields['link'] = None
+        jobs.append(fields)
+    return jobs
+
+def run(name, fn, driver, repeat):
+    driver.reset_counters()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        jobs = fn(driver)
+    elapsed = (time.perf_counter() - start) / repeat
+    trips = driver.round_trips / repeat
+    print(f"{name:<10} {len(jobs):>5} cards {trips:>8.0f} round-trips {elapsed * 1000:>9.2f} ms/page")
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='simulated chromedriver latency per call')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--fixture', default='linkedin_search.html')
+    args = parser.parse_args()
+
+    driver = FakeDriver(html=load_fixture(args.fixture), url=SEARCH_URL, latency=args.latency_ms / 1000.0)
+    print(f"Fixture: {args.fixture}, latency {args.latency_ms} ms/round-trip, {args.repeat} repeats")
+    legacy = run('legacy', legacy_extract, driver, max(1, args.repeat // 10))
+    script = run('script', lambda d: extract_job_cards(d), driver, args.repeat)
+    parsed = run('parser', lambda d: parse_job_cards(d.page_source, base_url=SEARCH_URL), driver, args.repeat)
+
+    strip = lambda jobs: [(j['title'] or None, j['company'] or None, j['link']) for j in jobs]
+    assert strip(legacy) == strip(script) == strip(parsed), "extraction modes disagree"
+    print("All modes returned identical records")
+
+if __name__ == '__main__':
+    main()
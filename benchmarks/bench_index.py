@@ -0,0 +1,43 @@
+# bench_index.py - JobIndex startup and lookup cost versus history size
+"""
+Builds a throwaway index with N past applications, then times opening it
+and looking jobs up, to show startup does not grow with history size.
+
+Usage:
+    python -m benchmarks.bench_index [--rows 100000]
+"""
+import argparse, os, tempfile, time
+from job_index import JobIndex
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'job_index.db')
+        index = JobIndex(path)
+        start = time.perf_counter()
+        with index._lock:
+            index._conn.executemany(
+                'INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)',
+                ((f'linkedin:{i}', 'success', 'Title', 'Company', f'https://www.linkedin.com/jobs/view/{i}/', '')
+                 for i in range(args.rows)),
+            )
+            index._conn.commit()
+        index.close()
+        print(f"Populated {args.rows} rows in {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        index = JobIndex(path)
+        print(f"Open:   {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        start = time.perf_counter()
+        hits = sum(index.is_done({'portal': 'linkedin', 'job_id': str(i * 7)}) for i in range(args.lookups))
+        elapsed = time.perf_counter() - start
+        print(f"Lookup: {elapsed / args.lookups * 1e6:.1f} us/job ({hits}/{args.lookups} already done)")
+        index.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# bench_log_stats.py - Dashboard backend cost on a large application log
+"""
+Writes an N-row application_log.csv, then times the first LogTail build,
+an incremental refresh after a few appended rows, and deep page lookups.
+
+Usage:
+    python -m benchmarks.bench_log_stats [--rows 1000000]
+"""
+import argparse, csv, os, random, tempfile, time
+from log_stats import LogTail
+from logger import FIELDNAMES
+
+STATUSES = ['success', 'failed', 'manual_required', 'partial']
+
+def write_rows(path, start, count, mode='a'):
+    rng = random.Random(start)
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if mode == 'w':
+            writer.writerow(FIELDNAMES)
+        for i in range(start, start + count):
+            status = rng.choice(STATUSES)
+            error = 'Message: timeout\n  (Session info: chrome=120.0)' if status == 'failed' else ''
+            writer.writerow([f'2026-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00', f'Engineer {i % 500}',
+                             f'Company {i % 3000}', f'https://www.linkedin.com/jobs/view/{i}/', status, error])
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<32} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'application_log.csv')
+        write_rows(path, 0, args.rows, mode='w')
+        print(f"{args.rows} rows, {os.path.getsize(path) / 1e6:.0f} MB")
+        tail = LogTail(path)
+        timed('initial build', tail.refresh)
+        write_rows(path, args.rows, 100)
+        timed('refresh after 100 appended rows', tail.refresh)
+        timed('refresh with no changes', tail.refresh)
+        timed('stats()', tail.stats)
+        timed('page 1 (newest 50)', lambda: tail.page(1, 50))
+        timed('page 10000 (50 per page)', lambda: tail.page(10000, 50))
+        result = timed('failed page 2000', lambda: tail.page(2000, 50, status='failed'))
+        assert all(row['status'] == 'failed' for row in result['rows'])
+        print(f"Index holds {len(tail.row_offsets)} rows in {tail.row_offsets.itemsize * len(tail.row_offsets) / 1e6:.0f} MB")
+
+if __name__ == '__main__':
+    main()
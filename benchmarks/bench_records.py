@@ -0,0 +1,107 @@
+# bench_records.py - Job record memory and bulk operations: per-job dicts vs JobRecord vs the columnar JobBatch
+"""
+Builds --records synthetic job cards the way a long search produces them:
+every title, company and link a fresh string parsed from the page, companies
+and portals repeating across rows. Holds them as the old per-job dicts, as
+JobRecords (slots, interned company/portal) and as one JobBatch, and reports
+the memory each takes (tracemalloc), then times scoring, a blocklist filter
+and a sort by score on dicts vs the batch, and the JSONL and Arrow hand-off
+files (write, read, size).
+
+Usage:
+    python -m benchmarks.bench_records [--records 1000000] [--companies 5000]
+"""
+import argparse, gc, os, random, tempfile, time, tracemalloc
+from job_records import JobBatch, JobRecord, read_jobs, write_jsonl
+from scoring import JobScorer
+
+WORDS = ['Python', 'Java', 'Backend', 'Data', 'Software', 'Platform', 'Cloud', 'Intern', 'Engineer', 'Developer',
+         'Senior', 'Junior', 'Analyst', 'Machine', 'Learning', 'QA', 'Automation', 'Full', 'Stack', 'Mobile']
+CITIES = ['Bangalore, Karnataka, India', 'Hyderabad, Telangana, India', 'Pune, Maharashtra, India', 'Remote']
+
+def fresh(text):
+    """A new string object with the same value, as each parsed page would give"""
+    return text.encode('utf-8').decode('utf-8')
+
+def cards(n, companies, rng):
+    names = [f'{rng.choice(WORDS)} {rng.choice(["Labs", "Systems", "Analytics", "Tech", "Works"])} {i}'
+             for i in range(companies)]
+    portals = ['linkedin', 'indeed']
+    for i in range(n):
+        portal = portals[i % 7 == 0]
+        yield {
+            'title': ' '.join(rng.sample(WORDS, 3)),
+            'company': fresh(rng.choice(names)),
+            'snippet': f'{rng.choice(CITIES)} (On-site)',
+            'link': f'https://www.{portal}.com/jobs/view/{3900000000 + i}/',
+            'portal': fresh(portal),
+            'job_id': str(3900000000 + i),
+        }
+
+def measure(build):
+    """(result, bytes allocated by build())"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40} {elapsed * 1000:>8.0f} ms  ({n / elapsed / 1e6:.2f} M rows/s)")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--companies', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    n = args.records
+
+    print(f"{n} job records, {args.companies} companies\n")
+    dicts, dict_bytes = measure(lambda: list(cards(n, args.companies, random.Random(args.seed))))
+    records, record_bytes = measure(lambda: [JobRecord(**card)
+                                             for card in cards(n, args.companies, random.Random(args.seed))])
+    batch, batch_bytes = measure(lambda: JobBatch(cards(n, args.companies, random.Random(args.seed))))
+    print(f"{'representation':<22} {'MB':>8} {'bytes/job':>10}")
+    for label, size in [('dicts', dict_bytes), ('JobRecord list', record_bytes), ('JobBatch', batch_bytes)]:
+        print(f"{label:<22} {size / 1e6:>8.1f} {size / n:>10.0f}  ({size / dict_bytes:.0%} of dicts)")
+    del records
+
+    scorer_options = dict(keywords=['python developer', 'data intern'], blocklist=['Labs 1', 'Tech 42'],
+                          exclude=['senior'], min_score=1)
+    print("\nBulk operations")
+    kept = timed('score+filter, dicts (select)', lambda: list(JobScorer(**scorer_options).select(dicts)), n)
+    scored = timed('score+filter, JobBatch.score', lambda: batch.score(JobScorer(**scorer_options)), n)
+    assert len(kept) == len(scored), (len(kept), len(scored))
+    blocklist = JobScorer(blocklist=['Systems']).blocklist
+    timed('blocklist filter, dicts', lambda: [d for d in dicts if not blocklist.search(d['company'])], n)
+    mask = timed('blocklist mask, JobBatch (per company)', lambda: batch.category_mask(
+        'company', lambda c: not blocklist.search(c)), n)
+    timed('blocklist filter, JobBatch (mask+take)', lambda: batch.filter(mask), n)
+    timed('sort by score, dicts', lambda: sorted(kept, key=lambda d: -d['score']), len(kept))
+    timed('sort by score, JobBatch.argsort', lambda: scored.argsort('score', reverse=True), len(scored))
+
+    print("\nHand-off files")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            timed('JSONL write', lambda: write_jsonl(batch, f), n)
+        timed('JSONL read', lambda: read_jobs(path), n)
+        print(f"  JSONL size {os.path.getsize(path) / 1e6:.1f} MB")
+        try:
+            JobBatch(dicts[:10]).to_arrow()  # pyarrow import and first-use setup, not per-file cost
+        except ImportError as e:
+            print(f"  Arrow skipped: {e}")
+            return
+        path = os.path.join(tmp, 'jobs.arrow')
+        timed('Arrow write', lambda: batch.write_arrow(path), n)
+        timed('Arrow read (JobBatch.read_arrow)', lambda: JobBatch.read_arrow(path), n)
+        print(f"  Arrow size {os.path.getsize(path) / 1e6:.1f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# bench_resume.py - Resume upload cost on a remote (Grid) browser: per-job transfer versus staged once per session
+"""
+Simulates --jobs applications on --sessions remote browser sessions with a
+--size-kb resume. The legacy path is what Selenium does for every send_keys of
+a local file to a remote browser: zip, base64-encode and POST the whole file.
+The staged path (resume_staging.py) encodes it once and uploads it once per
+session. Reports time and bytes sent per application, plus startup with a cold
+and a warm hash cache for --variants resume files.
+
+Usage:
+    python -m benchmarks.bench_resume [--jobs 200] [--sessions 4] [--size-kb 800] [--variants 3]
+"""
+import argparse, base64, io, logging, os, tempfile, time, zipfile
+from resume_staging import ResumeStaging, resume_variants
+
+class RemoteDriver:
+    """Stands in for a Remote WebDriver: counts the upload requests and bytes sent"""
+    _is_remote = True
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.uploads = 0
+        self.bytes_sent = 0
+
+    def execute(self, command, params):
+        self.uploads += 1
+        self.bytes_sent += len(params['file'])
+        return {'value': f'/tmp/upload-{self.session_id}/{command}'}
+
+def legacy_upload(driver, path):
+    """Selenium's WebElement._upload, run by send_keys for each application"""
+    path = os.path.abspath(path) if os.path.exists(path) else path
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipped:
+        zipped.write(path, os.path.basename(path))
+    return driver.execute('uploadFile', {'file': base64.encodebytes(buffer.getvalue()).decode('ascii')})['value']
+
+def write_resume(path, size):
+    # Incompressible body, like the images and fonts embedded in a real PDF
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.7\n' + os.urandom(size) + b'\n%%EOF\n')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--size-kb', type=int, default=800)
+    parser.add_argument('--variants', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f'resume-{i}.pdf') for i in range(args.variants)]
+        for path in paths:
+            write_resume(path, args.size_kb * 1024)
+        config = {'resume_path': paths[0], 'resumes': [{'path': p, 'keywords': [f'kw{i}']}
+                                                       for i, p in enumerate(paths[1:], 1)]}
+        cache = os.path.join(tmp, 'resume_cache.json')
+
+        start = time.perf_counter()
+        staging = ResumeStaging(resume_variants(config), cache)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        ResumeStaging(resume_variants(config), cache)
+        warm = time.perf_counter() - start
+        print(f"startup, {args.variants} resumes: cold cache {cold * 1000:>7.1f} ms, warm cache {warm * 1000:>6.2f} ms")
+
+        for name in ('legacy', 'staged'):
+            drivers = [RemoteDriver(f's{i}') for i in range(args.sessions)]
+            start = time.perf_counter()
+            for job in range(args.jobs):
+                driver = drivers[job % args.sessions]
+                if name == 'legacy':
+                    legacy_upload(driver, paths[0])
+                else:
+                    staging.upload_path(driver, staging.choose({'title': 'Python Developer'}))
+            elapsed = time.perf_counter() - start
+            sent = sum(d.bytes_sent for d in drivers)
+            uploads = sum(d.uploads for d in drivers)
+            print(f"{name}: {elapsed / args.jobs * 1000:>7.3f} ms/job  {sent / args.jobs / 1024:>8.1f} KB sent/job  "
+                  f"{uploads} uploads for {args.jobs} jobs on {args.sessions} sessions")
+
+if __name__ == '__main__':
+    main()
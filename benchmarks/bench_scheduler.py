@@ -0,0 +1,94 @@
+# bench_scheduler.py - Fixed versus adaptive pacing against a simulated rate-limiting portal
+"""
+Runs apply_batch_jobs over N jobs on a scripted fake portal with a simulated
+clock (no real waiting). The portal answers every job page after `--load-sec`
+simulated seconds, and shows a "you've reached the limit" banner instead of the
+job whenever more than `--site-limit` jobs were opened in the last hour.
+Reports achieved jobs/hour, how many job pages were wasted on the banner, and
+the useful rate (jobs that got a real job page) per hour.
+
+Usage:
+    python -m benchmarks.bench_scheduler [--jobs 300] [--site-limit 150]
+"""
+import argparse, logging, os, tempfile
+from collections import deque
+from apply_jobs import apply_batch_jobs
+from scheduler import AdaptiveScheduler, SimulatedClock
+from benchmarks.fake_driver import FakeDriver, load_fixture
+
+UNLIMITED = {'portal_jobs_per_hour': 10 ** 9, 'session_jobs_per_hour': 10 ** 9}
+
+class FixedScheduler(AdaptiveScheduler):
+    """The old pacing: a random between_jobs_sec wait, whatever the pages show"""
+
+    def record(self, session, status, signals=None):
+        with self._lock:
+            self.completed += 1
+            self.last_finished[session] = self.clock.now()
+
+class RateLimitedPortal(FakeDriver):
+    """Serves the job page, or the limit banner once too many pages were opened within an hour"""
+
+    def __init__(self, clock, site_limit, load_sec):
+        super().__init__()
+        self.clock = clock
+        self.site_limit = site_limit
+        self.load_sec = load_sec
+        self.opened = deque()
+        self.limited = 0
+        self.job_page = load_fixture('linkedin_job_external.html')
+        self.banner = load_fixture('linkedin_rate_limited.html')
+
+    def get(self, url):
+        self._command('get')
+        self.clock.sleep(self.load_sec)
+        now = self.clock.now()
+        while self.opened and now - self.opened[0] > 3600:
+            self.opened.popleft()
+        self.opened.append(now)
+        self.current_url = url
+        self.page_load_sec = self.load_sec
+        if len(self.opened) > self.site_limit:
+            self.limited += 1
+            self._set_html(self.banner)
+        else:
+            self._set_html(self.job_page)
+
+def simulate(name, scheduler_class, pacing, args, tmp):
+    clock = SimulatedClock()
+    driver = RateLimitedPortal(clock, args.site_limit, args.load_sec)
+    config = {
+        'job_portal': 'LinkedIn', 'between_jobs_sec': [10, 20], 'pacing': pacing,
+        'jitter_sec': {'default': [0.5, 2]}, 'wait_timeout_sec': 0.05, 'optional_wait_timeout_sec': 0.01,
+        'wait_poll_sec': 0.001,
+        'detail_cache': False, 'csv_log_file': os.path.join(tmp, f'{name}.csv'),
+    }
+    jobs = [{'title': f'Job {i}', 'company': 'Acme', 'portal': 'LinkedIn', 'job_id': str(i),
+             'link': f'https://www.linkedin.com/jobs/view/{i}/'} for i in range(args.jobs)]
+    scheduler = scheduler_class(config, clock=clock)
+    apply_batch_jobs(driver, jobs, config, scheduler=scheduler)
+    report = scheduler.report()
+    hours = clock.now() / 3600
+    print(f"{name:<9} {report['jobs_per_hour']:>7.1f} jobs/h  {(args.jobs - driver.limited) / hours:>7.1f} useful/h  "
+          f"{hours:5.2f} h simulated  {driver.limited:>4} pages wasted on the limit banner  "
+          f"final interval {report['interval_sec']:.0f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=300)
+    parser.add_argument('--site-limit', type=int, default=150, help='job pages per hour before the banner')
+    parser.add_argument('--load-sec', type=float, default=3.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        simulate('fixed', FixedScheduler, UNLIMITED, args, tmp)
+        simulate('adaptive', AdaptiveScheduler, {}, args, tmp)
+        # Unthrottled site: the adaptive pace should shrink toward min_interval_sec
+        args.site_limit = 10 ** 9
+        simulate('fixed*', FixedScheduler, UNLIMITED, args, tmp)
+        simulate('adaptive*', AdaptiveScheduler, {}, args, tmp)
+    print("* no site limit")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# bench_scoring.py - JobScorer throughput on synthetic job cards
+"""
+Scores N synthetic job cards (title, company, snippet) with the keywords,
+exclude list and blocklist below, and reports records per second. Each job the
+pre-filter drops saves a job page load and an Easy Apply attempt (10+ s).
+
+Usage:
+    python -m benchmarks.bench_scoring [--jobs 100000] [--top-k 50]
+"""
+import argparse, random, time
+from scoring import JobScorer
+
+KEYWORDS = ['Software Intern', 'Python', 'Backend', 'Machine Learning', 'Data Engineer']
+EXCLUDE = ['senior', 'staff', 'principal', 'lead', 'manager']
+BLOCKLIST = ['Initech', 'Globex Corporation']
+
+TITLES = ['Software Engineering Intern', 'Python Developer Intern', 'Backend Engineer', 'Senior Backend Engineer',
+          'Data Engineer', 'Machine Learning Intern', 'Frontend Developer', 'Staff Software Engineer',
+          'QA Analyst', 'Product Manager', 'DevOps Intern', 'Full Stack Developer']
+COMPANIES = ['Acme Labs', 'Umbrella Analytics', 'Wayne Tech', 'Initech', 'Globex Corporation', 'Stark Industries',
+             'Hooli', 'Pied Piper', 'Massive Dynamic', 'Soylent Systems']
+SNIPPETS = ['Bangalore, Karnataka, India (On-site)', 'Remote - Python, Django, PostgreSQL',
+            'Hybrid - machine learning platform team', 'Bengaluru (Hybrid) - Easy Apply', '']
+
+def synthetic_jobs(n, seed=0):
+    rng = random.Random(seed)
+    return [{'title': rng.choice(TITLES), 'company': rng.choice(COMPANIES), 'snippet': rng.choice(SNIPPETS),
+             'link': f'https://www.linkedin.com/jobs/view/{i}/', 'portal': 'LinkedIn', 'job_id': str(i)}
+            for i in range(n)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--top-k', type=int, default=50)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs)
+    start = time.perf_counter()
+    scorer = JobScorer(KEYWORDS, exclude=EXCLUDE, blocklist=BLOCKLIST, min_score=1, top_k=args.top_k)
+    print(f"Compile: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    for job in jobs:
+        scorer.score(job)
+    elapsed = time.perf_counter() - start
+    print(f"score():  {args.jobs / elapsed:,.0f} jobs/s")
+
+    start = time.perf_counter()
+    selected = list(scorer.select(jobs))
+    elapsed = time.perf_counter() - start
+    print(f"select(): {args.jobs / elapsed:,.0f} jobs/s (exclude + blocklist + threshold + top {args.top_k})")
+    print(f"Kept {scorer.stats['kept']}, excluded {scorer.stats['excluded']}, "
+          f"blocklisted {scorer.stats['blocklisted']}, below threshold {scorer.stats['below_threshold']}; "
+          f"best: {selected[0]['title']} at {selected[0]['company']} ({selected[0]['score']:.1f})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# bench_startup.py - Browser startup: fresh login vs reused profile, page-load strategy and resource blocking
+"""
+Serves a local stand-in portal (a login page, and a home page with images, web
+fonts and a video whose downloads are slowed by --asset-delay-ms) and measures
+driver startup the way driver_factory does it, with real Chrome:
+
+  cold      fresh profile, no options: login needed (done automatically here)
+  profile   reused profile: the saved session is detected, no login prompt
+  eager     + page_load_strategy "eager"
+  blocked   + images, fonts and media blocked
+
+Each scenario reports Chrome launch, login/session check and first page load
+time (median of --runs). A real login adds the minutes a person spends at the
+prompt to the cold row. Needs Chrome and chromedriver.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 3] [--asset-delay-ms 150] [--headed]
+"""
+import argparse, logging, os, statistics, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium.common.exceptions import NoSuchDriverException, SessionNotCreatedException
+from driver_factory import block_resources, ensure_logged_in, start_driver
+from portals import PortalAdapter, get_adapter, register_portal
+from waits import css
+
+IMAGES = 12
+HOME_PAGE = """<!doctype html><html><head><title>Stand-in portal</title><style>
+@font-face {{ font-family: Brand; src: url(/static/brand.woff2) format("woff2"); }}
+@font-face {{ font-family: BrandBold; src: url(/static/brand-bold.woff2) format("woff2"); }}
+body {{ font-family: Brand, sans-serif; }} h1 {{ font-family: BrandBold, sans-serif; }}
+</style></head><body>
+<nav><a id="nav-me" href="/me">Me</a></nav><h1>Jobs for you</h1>
+{images}
+<video src="/static/intro.mp4" autoplay muted></video>
+</body></html>"""
+LOGIN_PAGE = """<!doctype html><html><body><form action="/session" method="get">
+<input name="user"><input name="password" type="password"><button id="sign-in">Sign in</button>
+</form></body></html>"""
+
+class StandInAdapter(PortalAdapter):
+    name = 'standin'
+    display_name = 'Stand-in'
+    session_cookies = ('session',)
+    logged_in_locators = css('#nav-me')
+    login_paths = ('/login',)
+
+def make_handler(asset_delay):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def send(self, status, body=b'', content_type='text/html', headers=()):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')  # every run downloads the assets again
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/':
+                if 'session=ok' not in (self.headers.get('Cookie') or ''):
+                    return self.send(302, headers=[('Location', '/login')])
+                images = '\n'.join(f'<img src="/static/photo-{i}.jpg" width="64">' for i in range(IMAGES))
+                return self.send(200, HOME_PAGE.format(images=images).encode())
+            if path == '/login':
+                return self.send(200, LOGIN_PAGE.encode())
+            if path == '/session':
+                return self.send(302, headers=[('Location', '/'),
+                                               ('Set-Cookie', 'session=ok; Max-Age=86400; Path=/')])
+            if path.startswith('/static/'):
+                time.sleep(asset_delay)
+                types = {'.jpg': 'image/jpeg', '.woff2': 'font/woff2', '.mp4': 'video/mp4'}
+                return self.send(200, b'\0' * 20000, types.get(os.path.splitext(path)[1], 'application/octet-stream'))
+            self.send(404)
+    return Handler
+
+def auto_login(driver, base_url):
+    """Stands in for the person at the prompt: submit the login form"""
+    def wait_for_login(portal):
+        driver.get(f'{base_url}/login')
+        driver.find_element('css selector', '#sign-in').click()
+    return wait_for_login
+
+def run_once(browser, profile_dir, base_url, headed):
+    config = {'browser': dict(browser, session_check_sec=2), 'wait_timeout_sec': 5, 'selector_stats': False}
+    if not headed:
+        # Passed as a raw argument so ensure_logged_in still takes the (automated) prompt path
+        config['browser']['arguments'] = ['--headless=new']
+    start = time.perf_counter()
+    driver = start_driver(config, profile_dir)
+    launched = time.perf_counter()
+    try:
+        reused = ensure_logged_in(driver, 'standin', config, wait_for_login=auto_login(driver, base_url))
+        logged_in = time.perf_counter()
+        if browser['block_resources']:
+            block_resources(driver, browser['block_resources'], get_adapter('standin'))
+        driver.get(f'{base_url}/')
+        loaded = time.perf_counter()
+    finally:
+        driver.quit()
+    return {'launch': launched - start, 'login': logged_in - launched, 'page': loaded - logged_in,
+            'total': loaded - start, 'reused': reused}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--asset-delay-ms', type=float, default=150.0, help='server delay per image/font/video')
+    parser.add_argument('--headed', action='store_true', help='show the browser windows')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.asset_delay_ms / 1000.0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    StandInAdapter.home_url = f'{base_url}/'
+    register_portal('standin', StandInAdapter)
+
+    plain = {'page_load_strategy': 'normal', 'block_resources': []}
+    scenarios = [
+        ('cold', plain, False),
+        ('profile', plain, True),
+        ('eager', {'page_load_strategy': 'eager', 'block_resources': []}, True),
+        ('blocked', {'page_load_strategy': 'eager', 'block_resources': ['images', 'fonts', 'media']}, True),
+    ]
+    print(f"{'scenario':<9} {'launch s':>8} {'login s':>8} {'page s':>8} {'total s':>8}  login prompt")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            saved_profile = os.path.join(tmp, 'saved')
+            for name, browser, reuse in scenarios:
+                runs = []
+                for i in range(args.runs):
+                    profile_dir = saved_profile if reuse else os.path.join(tmp, f'fresh-{i}')
+                    runs.append(run_once(browser, profile_dir, base_url, args.headed))
+                    if not reuse and i == 0:
+                        run_once(browser, saved_profile, base_url, args.headed)  # log the saved profile in
+                median = {k: statistics.median(r[k] for r in runs) for k in ('launch', 'login', 'page', 'total')}
+                prompt = 'reused session' if all(r['reused'] for r in runs) else 'required'
+                print(f"{name:<9} {median['launch']:>8.2f} {median['login']:>8.2f} {median['page']:>8.2f} "
+                      f"{median['total']:>8.2f}  {prompt}")
+    except (NoSuchDriverException, SessionNotCreatedException) as e:
+        raise SystemExit(f"Chrome could not be started ({type(e).__name__}); this benchmark needs Chrome and chromedriver")
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
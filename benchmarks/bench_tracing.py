@@ -0,0 +1,65 @@
+# bench_tracing.py - Cost of the tracing spans, disabled and enabled
+"""
+Measures what instrumentation costs: the time per `with span(...)` block with
+tracing off (the shared no-op) and on (JSONL plus Chrome trace export), and the
+offline replay (benchmarks/replay.py) throughput with tracing off and on.
+Prints the run summary of the traced replay.
+
+Usage:
+    python -m benchmarks.bench_tracing [--calls 1000000] [--rounds 5]
+"""
+import argparse, logging, os, statistics, tempfile, time
+import tracing
+from tracing import configure_tracing, finish_tracing, span
+from benchmarks.replay import SCENARIOS, replay
+
+def per_call_ns(calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        with span('bench', 'step'):
+            pass
+    return (time.perf_counter_ns() - start) / calls
+
+def empty_loop_ns(calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        pass
+    return (time.perf_counter_ns() - start) / calls
+
+def replay_rate(rounds):
+    """Median jobs/s over the replay scenarios, `rounds` times"""
+    rates = []
+    for _ in range(rounds):
+        rates.extend(replay(name, latency=0.0)['jobs_per_sec'] for name in sorted(SCENARIOS))
+    return statistics.median(rates)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1000000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {'tracing': {'file': os.path.join(tmp, 'trace.jsonl'),
+                              'chrome_trace': os.path.join(tmp, 'trace.json'), 'summary': False}}
+        loop = empty_loop_ns(args.calls)
+        off = per_call_ns(args.calls) - loop
+        configure_tracing(config)
+        on = per_call_ns(args.calls // 10) - loop
+        finish_tracing()
+        print(f"span, tracing off: {off:>8.0f} ns/call")
+        print(f"span, tracing on:  {on:>8.0f} ns/call (recorded, exported)")
+
+        rate_off = replay_rate(args.rounds)
+        configure_tracing(config)
+        rate_on = replay_rate(args.rounds)
+        spans = sum(count for count, _, _ in tracing._tracer.totals.values())
+        summary = finish_tracing()
+        print(f"replay, tracing off: {rate_off:>7.1f} jobs/s")
+        print(f"replay, tracing on:  {rate_on:>7.1f} jobs/s ({spans} spans, {rate_on / rate_off - 1:+.1%})")
+        print()
+        print(summary)
+
+if __name__ == '__main__':
+    main()
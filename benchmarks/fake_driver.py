@@ -0,0 +1,291 @@
+# fake_driver.py - WebDriver stand-in backed by recorded HTML that counts round-trips
+import os, time
+from collections import Counter
+from urllib.parse import urljoin
+from selenium.common.exceptions import NoSuchElementException, InvalidSelectorException
+from selenium.webdriver.common.by import By
+import easy_apply, extract, job_details, scheduler
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def load_fixture(name):
+    """Read a recorded page from benchmarks/fixtures"""
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _css_for(by, value):
+    if by == By.CSS_SELECTOR:
+        return value
+    if by == By.TAG_NAME:
+        return value
+    if by == By.ID:
+        return f'#{value}'
+    if by == By.CLASS_NAME:
+        return f'.{value}'
+    return None
+
+def _compile(by, value):
+    css = _css_for(by, value)
+    if css is None:
+        raise InvalidSelectorException(f"FakeDriver does not support locator {by}")
+    try:
+        return extract.CompiledSelector(css)
+    except extract.InvalidSelector as e:
+        raise InvalidSelectorException(str(e))
+
+class FakeElement:
+    """A WebElement over a parsed Node; every call is a counted round-trip"""
+
+    def __init__(self, driver, node):
+        self._driver = driver
+        self.node = node
+
+    def find_elements(self, by=By.ID, value=None):
+        self._driver._command('findChildElements')
+        return [FakeElement(self._driver, n) for n in _compile(by, value).select_all(self.node)]
+
+    def find_element(self, by=By.ID, value=None):
+        self._driver._command('findChildElement')
+        node = _compile(by, value).select_one(self.node)
+        if node is None:
+            raise NoSuchElementException(f"no such element: {value}")
+        return FakeElement(self._driver, node)
+
+    @property
+    def text(self):
+        self._driver._command('getElementText')
+        return self.node.text
+
+    def get_attribute(self, name):
+        self._driver._command('getElementAttribute')
+        value = self.node.attrs.get(name)
+        if name in ('href', 'src') and value:
+            return urljoin(self._driver.current_url, value)  # property semantics, like Selenium
+        return value
+
+    def is_displayed(self):
+        self._driver._command('isElementDisplayed')
+        return True
+
+    def is_enabled(self):
+        self._driver._command('isElementEnabled')
+        return 'disabled' not in self.node.attrs
+
+    def click(self):
+        self._driver._command('clickElement')
+        self._driver.clicks.append(self.node)
+        # Recorded multi-page flows: a click on an element with data-fake-goto loads that page
+        target = self.node.attrs.get('data-fake-goto')
+        if target:
+            self._driver._set_html(self._driver.pages.get(target) or load_fixture(target))
+
+    def send_keys(self, *value):
+        self._driver._command('sendKeysToElement')
+        self.node.attrs['value'] = ''.join(str(v) for v in value)
+
+class FakeDriver:
+    """
+    Serves recorded pages instead of talking to chromedriver.
+    `pages` maps URL (or URL prefix) to HTML; `latency` (seconds) is added to each round-trip.
+    Scripts are answered by Python handlers registered in `script_handlers` by source text.
+    `page_load_sec` is what the page reports as its own load time (page signals).
+    """
+    script_handlers = {}
+    page_load_sec = None
+
+    def __init__(self, pages=None, html='', url='about:blank', latency=0.0):
+        self.pages = dict(pages or {})
+        self.latency = latency
+        self.round_trips = 0
+        self.commands = Counter()
+        self.clicks = []
+        self.current_url = url
+        self._set_html(html)
+
+    def _command(self, name):
+        self.round_trips += 1
+        self.commands[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _set_html(self, html):
+        self._html = html
+        self._root = extract.parse_html(html)
+
+    def _lookup(self, url):
+        if url in self.pages:
+            return self.pages[url]
+        base = url.split('?', 1)[0]
+        if base in self.pages:
+            return self.pages[base]
+        prefixes = [p for p in self.pages if url.startswith(p)]
+        return self.pages[max(prefixes, key=len)] if prefixes else '<html><body></body></html>'
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.commands.clear()
+
+    def get(self, url):
+        self._command('get')
+        self.current_url = url
+        self._set_html(self._lookup(url))
+
+    @property
+    def page_source(self):
+        self._command('getPageSource')
+        return self._html
+
+    def find_elements(self, by=By.ID, value=None):
+        self._command('findElements')
+        return [FakeElement(self, n) for n in _compile(by, value).select_all(self._root)]
+
+    def find_element(self, by=By.ID, value=None):
+        self._command('findElement')
+        node = _compile(by, value).select_one(self._root)
+        if node is None:
+            raise NoSuchElementException(f"no such element: {value}")
+        return FakeElement(self, node)
+
+    def execute_script(self, script, *args):
+        self._command('executeScript')
+        handler = self.script_handlers.get(script)
+        return handler(self, *args) if handler else None
+
+    def quit(self):
+        self._command('quit')
+
+def _job_cards_handler(driver, card_sels, title_sels, company_sels, snippet_sels, link_sels, id_attr, limit):
+    selectors = extract.SelectorSet(tuple(card_sels), tuple(title_sels), tuple(company_sels),
+                                    tuple(snippet_sels), tuple(link_sels), id_attr)
+    return extract.extract_from_tree(driver._root, selectors, limit=limit or None, base_url=driver.current_url)
+
+CAPTCHA_SELECTOR = 'iframe[src*="captcha"], iframe[title*="challenge"], #captcha-internal, .g-recaptcha, [data-sitekey]'
+LIMIT_PHRASES = ("you've reached the", "reached the limit", "too many requests", "try again later", "unusual activity")
+
+def _page_signals_handler(driver):
+    text = driver._root.text.lower()
+    return {
+        'rate_limited': any(phrase in text for phrase in LIMIT_PHRASES),
+        'captcha': _query_first(driver._root, CAPTCHA_SELECTOR) is not None,
+        'load_sec': driver.page_load_sec,
+    }
+
+def _query_first(root, selector_list):
+    for sel in selector_list.split(','):
+        node = extract.CompiledSelector(sel.strip()).select_one(root)
+        if node is not None:
+            return node
+    return None
+
+def _label_for(modal, el):
+    if el.attrs.get('id'):
+        label = extract.CompiledSelector(f'label[for="{el.attrs["id"]}"]').select_one(modal)
+        if label is not None:
+            return label.text
+    parent = el.parent
+    while parent is not None:
+        if parent.tag == 'label':
+            return parent.text
+        parent = parent.parent
+    fallback = el.attrs.get('value') if el.attrs.get('type') == 'radio' else el.attrs.get('name')
+    return el.attrs.get('aria-label') or el.attrs.get('placeholder') or fallback or ''
+
+def _form_elements(modal):
+    return [n for n in modal.iter_descendants() if n.tag in ('input', 'select', 'textarea')]
+
+def _options(select):
+    return [n for n in select.iter_descendants() if n.tag == 'option']
+
+def _form_page_handler(driver, modal_selector):
+    modal = _query_first(driver._root, modal_selector) or driver._root
+    fields, radios = [], {}
+    for i, el in enumerate(_form_elements(modal)):
+        kind = el.attrs.get('type', '').lower()
+        if kind in ('hidden', 'file', 'submit', 'button') or 'disabled' in el.attrs:
+            continue
+        required = 'required' in el.attrs or el.attrs.get('aria-required') == 'true'
+        if kind == 'radio':
+            key = 'radio:' + el.attrs.get('name', '')
+            if key not in radios:
+                legend, parent = None, el.parent
+                while parent is not None and legend is None:
+                    if parent.tag == 'fieldset':
+                        legend = extract.CompiledSelector('legend').select_one(parent)
+                    parent = parent.parent
+                radios[key] = {'key': key, 'kind': 'radio', 'question': legend.text if legend else key[6:],
+                               'value': None, 'options': [], 'required': required}
+                fields.append(radios[key])
+            radios[key]['options'].append(_label_for(modal, el))
+            if 'checked' in el.attrs:
+                radios[key]['value'] = _label_for(modal, el)
+            continue
+        if el.tag == 'select':
+            options = _options(el)
+            chosen = next((o for o in options if 'selected' in o.attrs), options[0] if options else None)
+            value = chosen.text if chosen is not None and chosen.attrs.get('value') else ''
+            fields.append({'key': str(i), 'kind': 'select', 'question': _label_for(modal, el), 'value': value,
+                           'options': [o.text for o in options], 'required': required})
+        else:
+            value = ('yes' if 'checked' in el.attrs else '') if kind == 'checkbox' else el.attrs.get('value', '')
+            fields.append({'key': str(i), 'kind': 'checkbox' if kind == 'checkbox' else 'text',
+                           'question': _label_for(modal, el), 'value': value, 'options': None, 'required': required})
+    heading = _query_first(modal, 'h3, h2')
+    progress = _query_first(modal, '[role="progressbar"], progress')
+    return {
+        'heading': heading.text if heading is not None else '',
+        'progress': (progress.attrs.get('aria-valuenow') or progress.attrs.get('value') or '') if progress is not None else '',
+        'errors': len(extract.CompiledSelector('.artdeco-inline-feedback--error').select_all(modal)),
+        'fields': fields,
+    }
+
+def _fill_fields_handler(driver, modal_selector, fills):
+    modal = _query_first(driver._root, modal_selector) or driver._root
+    elements = _form_elements(modal)
+    norm = lambda s: ' '.join((s or '').split()).lower()
+    failed = []
+    for fill in fills:
+        key, want = fill['key'], norm(fill['value'])
+        if key.startswith('radio:'):
+            group = [el for el in elements if el.attrs.get('type') == 'radio' and el.attrs.get('name') == key[6:]]
+            match = next((el for el in group if norm(_label_for(modal, el)) == want), None) or \
+                next((el for el in group if norm(_label_for(modal, el)).startswith(want)), None)
+            if match is None:
+                failed.append(key)
+                continue
+            for el in group:
+                el.attrs.pop('checked', None)
+            match.attrs['checked'] = ''
+            continue
+        el = elements[int(key)] if int(key) < len(elements) else None
+        if el is None:
+            failed.append(key)
+        elif el.tag == 'select':
+            options = _options(el)
+            opt = next((o for o in options if norm(o.text) == want), None) or \
+                next((o for o in options if norm(o.text).startswith(want)), None)
+            if opt is None:
+                failed.append(key)
+                continue
+            for o in options:
+                o.attrs.pop('selected', None)
+            opt.attrs['selected'] = ''
+        elif el.attrs.get('type') == 'checkbox':
+            checked = want in ('yes', 'y', 'true', '1', 'on', 'checked', 'agree', 'i agree')
+            if 'disabled' not in el.attrs:  # a click toggles it
+                if checked:
+                    el.attrs['checked'] = ''
+                else:
+                    el.attrs.pop('checked', None)
+            if ('checked' in el.attrs) != checked:
+                failed.append(key)
+        else:
+            el.attrs['value'] = fill['value']
+    return failed
+
+FakeDriver.script_handlers[extract.JOB_CARDS_SCRIPT] = _job_cards_handler
+FakeDriver.script_handlers[easy_apply.FORM_PAGE_SCRIPT] = _form_page_handler
+FakeDriver.script_handlers[easy_apply.FILL_FIELDS_SCRIPT] = _fill_fields_handler
+FakeDriver.script_handlers[job_details.JOB_DETAILS_SCRIPT] = lambda driver, *selectors: \
+    job_details.extract_details_from_tree(driver._root, job_details.DetailSelectors(*selectors))
+FakeDriver.script_handlers[scheduler.PAGE_SIGNALS_SCRIPT] = _page_signals_handler
+FakeDriver.script_handlers['return document.readyState'] = lambda driver: 'complete'
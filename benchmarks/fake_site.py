@@ -0,0 +1,42 @@
+# fake_site.py - Recorded LinkedIn pages and a delay-free config for runs on FakeDriver (benchmarks and tests)
+import os
+from benchmarks.fake_driver import load_fixture
+
+ANSWERS = {'phone': '5550100', 'years of work experience': '1', 'years of experience': '1',
+           'sponsorship': 'No', 'notice period': 'Immediate'}
+
+FIRST_JOB_ID = 3900000000
+JOB_ID_STEP = 17  # job ids in linkedin_search.html
+
+def fake_config(overrides, tmp, name):
+    """A config with every delay stubbed out and all run state in `tmp`"""
+    config = {
+        'filters': {'keywords': ['Python'], 'location': 'Bangalore'},
+        'answers': ANSWERS, 'answers_file': os.path.join(tmp, f'{name}-answers.jsonl'),
+        'resume_path': '',
+        'jitter_sec': {'default': [0, 0], 'after_submit': [0, 0]},
+        'wait_timeout_sec': 1, 'optional_wait_timeout_sec': 0.2, 'wait_poll_sec': 0.001,
+        'max_search_pages': 2, 'max_applications': None,
+        'between_jobs_sec': [10, 20],
+        'csv_log_file': os.path.join(tmp, f'{name}.csv'),
+        # Learned selector order and cached job pages would make round-trips depend on earlier runs
+        'selector_stats': False, 'detail_cache': False,
+        # The recorded search pages repeat each title and company under several job IDs
+        'dedup': False,
+    }
+    config.update(overrides)
+    return config
+
+def linkedin_pages(external_every=0):
+    """
+    The recorded LinkedIn search page and Easy Apply job page for every job on it;
+    every `external_every`'th job applies on the company website instead (0: none)
+    """
+    pages = {
+        'https://www.linkedin.com/jobs/search/': load_fixture('linkedin_search.html'),
+        'https://www.linkedin.com/jobs/view/': load_fixture('linkedin_job_easy_apply.html'),
+    }
+    external = load_fixture('linkedin_job_external.html')
+    for n in range(0, 30, external_every) if external_every else ():
+        pages[f'https://www.linkedin.com/jobs/view/{FIRST_JOB_ID + n * JOB_ID_STEP}/'] = external
+    return pages
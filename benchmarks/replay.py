@@ -0,0 +1,154 @@
+# replay.py - Offline end-to-end replay of search and apply against recorded pages, with a regression gate
+"""
+Drives scraper.search_jobs -> apply_jobs.apply_batch_jobs end-to-end against the
+recorded search, job and application pages in benchmarks/fixtures (served by
+FakeDriver, no network and no browser). Human-like jitter is zeroed and the
+pacing scheduler runs on a simulated clock, so nothing sleeps. Reports per stage
+the WebDriver round-trips and wall time, and jobs per second overall.
+
+With --check, the run is compared with benchmarks/replay_baseline.json and the
+exit status is 1 if a round-trip count grew by more than --threshold, or any
+application status changed. Wall-time metrics vary between machines and are
+only compared with --check-time (at --time-threshold). --update-baseline
+records the current run as the new baseline.
+
+Usage:
+    python -m benchmarks.replay [--check] [--threshold 0.05] [--check-time] [--update-baseline]
+"""
+import argparse, json, logging, os, sys, tempfile, time
+from apply_jobs import apply_batch_jobs
+from scheduler import AdaptiveScheduler, SimulatedClock
+from scraper import search_jobs
+from benchmarks.fake_driver import FakeDriver, load_fixture
+from benchmarks.fake_site import fake_config
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'replay_baseline.json')
+
+# Scenario name -> (config overrides, URL prefix -> fixture)
+SCENARIOS = {
+    'linkedin': ({'job_portal': 'LinkedIn'}, {
+        'https://www.linkedin.com/jobs/search/': 'linkedin_search.html',
+        'https://www.linkedin.com/jobs/view/': 'linkedin_job_easy_apply.html',
+    }),
+    'linkedin-parser': ({'job_portal': 'LinkedIn', 'extraction_mode': 'parser'}, {
+        'https://www.linkedin.com/jobs/search/': 'linkedin_search.html',
+        'https://www.linkedin.com/jobs/view/': 'linkedin_job_easy_apply.html',
+    }),
+    'indeed': ({'job_portal': 'Indeed'}, {
+        'https://www.indeed.com/jobs': 'indeed_search.html',
+        'https://www.indeed.com/viewjob': 'indeed_job_apply.html',
+    }),
+}
+
+# Metrics where a larger value is a regression; wall-time ones are only gated with --check-time
+ROUND_TRIP_METRICS = ('search_round_trips', 'apply_round_trips_per_job')
+TIME_METRICS = ('search_sec', 'apply_sec_per_job')
+
+def replay(name, latency):
+    """Run one scenario; returns its metrics"""
+    overrides, fixtures = SCENARIOS[name]
+    pages = {prefix: load_fixture(fixture) for prefix, fixture in fixtures.items()}
+    driver = FakeDriver(pages=pages, latency=latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = fake_config(overrides, tmp, name)
+        clock = SimulatedClock()
+        scheduler = AdaptiveScheduler(config, clock=clock)
+
+        start = time.perf_counter()
+        jobs = search_jobs(driver, config)
+        searched = time.perf_counter()
+        search_round_trips = driver.round_trips
+        driver.reset_counters()
+
+        results = apply_batch_jobs(driver, jobs, config, scheduler=scheduler)
+        applied = time.perf_counter()
+
+    count = max(len(jobs), 1)
+    return {
+        'jobs': len(jobs),
+        'statuses': results,
+        'search_round_trips': search_round_trips,
+        'apply_round_trips_per_job': round(driver.round_trips / count, 2),
+        'apply_commands_per_job': {k: round(v / count, 2) for k, v in sorted(driver.commands.items())},
+        'search_sec': round(searched - start, 4),
+        'apply_sec_per_job': round((applied - searched) / count, 4),
+        'jobs_per_sec': round(len(jobs) / (applied - start), 2) if applied > start else 0.0,
+        'simulated_pacing_sec': round(clock.now(), 1),
+    }
+
+def compare(name, baseline, current, threshold, time_threshold=None):
+    """Regression messages for one scenario (empty when it is within the thresholds)"""
+    problems = []
+    if current['jobs'] != baseline['jobs']:
+        problems.append(f"{name}: found {current['jobs']} jobs, baseline {baseline['jobs']}")
+    if current['statuses'] != baseline['statuses']:
+        problems.append(f"{name}: statuses {current['statuses']}, baseline {baseline['statuses']}")
+    gated = [(m, threshold) for m in ROUND_TRIP_METRICS]
+    if time_threshold is not None:
+        gated += [(m, time_threshold) for m in TIME_METRICS]
+    for metric, limit in gated:
+        old, new = baseline[metric], current[metric]
+        if old and (new - old) / old > limit:
+            problems.append(f"{name}: {metric} {new} vs baseline {old} (+{(new - old) / old:.0%}, limit {limit:.0%})")
+    return problems
+
+def format_row(name, metrics, baseline=None):
+    def change(metric):
+        if not baseline or not baseline.get(metric):
+            return ''
+        return f" ({(metrics[metric] - baseline[metric]) / baseline[metric]:+.0%})"
+    statuses = ' '.join(f"{k}={v}" for k, v in metrics['statuses'].items() if v)
+    return (f"{name:<16} {metrics['jobs']:>4} jobs  search {metrics['search_round_trips']:>4} trips"
+            f"{change('search_round_trips')} {metrics['search_sec'] * 1000:>7.1f} ms  "
+            f"apply {metrics['apply_round_trips_per_job']:>6.1f} trips/job{change('apply_round_trips_per_job')} "
+            f"{metrics['apply_sec_per_job'] * 1000:>7.1f} ms/job  {metrics['jobs_per_sec']:>7.1f} jobs/s  "
+            f"(live pacing {metrics['simulated_pacing_sec'] / 60:.0f} min)  {statuses}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='default: all')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='simulated chromedriver latency per call')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--check', action='store_true', help='exit 1 on a regression against the baseline')
+    parser.add_argument('--threshold', type=float, default=0.05, help='allowed round-trip growth (fraction)')
+    parser.add_argument('--check-time', action='store_true', help='also gate wall-time metrics')
+    parser.add_argument('--time-threshold', type=float, default=0.5, help='allowed wall-time growth (fraction)')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--json', action='store_true', help='print the metrics as JSON')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    current = {name: replay(name, args.latency_ms / 1000.0) for name in (args.scenario or sorted(SCENARIOS))}
+    if args.json:
+        print(json.dumps(current, indent=2))
+    else:
+        for name, metrics in current.items():
+            print(format_row(name, metrics, baseline.get(name)))
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(baseline, **current), f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        problems = []
+        for name, metrics in current.items():
+            if name not in baseline:
+                problems.append(f"{name}: no baseline (run with --update-baseline)")
+                continue
+            problems += compare(name, baseline[name], metrics, args.threshold,
+                                args.time_threshold if args.check_time else None)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == '__main__':
+    main()
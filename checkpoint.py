@@ -0,0 +1,145 @@
+# checkpoint.py - Crash-safe journal of a run's job queue and results, for --resume
+import datetime, json, logging, os, threading
+from job_index import canonical_job_id
+from job_records import JobRecord, as_dict
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'run_checkpoint.jsonl'
+
+def _empty_results():
+    return {'success': 0, 'failed': 0, 'manual_required': 0, 'partial': 0}
+
+class CheckpointState:
+    """What a journal says about an interrupted run"""
+
+    def __init__(self):
+        self.queue = {}       # job key -> job, in the order jobs were queued
+        self.handled = set()  # job keys with a recorded result
+        self.results = _empty_results()
+        self.search_done = False
+        self.finished = False
+        self.started = None
+
+    @property
+    def pending(self):
+        """Queued jobs without a result yet (including the one in flight when the run died)"""
+        return [job for key, job in self.queue.items() if key not in self.handled]
+
+    @property
+    def attempted(self):
+        return sum(self.results.values())
+
+class Checkpoint:
+    """
+    Append-only JSONL journal, fsynced after every record:
+
+        start   -> carried-over queue, handled keys and results when resuming
+        queued  -> a job handed to the apply stage
+        result  -> a job's status plus the running results counters
+                   ('skipped' for jobs the job index already marks as done)
+        search_done / end
+
+    A job is queued before it is attempted and committed once its result is
+    written, so after a crash every queued job without a result is retried
+    and nothing with a result is attempted twice.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.state = CheckpointState()
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """Replay the journal; returns a CheckpointState, or None if there is none"""
+        if not os.path.exists(self.path):
+            return None
+        state = CheckpointState()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # a torn last line from a crash mid-write
+                kind = record.get('type')
+                if kind == 'start':
+                    state.started = record.get('time')
+                    state.results.update(record.get('results') or {})
+                    state.handled.update(record.get('handled') or [])
+                    for job in record.get('pending') or []:
+                        state.queue[canonical_job_id(job)] = JobRecord.from_dict(job)
+                    state.search_done = record.get('search_done', False)
+                elif kind == 'queued':
+                    state.queue[record['key']] = JobRecord.from_dict(record['job'])
+                elif kind == 'result':
+                    state.handled.add(record['key'])
+                    state.results = record['results']
+                elif kind == 'search_done':
+                    state.search_done = True
+                elif kind == 'end':
+                    state.finished = True
+        return state
+
+    def start(self, resume_from=None):
+        """Begin a new journal, carrying over the pending queue and results of `resume_from`"""
+        self.state = CheckpointState()
+        if resume_from is not None:
+            self.state.results = dict(resume_from.results)
+            self.state.search_done = resume_from.search_done
+            self.state.handled = set(resume_from.handled)
+            for job in resume_from.pending:
+                self.state.queue[canonical_job_id(job)] = job
+        record = {'type': 'start', 'time': datetime.datetime.now().isoformat(), 'results': self.state.results,
+                  'pending': [as_dict(job) for job in self.state.queue.values()], 'handled': sorted(self.state.handled),
+                  'search_done': self.state.search_done}
+        # Compacted rewrite, swapped in atomically so a crash here keeps the old journal
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def track(self, jobs):
+        """Journal each job as it is handed on; jobs already queued or handled are not repeated"""
+        for job in jobs:
+            key = canonical_job_id(job)
+            with self._lock:
+                if key in self.state.handled:
+                    continue
+                if key in self.state.queue:
+                    if self.state.queue[key] is not job:
+                        continue  # found again by the resumed search; already pending
+                else:
+                    self.state.queue[key] = job
+                    self._write({'type': 'queued', 'key': key, 'job': as_dict(job)})
+            yield job
+        with self._lock:
+            if not self.state.search_done:
+                self.state.search_done = True
+                self._write({'type': 'search_done'})
+
+    def record(self, job, status):
+        """Commit a job's result (call after the application log and index are updated)"""
+        key = canonical_job_id(job)
+        with self._lock:
+            self.state.handled.add(key)
+            if status in self.state.results:
+                self.state.results[status] += 1
+            self._write({'type': 'result', 'key': key, 'status': status, 'results': self.state.results})
+
+    def finish(self):
+        with self._lock:
+            self._write({'type': 'end', 'time': datetime.datetime.now().isoformat()})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,222 @@
+# cli.py - Command line entry point: search (dry run), apply, stats and validate subcommands
+"""
+Job Auto Applier command line.
+
+    python cli.py search [--out jobs.jsonl|jobs.arrow] [--limit N]
+    python cli.py apply [--from jobs.jsonl|jobs.arrow] [--workers N] [--resume] [--async]
+    python cli.py stats [--log application_log.csv] [--top 10] [--json]
+    python cli.py analytics [--log application_log.csv] [--top 10] [--min-attempts 3] [--json]
+    python cli.py validate [--full]
+
+`search` logs in, searches and scores like a run but only writes the selected
+jobs, one JSON object per line (an Arrow IPC file for a .arrow path); `apply
+--from` applies to such a file without searching again. `analytics` reports success rates and failure clusters
+(analytics.py). Each command imports what it needs when it runs, so `stats`
+and `validate` never load Selenium's WebDriver. Logging is configured here, once.
+"""
+import argparse, json, logging, sys
+
+CONFIG_FILE = 'config.json'
+DEFAULT_LOG_FILE = 'job_scraper.log'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+logger = logging.getLogger(__name__)
+
+def read_settings(path=CONFIG_FILE):
+    """config.json as plain, unvalidated JSON ({} if missing or unreadable): enough for logging and stats"""
+    try:
+        with open(path, 'r') as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+def configure_logging(settings=None, log_to_file=True, level=logging.INFO):
+    """
+    Set up the root logger for the process: the console (stderr, so `search`
+    output on stdout stays clean) and, with `log_to_file` and unless config
+    'enable_logging' is false, config 'log_file' (default job_scraper.log).
+    Does nothing if the root logger already has handlers (e.g. when embedded).
+    """
+    settings = settings or {}
+    handlers = [logging.StreamHandler()]
+    if log_to_file and settings.get('enable_logging', True):
+        handlers.insert(0, logging.FileHandler(settings.get('log_file', DEFAULT_LOG_FILE)))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+
+def cmd_search(args):
+    from job_records import JobBatch, import_pyarrow, write_jsonl
+    from run import search_only
+    if args.out and args.out.endswith('.arrow'):
+        try:
+            import_pyarrow()
+        except ImportError as e:
+            logger.error(str(e))
+            return 2
+        batch = JobBatch()  # an Arrow file is written whole, at the end
+        try:
+            written = search_only(batch.append, limit=args.limit)
+        finally:
+            batch.write_arrow(args.out)
+    else:
+        out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+
+        def write(job):
+            write_jsonl([job], out)
+            out.flush()  # a dry run stopped part way still leaves complete lines
+
+        try:
+            written = search_only(write, limit=args.limit)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    if written is not None and args.out:
+        logger.info(f"{written} jobs written to {args.out}; apply with: python cli.py apply --from {args.out}")
+    return 0 if written is not None else 1
+
+def cmd_apply(args):
+    jobs = None
+    if args.jobs_file:
+        from job_records import read_jobs
+        try:
+            jobs = read_jobs(args.jobs_file)
+        except (OSError, ValueError, ImportError) as e:
+            logger.error(f"Cannot read jobs: {e}")
+            return 2
+        logger.info(f"Read {len(jobs)} jobs from {args.jobs_file}")
+    from run import main_automation_process
+    results = main_automation_process(workers=args.workers, resume=args.resume, use_async=args.use_async,
+                                      jobs=jobs)
+    return 0 if results is not None else 1
+
+def format_stats(path, stats, top=10):
+    total = stats['total']
+    lines = [f"{path}: {total} applications logged"]
+    for status, count in sorted(stats['by_status'].items(), key=lambda item: -item[1]):
+        lines.append(f"  {status or '(none)':<16} {count:>7}  {count / total:>6.1%}")
+    if stats['by_company']:
+        lines.append("Top companies:")
+        for company, count in list(stats['by_company'].items())[:top]:
+            lines.append(f"  {company or '(unknown)':<40} {count:>7}")
+    if stats['by_day']:
+        lines.append(f"Last {min(top, len(stats['by_day']))} days:")
+        for day, count in list(stats['by_day'].items())[-top:]:
+            lines.append(f"  {day or '(no date)':<10} {count:>7}")
+    if stats['recent_failures']:
+        lines.append("Recent failures:")
+        for row in stats['recent_failures'][:top]:
+            lines.append(f"  {row.get('time', '')[:16]}  {row.get('title')} at {row.get('company')}: "
+                         f"{(row.get('error') or '').splitlines()[0] if row.get('error') else 'no error recorded'}")
+    return '\n'.join(lines)
+
+def cmd_stats(args):
+    from log_stats import LogTail
+    from logger import LOG_FILE
+    settings = read_settings()
+    path = args.log or settings.get('csv_log_file', LOG_FILE)
+    tail = LogTail(path)
+    tail.refresh()
+    stats = tail.stats(top_companies=args.top)
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    elif not stats['total']:
+        print(f"{path}: no applications logged yet")
+    else:
+        print(format_stats(path, stats, args.top))
+    return 0
+
+def format_analytics(path, report):
+    def rate_rows(rows, width=24):
+        return [f"  {r['key'] or '(unknown)':<{width}} {r['attempts']:>7} {r['rate']:>7.1%} {r['smoothed']:>9.1%}"
+                for r in rows]
+
+    header = f"  {'':<24} {'attempts':>7} {'success':>7} {'expected':>9}"
+    lines = [f"{path}: {report['total']} applications, {report['success_rate']:.1%} successful"]
+    for title, key in [('By portal', 'portal'), ('By hour of day', 'hour'), ('Most applied companies', 'company'),
+                       ('Best title keywords', 'best_keywords'), ('Worst title keywords', 'worst_keywords')]:
+        if report[key]:
+            lines += [f"{title}:", header] + rate_rows(report[key])
+    if report['failure_clusters']:
+        lines.append("Failure clusters:")
+        for cluster in report['failure_clusters']:
+            lines.append(f"  {cluster['count']:>6}x  {cluster['template']}")
+            if cluster['example'] and cluster['example'].lower() != cluster['template']:
+                lines.append(f"           e.g. {cluster['example'][:120]}")
+    return '\n'.join(lines)
+
+def cmd_analytics(args):
+    from analytics import ANALYTICS_FILE, ApplicationAnalytics
+    from logger import LOG_FILE
+    settings = read_settings()
+    options = settings.get('analytics') if isinstance(settings.get('analytics'), dict) else {}
+    path = args.log or settings.get('csv_log_file', LOG_FILE)
+    analytics = ApplicationAnalytics(path, options.get('path', ANALYTICS_FILE))
+    try:
+        analytics.refresh()
+        report = analytics.report(top=args.top, min_attempts=args.min_attempts)
+    finally:
+        analytics.close()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif not report['total']:
+        print(f"{path}: no applications logged yet")
+    else:
+        print(format_analytics(path, report))
+    return 0
+
+def cmd_validate(args):
+    import validate_setup
+    if args.full:
+        return validate_setup.main()
+    results = [validate_setup.check_config_file(), validate_setup.check_resume_file()]
+    return 0 if all(results) else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='Job Auto Applier')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    search = commands.add_parser('search', help='search and score jobs without applying; writes JSONL')
+    search.add_argument('--out', metavar='FILE',
+                        help='write the jobs here instead of to stdout (Arrow IPC for a .arrow file)')
+    search.add_argument('--limit', type=int, default=None, help='stop after this many jobs')
+    search.set_defaults(func=cmd_search, log_to_file=True)
+
+    apply = commands.add_parser('apply', help='search and apply (the full run), or apply to a saved job list')
+    apply.add_argument('--from', dest='jobs_file', metavar='FILE',
+                       help='apply to the jobs in this JSONL or .arrow file (from `search`) instead of searching')
+    apply.add_argument('--workers', type=int, default=None,
+                       help='number of browser sessions applying in parallel (default: config "workers" or 1)')
+    apply.add_argument('--resume', action='store_true',
+                       help='continue an interrupted run from its checkpoint instead of starting over')
+    apply.add_argument('--async', dest='use_async', action='store_true', default=None,
+                       help='apply on the asyncio orchestrator (default: config "async")')
+    apply.set_defaults(func=cmd_apply, log_to_file=True)
+
+    stats = commands.add_parser('stats', help='summarize the application log')
+    stats.add_argument('--log', metavar='FILE', help='CSV application log (default: config "csv_log_file")')
+    stats.add_argument('--top', type=int, default=10, help='companies, days and failures to list')
+    stats.add_argument('--json', action='store_true', help='print the aggregates as JSON')
+    stats.set_defaults(func=cmd_stats, log_to_file=False)
+
+    analytics = commands.add_parser('analytics', help='success rates by portal, hour, company and title keyword; '
+                                                      'failure clusters')
+    analytics.add_argument('--log', metavar='FILE', help='CSV application log (default: config "csv_log_file")')
+    analytics.add_argument('--top', type=int, default=10, help='companies, keywords and failure clusters to list')
+    analytics.add_argument('--min-attempts', type=int, default=3, help='leave out keys with fewer applications')
+    analytics.add_argument('--json', action='store_true', help='print the report as JSON')
+    analytics.set_defaults(func=cmd_analytics, log_to_file=False)
+
+    validate = commands.add_parser('validate', help='check config.json and the resume files')
+    validate.add_argument('--full', action='store_true',
+                          help='all setup checks, including packages and the offline replay (slower)')
+    validate.set_defaults(func=cmd_validate, log_to_file=False)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(read_settings() if args.log_to_file else None, log_to_file=args.log_to_file)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
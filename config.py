@@ -0,0 +1,258 @@
+# config.py - Validated configuration: schema shared with validate_setup.py, derived values, hot reload
+import json, logging, os, threading, time
+from portal_registry import PORTALS, configured_portals, is_known_portal
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'config.json'
+RELOAD_CHECK_SEC = 2.0  # reload() looks at the file's mtime at most this often
+REQUIRED_FIELDS = ('job_portal', 'filters', 'resume_path')
+
+class ConfigError(ValueError):
+    """The configuration has invalid values; `problems` lists them all"""
+
+    def __init__(self, path, problems):
+        super().__init__(f"{path}: " + '; '.join(problems))
+        self.path = path
+        self.problems = problems
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _positive(value):
+    return None if value > 0 else "must be greater than 0"
+
+def _at_least(low):
+    return lambda value: None if value >= low else f"must be at least {low}"
+
+def _seconds_range(value):
+    if not (isinstance(value, list) and len(value) == 2 and all(_is_number(v) for v in value)):
+        return "must be [min, max] seconds"
+    if not 0 <= value[0] <= value[1]:
+        return "needs 0 <= min <= max"
+    return None
+
+def _jitter_ranges(value):
+    for kind, pair in value.items():
+        problem = _seconds_range(pair)
+        if problem:
+            return f"{kind!r} {problem}"
+    return None
+
+def _portal_names(value):
+    names = [value] if isinstance(value, str) else value
+    if not names or not all(isinstance(n, str) for n in names):
+        return "must name at least one portal"
+    # Checked against the registry only: importing the adapters would load Selenium
+    unknown = [n for n in names if not is_known_portal(n)]
+    if unknown:
+        return f"no adapter for {', '.join(map(repr, unknown))} (known: {', '.join(sorted(PORTALS))})"
+    return None
+
+def _filters(value):
+    keywords = value.get('keywords', [])
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        return "'keywords' must be a list of strings"
+    return None
+
+def _resumes(value):
+    if not all(isinstance(v, dict) and isinstance(v.get('path'), str) for v in value):
+        return "each entry needs a 'path'"
+    return None
+
+def _optional(check):
+    return lambda value: None if value is None else check(value)
+
+def _one_of(*choices):
+    return lambda value: None if value in choices else f"must be one of {', '.join(map(repr, choices))}"
+
+NUMBER = (int, float)
+NONE = type(None)
+
+# key -> (accepted types, extra check returning a problem or None)
+SCHEMA = {
+    'job_portal': ((str, list), _portal_names),
+    'job_portals': ((list,), _portal_names),
+    'indeed_domain': ((str,), None),
+    'filters': ((dict,), _filters),
+    'scoring': ((dict,), None),
+    'resume_path': ((str,), None),
+    'resumes': ((list,), _resumes),
+    'resume_max_mb': (NUMBER, _positive),
+    'resume_cache_file': ((str,), None),
+    'answers': ((dict,), None),
+    'answers_file': ((str,), None),
+    'delay_range_sec': ((list,), _seconds_range),
+    'jitter_sec': ((dict,), _jitter_ranges),
+    'between_jobs_sec': ((list,), _seconds_range),
+    'wait_timeout_sec': (NUMBER, _positive),
+    'optional_wait_timeout_sec': (NUMBER, _positive),
+    'wait_poll_sec': (NUMBER, _positive),
+    'pacing': ((dict,), None),
+    'max_applications': ((int, NONE), _optional(_at_least(0))),
+    'max_search_pages': ((int,), _at_least(1)),
+    'max_search_results': ((int, NONE), _optional(_at_least(1))),
+    'workers': ((int,), _at_least(1)),
+    'async': ((bool, dict), None),
+    'profile_dir': ((str, NONE), None),
+    'profiles_dir': ((str,), None),
+    'browser': ((dict,), None),
+    'extraction_mode': ((str,), _one_of('script', 'parser')),
+    'detail_cache': ((dict, bool), None),
+    'dedup': ((dict, bool), None),
+    'analytics': ((dict, bool), None),
+    'selector_stats': ((dict, bool), None),
+    'tracing': ((dict, bool), None),
+    'application_log': ((dict,), None),
+    'index_file': ((str,), None),
+    'checkpoint_file': ((str,), None),
+    'enable_logging': ((bool,), None),
+    'log_file': ((str,), None),
+    'csv_log_file': ((str,), None),
+}
+
+def validate_config(data, required=REQUIRED_FIELDS):
+    """(problems, warnings) for a parsed config: problems make it unusable, warnings are unknown keys"""
+    if not isinstance(data, dict):
+        return ["must be a JSON object"], []
+    problems, warnings = [], []
+    missing = [f for f in required if f not in data and not (f == 'job_portal' and data.get('job_portals'))]
+    if missing:
+        problems.append(f"missing fields: {', '.join(missing)}")
+    for key, value in data.items():
+        if key not in SCHEMA:
+            warnings.append(f"unknown key {key!r}")
+            continue
+        types, check = SCHEMA[key]
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            names = ' or '.join('null' if t is NONE else t.__name__ for t in types)
+            problems.append(f"{key}: expected {names}, got {type(value).__name__}")
+            continue
+        problem = check(value) if check else None
+        if problem:
+            problems.append(f"{key}: {problem}")
+    return problems, warnings
+
+def read_config_file(path):
+    """Parse and validate a config file; raises FileNotFoundError, json.JSONDecodeError or ConfigError"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    problems, warnings = validate_config(data)
+    if problems:
+        raise ConfigError(path, problems)
+    for warning in warnings:
+        logger.warning(f"{path}: {warning}")
+    return data
+
+class Config:
+    """
+    A validated configuration. Reads like the parsed JSON dict (`config['filters']`,
+    `config.get('workers', 1)`), and holds values derived from it once per load:
+    the configured `portals` and first portal's `adapter`, the compiled keyword
+    `scorer` and the `jitter` pause distributions.
+
+    A Config loaded from a file is hot-reloadable: reload() re-reads the file when
+    it changed and swaps the new values in place, so every holder of this object
+    (a running batch, the GUI) sees them. An invalid edit is logged and ignored.
+    `version` counts reloads, for consumers that cache what they derive from it.
+    """
+    __slots__ = ('path', 'data', 'mtime_ns', 'version', 'portals', 'adapter', 'scorer', 'jitter',
+                 '_checked', '_lock')
+
+    def __init__(self, data, path=None, mtime_ns=None):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.version = 0
+        self.scorer = None
+        self.jitter = None
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+        self._apply(data)
+
+    @classmethod
+    def load(cls, path=CONFIG_FILE):
+        mtime_ns = os.stat(path).st_mtime_ns
+        return cls(read_config_file(path), path, mtime_ns)
+
+    def _apply(self, data):
+        # Imported here so validating a config (cli.py validate) loads only the schema and registry
+        from portals import get_adapter
+        from scoring import JobScorer
+        from waits import JitterPolicy
+        self.data = data
+        self.portals = configured_portals(data)
+        self.adapter = get_adapter(self.portals[0]) if self.portals else None
+        # Updated in place, so loops already holding them pick up the new rules
+        if self.scorer is None:
+            self.scorer = JobScorer.from_config(data)
+        else:
+            self.scorer.reconfigure(data)
+        if self.jitter is None:
+            self.jitter = JitterPolicy.from_config(data)
+        else:
+            self.jitter.ranges = JitterPolicy.from_config(data).ranges
+
+    def reload(self, force=False):
+        """Re-read the file if it changed since it was loaded; returns True if new values were applied"""
+        if self.path is None:
+            return False
+        now = time.monotonic()
+        if not force and now - self._checked < RELOAD_CHECK_SEC:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                logger.error(f"Config change not applied: {e}")
+                return False
+            if mtime_ns == self.mtime_ns and not force:
+                return False
+            self.mtime_ns = mtime_ns  # an invalid edit is reported once, not at every check
+            try:
+                data = read_config_file(self.path)
+            except (OSError, ValueError) as e:  # ConfigError and JSONDecodeError are ValueErrors
+                logger.error(f"Config change not applied: {e}")
+                return False
+            self._apply(data)
+            self.version += 1
+        logger.info(f"Configuration reloaded from {self.path}")
+        return True
+
+    # Mapping interface, so code written for the plain dict keeps working
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def items(self):
+        return self.data.items()
+
+    def __repr__(self):
+        return f"Config({self.path or 'in memory'}, version {self.version})"
+
+def as_config(config):
+    """A Config for a Config or plain dict (the latter type-checked, but not reloadable)"""
+    if isinstance(config, Config):
+        return config
+    problems, _ = validate_config(config, required=())
+    if problems:
+        raise ConfigError('config', problems)
+    return Config(config)
+
+def reload_config(config):
+    """Hot-reload checkpoint for loops between jobs: a no-op for plain dicts"""
+    return config.reload() if isinstance(config, Config) else False
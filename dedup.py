@@ -0,0 +1,272 @@
+# dedup.py - Near-duplicate postings (cross-portal copies, reposts): MinHash signatures and an LSH index in SQLite
+import hashlib, logging, re, sqlite3, struct, threading, zlib
+from collections import namedtuple
+from job_index import canonical_job_id
+
+logger = logging.getLogger(__name__)
+
+DEDUP_FILE = 'postings.db'
+DEFAULT_THRESHOLD = 0.8   # exact Jaccard similarity of the shingle sets
+DEFAULT_NUM_PERM = 32     # MinHash signature length
+DEFAULT_BANDS = 8         # LSH bands of num_perm / bands values each
+SHINGLE_SIZE = 3          # character n-grams of the title
+
+_NON_WORD = re.compile(r'[\W_]+')
+_PARENS = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+# Words reposts add or drop without changing the role
+TITLE_NOISE = frozenset(['urgent', 'urgently', 'hiring', 'immediate', 'joiner', 'joiners', 'opening', 'openings',
+                         'vacancy', 'wfh', 'remote', 'hybrid', 'onsite'])
+# Legal-form words that differ between portals' spellings of one employer
+COMPANY_SUFFIXES = frozenset(['inc', 'incorporated', 'llc', 'llp', 'ltd', 'limited', 'pvt', 'private', 'plc', 'corp',
+                              'corporation', 'co', 'company', 'gmbh', 'ag', 'sa', 'bv', 'the'])
+
+_MASK64 = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15      # odd 64-bit constant (Fibonacci hashing)
+_BORROW_STEP = 1 << 53         # densification: borrowed values shift by this per bin of distance
+
+# A recorded posting: its cluster (the representative's row id), and the
+# representative it duplicates (None when the posting is a representative)
+Posting = namedtuple('Posting', ['cluster', 'duplicate_of'])
+
+def _words(text):
+    return _NON_WORD.sub(' ', (text or '').lower()).split()
+
+def normalize_posting(job):
+    """(title, company, location) lowercased and stripped of punctuation, legal forms and repost noise"""
+    title = ' '.join(w for w in _words(job.get('title')) if w not in TITLE_NOISE) or ' '.join(_words(job.get('title')))
+    company_words = _words(job.get('company'))
+    company = ' '.join(w for w in company_words if w not in COMPANY_SUFFIXES) or ' '.join(company_words)
+    # "Bangalore, Karnataka, India (On-site)" -> "bangalore": portals disagree on everything after the city
+    location = ' '.join(_words(_PARENS.sub(' ', job.get('location') or '').split(',')[0]))
+    return title, company, location
+
+def shingles(title, location=''):
+    """Character n-grams of the title (word boundaries included) plus one shingle per location word"""
+    padded = f' {title} '.encode('utf-8')
+    grams = {padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+    grams.update(b'@' + w.encode('utf-8') for w in location.split())
+    return grams
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def minhash(grams, num_perm=DEFAULT_NUM_PERM):
+    """
+    MinHash signature by one-permutation hashing: each shingle is hashed once
+    into one of `num_perm` bins, keeping each bin's minimum; empty bins borrow
+    from the next filled bin (rotation densification). Equal positions estimate
+    the Jaccard similarity like num_perm independent hash functions would, at a
+    fraction of the cost. Returns None for an empty shingle set.
+    """
+    if not grams:
+        return None
+    sig = [None] * num_perm
+    for gram in grams:
+        # crc32 is collision-free on shingles of up to 4 bytes; the multiply spreads it over 64 bits
+        h = (zlib.crc32(gram) * _MIX) & _MASK64
+        h ^= h >> 29
+        b, value = h % num_perm, h // num_perm
+        if sig[b] is None or value < sig[b]:
+            sig[b] = value
+    if None in sig:
+        filled = sig[:]
+        for b in range(num_perm):
+            if filled[b] is None:
+                distance = 1
+                while filled[(b + distance) % num_perm] is None:
+                    distance += 1
+                sig[b] = filled[(b + distance) % num_perm] + distance * _BORROW_STEP
+    return sig
+
+class DuplicateIndex:
+    """
+    SQLite-backed index of every posting seen, grouped into clusters of near-duplicates.
+
+    A posting's MinHash signature is cut into bands; each band, together with the
+    normalized company, hashes to an LSH bucket. Only cluster representatives are
+    bucketed, so a new posting is compared exactly (Jaccard) against the few
+    representatives sharing one of its buckets: lookups cost the same whatever
+    the history size, and postings of different companies never match.
+    """
+
+    def __init__(self, path=DEDUP_FILE, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"dedup: num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._band_format = f'<B{self.rows}Q'
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS postings ('
+            ' id INTEGER PRIMARY KEY, job_id TEXT NOT NULL UNIQUE, cluster INTEGER NOT NULL,'
+            ' company TEXT NOT NULL, text TEXT NOT NULL, title TEXT, link TEXT, portal TEXT)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS postings_cluster ON postings (cluster)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, posting INTEGER NOT NULL,'
+                           ' PRIMARY KEY (bucket, posting)) WITHOUT ROWID')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        layout = f'{num_perm}/{bands}'
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+        if row is not None and row[0] != layout:
+            self._rebuild(row[0], layout)
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('layout', ?)", (layout,))
+        self._conn.commit()
+
+    def _rebuild(self, old, new):
+        """Re-bucket the representatives after num_perm or bands changed (the clusters are kept)"""
+        self._conn.execute('DELETE FROM buckets')
+        reps = self._conn.execute('SELECT id, company, text FROM postings WHERE id = cluster').fetchall()
+        for posting, company, text in reps:
+            title, _, location = text.partition('\t')
+            sig = minhash(shingles(title, location), self.num_perm)
+            if sig is not None:
+                self._conn.executemany('INSERT OR IGNORE INTO buckets VALUES (?, ?)',
+                                       [(bucket, posting) for bucket in self._buckets(company, sig)])
+        logger.info(f"Rebuilt {self.path} LSH buckets for {len(reps)} clusters (layout {old} -> {new})")
+
+    def _buckets(self, company, sig):
+        prefix = company.encode('utf-8') + b'\0'
+        keys = []
+        for band in range(self.bands):
+            packed = struct.pack(self._band_format, band, *sig[band * self.rows:(band + 1) * self.rows])
+            digest = hashlib.blake2b(prefix + packed, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+    def _representative(self, cluster, similarity):
+        row = self._conn.execute('SELECT job_id, title, link, portal FROM postings WHERE id = ?', (cluster,)).fetchone()
+        return {'job_id': row[0], 'title': row[1], 'link': row[2], 'portal': row[3], 'similarity': round(similarity, 3)}
+
+    def _check(self, job, job_id=None):
+        job_id = job_id or canonical_job_id(job)
+        row = self._conn.execute('SELECT id, cluster FROM postings WHERE job_id = ?', (job_id,)).fetchone()
+        if row is not None:
+            posting, cluster = row
+            return Posting(cluster, None if cluster == posting else self._representative(cluster, 1.0))
+
+        title, company, location = normalize_posting(job)
+        grams = shingles(title, location)
+        sig = minhash(grams, self.num_perm)
+        buckets = self._buckets(company, sig) if sig is not None else []
+        best, best_similarity = None, 0.0
+        if buckets:
+            candidates = self._conn.execute(
+                f"SELECT id, company, text FROM postings WHERE id IN "
+                f"(SELECT posting FROM buckets WHERE bucket IN ({','.join('?' * len(buckets))}))", buckets).fetchall()
+            for candidate, candidate_company, text in candidates:
+                if candidate_company != company:
+                    continue  # a 64-bit bucket collision
+                other_title, _, other_location = text.partition('\t')
+                similarity = jaccard(grams, shingles(other_title, other_location))
+                if similarity >= self.threshold and similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+
+        cursor = self._conn.execute(
+            'INSERT INTO postings (job_id, cluster, company, text, title, link, portal) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (job_id, best or 0, company, f'{title}\t{location}', job.get('title'), job.get('link'), job.get('portal')))
+        if best is not None:
+            return Posting(best, self._representative(best, best_similarity))
+        posting = cursor.lastrowid
+        self._conn.execute('UPDATE postings SET cluster = ? WHERE id = ?', (posting, posting))
+        self._conn.executemany('INSERT OR IGNORE INTO buckets VALUES (?, ?)', [(b, posting) for b in buckets])
+        return Posting(posting, None)
+
+    def check(self, job):
+        """
+        Record a posting and return its Posting: the cluster it joined and, for a
+        near-duplicate of an earlier posting, that cluster's representative
+        ({'job_id', 'title', 'link', 'portal', 'similarity'}). A posting seen
+        before keeps its cluster.
+        """
+        with self._lock:
+            result = self._check(job)
+            self._conn.commit()
+        return result
+
+    def check_many(self, jobs):
+        """check() for many postings in one transaction (bulk loads)"""
+        with self._lock:
+            results = [self._check(job) for job in jobs]
+            self._conn.commit()
+        return results
+
+    def import_index(self, index):
+        """Record every job in a job_index.JobIndex, oldest first (done once, when this index is created)"""
+        rows = index.rows()
+        with self._lock:
+            for job_id, title, company, link in rows:
+                self._check({'title': title, 'company': company, 'link': link,
+                             'portal': job_id.partition(':')[0]}, job_id=job_id)
+            self._conn.commit()
+        logger.info(f"Imported {len(rows)} indexed jobs into {self.path}")
+
+    def members(self, cluster):
+        """Canonical job IDs of every posting in a cluster"""
+        with self._lock:
+            return [r[0] for r in self._conn.execute('SELECT job_id FROM postings WHERE cluster = ?', (cluster,))]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM postings').fetchone()[0]
+
+    def clusters(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM postings WHERE id = cluster').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def skip_near_duplicates(jobs, dedup, index=None):
+    """
+    Keep one posting per cluster: drop a job when another posting of its cluster
+    was already handed on in this run, or (with `index`) was applied to before.
+    A repost of a job that was only seen, never applied to, still goes through.
+    """
+    handed = set()
+    for job in jobs:
+        posting = dedup.check(job)
+        duplicate = posting.cluster in handed
+        if not duplicate and index is not None:
+            members = [m for m in dedup.members(posting.cluster) if m != canonical_job_id(job)]
+            duplicate = bool(members) and bool(index.done_ids(members))
+        if duplicate:
+            original = posting.duplicate_of
+            of = f" of {original['title']} ({original['link']})" if original else ''
+            reason = 'already queued in this run' if posting.cluster in handed else 'already applied to'
+            logger.info(f"Skipping {job.get('title')} at {job.get('company')} on {job.get('portal')}: "
+                        f"near-duplicate{of}, {reason}")
+            continue
+        handed.add(posting.cluster)
+        yield job
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_dedup_index(config, index=None):
+    """
+    Shared DuplicateIndex from config 'dedup' (None when set to false):
+    {"path": "postings.db", "threshold": 0.8, "num_perm": 32, "bands": 8}
+    A new index is seeded from `index` (the applied-jobs index), so reposts of
+    jobs applied to before it existed are recognized too.
+    """
+    options = config.get('dedup', {})
+    if options is False:
+        return None
+    options = options if isinstance(options, dict) else {}
+    path = options.get('path', DEDUP_FILE)
+    with _indexes_lock:
+        if path not in _indexes:
+            dedup = DuplicateIndex(path, threshold=options.get('threshold', DEFAULT_THRESHOLD),
+                                   num_perm=options.get('num_perm', DEFAULT_NUM_PERM),
+                                   bands=options.get('bands', DEFAULT_BANDS))
+            if index is not None and not len(dedup):
+                dedup.import_index(index)
+            _indexes[path] = dedup
+        return _indexes[path]
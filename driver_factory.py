@@ -0,0 +1,144 @@
+# driver_factory.py - Chrome startup: persistent profile, headless mode, resource blocking, session reuse
+import logging, os, time
+from selenium import webdriver
+from portals import get_adapter
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Chrome user data (cookies included) survives between runs here unless config 'profile_dir' says otherwise
+DEFAULT_PROFILE_DIR = os.path.join('profiles', 'default')
+
+# config 'browser' defaults
+BROWSER_DEFAULTS = {
+    'headless': False,
+    'page_load_strategy': 'eager',  # return from get() at DOMContentLoaded, not after every image
+    'block_resources': ['images', 'fonts', 'media'],
+    'window_size': [1280, 900],
+    'session_check_sec': 5,
+    'arguments': [],
+}
+
+# URL patterns (Network.setBlockedURLs wildcards) per resource kind; adapters add
+# their own CDN patterns for extension-less URLs in PortalAdapter.blocked_urls
+BLOCKED_URL_PATTERNS = {
+    'images': ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp'),
+    'fonts': ('*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'),
+    'media': ('*.mp4', '*.webm', '*.mov', '*.m4v', '*.m3u8', '*.mp3', '*.m4a', '*.ogg', '*.wav'),
+}
+
+class LoginRequired(RuntimeError):
+    """Raised in headless mode when the profile has no valid session (there is no window to log in with)"""
+
+def browser_options(config):
+    """config 'browser' merged over BROWSER_DEFAULTS"""
+    return dict(BROWSER_DEFAULTS, **(config.get('browser') or {}))
+
+def profile_dir_for(config):
+    """Profile directory from config 'profile_dir' (default profiles/default); "" or null means a throwaway profile"""
+    return config.get('profile_dir', DEFAULT_PROFILE_DIR)
+
+def chrome_options(config, profile_dir=None):
+    """ChromeOptions for config 'browser' and an optional persistent profile directory"""
+    browser = browser_options(config)
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = browser['page_load_strategy']
+    if browser['headless']:
+        options.add_argument('--headless=new')
+    width, height = browser['window_size']
+    options.add_argument(f'--window-size={width},{height}')
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    for argument in browser['arguments']:
+        options.add_argument(argument)
+    return options
+
+def blocked_url_patterns(kinds, adapter=None):
+    """Network.setBlockedURLs patterns for resource kinds ('images', 'fonts', 'media')"""
+    patterns = []
+    for kind in kinds:
+        if kind not in BLOCKED_URL_PATTERNS:
+            logger.warning(f"Unknown block_resources kind {kind!r} (known: {', '.join(BLOCKED_URL_PATTERNS)})")
+            continue
+        patterns.extend(BLOCKED_URL_PATTERNS[kind])
+        if adapter is not None:
+            patterns.extend(adapter.blocked_urls.get(kind, ()))
+    return patterns
+
+def block_resources(driver, kinds, adapter=None):
+    """
+    Stop the browser fetching images, fonts and media. Installed through the
+    DevTools protocol after login, so the login page (and any captcha) still
+    renders in full. Returns False if the driver has no DevTools access.
+    """
+    patterns = blocked_url_patterns(kinds, adapter)
+    if not patterns:
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as e:  # not Chromium, or no DevTools connection
+        logger.debug(f"Resource blocking unavailable: {e}")
+        return False
+    logger.info(f"Blocking {', '.join(kinds)} ({len(patterns)} URL patterns)")
+    return True
+
+def start_driver(config, profile_dir=None):
+    """Launch Chrome with the config 'browser' options"""
+    started = time.monotonic()
+    with span('driver.start'):
+        driver = webdriver.Chrome(options=chrome_options(config, profile_dir))
+    logger.info(f"Browser started in {time.monotonic() - started:.1f}s")
+    return driver
+
+def ensure_logged_in(driver, portal, config, wait_for_login=None):
+    """
+    Open the portal and reuse the profile's session if it is still valid;
+    otherwise wait for a manual login (console prompt, or `wait_for_login(portal)`).
+    Returns True if the saved session was reused.
+    """
+    adapter = get_adapter(portal)
+    browser = browser_options(config)
+    portal_url = adapter.login_url(config)
+    logger.info(f"Opening {portal_url}")
+    with span('navigate', 'login_page'):
+        driver.get(portal_url)
+
+    with span('driver.session_check'):
+        reused = adapter.is_logged_in(driver, config, timeout=browser['session_check_sec'])
+    if reused:
+        logger.info(f"Existing {portal} session is still valid, skipping login")
+        return True
+
+    if browser['headless']:
+        raise LoginRequired(f"No valid {portal} session in the browser profile. Run once with "
+                            f"\"browser\": {{\"headless\": false}} to log in; later runs reuse the session.")
+    with span('driver.login_prompt'):
+        if wait_for_login:
+            logger.info(f"Waiting for {portal} login to be confirmed...")
+            wait_for_login(portal)
+        else:
+            print(f"\n{'='*60}")
+            print(f"Please log in to {portal} in the browser window.")
+            print(f"After logging in, press Enter here to continue...")
+            print(f"{'='*60}\n")
+
+            input()  # Wait for manual login
+    logger.info(f"Manual login completed for {portal}")
+    if not adapter.is_logged_in(driver, config, timeout=browser['session_check_sec']):
+        logger.warning(f"Could not confirm the {portal} login; continuing anyway")
+    return False
+
+def create_driver(portal, config, profile_dir=None, wait_for_login=None):
+    """A logged-in driver for `portal`: start Chrome, reuse or establish the session, then block heavy resources"""
+    driver = start_driver(config, profile_dir)
+    try:
+        ensure_logged_in(driver, portal, config, wait_for_login)
+        kinds = browser_options(config)['block_resources']
+        if kinds:
+            block_resources(driver, kinds, get_adapter(portal))
+    except BaseException:
+        driver.quit()
+        raise
+    return driver
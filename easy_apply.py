@@ -0,0 +1,278 @@
+# easy_apply.py - Multi-step Easy Apply state machine with cached form answers
+import logging
+from selenium.webdriver.common.by import By
+from answers import get_answer_cache
+from resume_staging import get_resume_staging
+from tracing import span
+from waits import css
+
+logger = logging.getLogger(__name__)
+
+MAX_STEPS = 10
+
+MODAL_SELECTOR = '.jobs-easy-apply-modal, [data-test-modal][role="dialog"], [role="dialog"]'
+MODAL_LOCATORS = css('.jobs-easy-apply-modal', '[data-test-modal][role="dialog"]', '[role="dialog"]')
+UPLOAD_CONFIRM_LOCATORS = css('.jobs-document-upload-redesign-card__file-name',
+                              '[data-test-document-upload-file-name]')
+SUBMIT_LOCATORS = css(
+    'button[aria-label*="Submit"]',
+    'button[aria-label*="Finish"]',
+    'button:contains("Submit")'
+)
+# Generic, so only tried after Review/Next (which may be submit-type buttons too)
+SUBMIT_FALLBACK_LOCATORS = css('button[type="submit"]')
+REVIEW_LOCATORS = css('button[aria-label*="Review"]', 'button[data-live-test-easy-apply-review-button]')
+NEXT_LOCATORS = css('button[aria-label*="Continue to next step"]', 'button[data-easy-apply-next-button]',
+                    'button[aria-label*="Next"]')
+SUBMITTED_LOCATORS = css('.artdeco-inline-feedback--success', '[data-test-application-submitted]',
+                         '.jpac-modal-header')
+
+# A field's label text, in both scripts below, so a radio button is filled by the
+# same label it was read by: <label for=id>, a wrapping <label>, else its aria-label,
+# placeholder or name (a radio button's value, as its name is the group's).
+LABEL_FOR_JS = """
+const modal = document.querySelector(arguments[0]) || document.body;
+const text = el => (el ? (el.innerText || el.textContent || '') : '').replace(/\\s+/g, ' ').trim();
+const labelFor = el => {
+    if (el.id) {
+        const l = modal.querySelector('label[for="' + CSS.escape(el.id) + '"]');
+        if (l) return text(l);
+    }
+    const wrap = el.closest('label');
+    if (wrap) return text(wrap);
+    return el.getAttribute('aria-label') || el.placeholder || (el.type === 'radio' ? el.value : el.name) || '';
+};
+"""
+
+# Describes the current form page in one round-trip: heading, progress, error count
+# and every fillable field (radio buttons grouped by name) with its question text.
+FORM_PAGE_SCRIPT = LABEL_FOR_JS + """
+const fields = [];
+const radios = {};
+modal.querySelectorAll('input, select, textarea').forEach((el, i) => {
+    const type = (el.type || '').toLowerCase();
+    if (['hidden', 'file', 'submit', 'button'].includes(type) || el.disabled) return;
+    const required = el.required || el.getAttribute('aria-required') === 'true';
+    if (type === 'radio') {
+        const key = 'radio:' + el.name;
+        if (!radios[key]) {
+            const fs = el.closest('fieldset');
+            const legend = fs && fs.querySelector('legend');
+            radios[key] = {key, kind: 'radio', question: text(legend) || el.name, value: null, options: [], required};
+            fields.push(radios[key]);
+        }
+        radios[key].options.push(labelFor(el));
+        if (el.checked) radios[key].value = labelFor(el);
+        return;
+    }
+    const kind = el.tagName === 'SELECT' ? 'select' : (type === 'checkbox' ? 'checkbox' : 'text');
+    let value = kind === 'checkbox' ? (el.checked ? 'yes' : '') : el.value;
+    let options = null;
+    if (kind === 'select') {
+        options = Array.from(el.options).map(o => text(o));
+        const opt = el.options[el.selectedIndex];
+        value = opt && opt.value && !/^select/i.test(text(opt)) ? text(opt) : '';
+    }
+    fields.push({key: String(i), kind, question: labelFor(el), value, options, required});
+});
+const heading = modal.querySelector('h3, h2');
+const progress = modal.querySelector('[role="progressbar"], progress');
+return {
+    heading: text(heading),
+    progress: progress ? (progress.getAttribute('aria-valuenow') || progress.getAttribute('value') || '') : '',
+    errors: modal.querySelectorAll('.artdeco-inline-feedback--error').length,
+    fields,
+};
+"""
+
+# Fills fields collected by FORM_PAGE_SCRIPT; returns the keys it could not fill
+FILL_FIELDS_SCRIPT = LABEL_FOR_JS + """
+const fills = arguments[1];
+const norm = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+const setValue = (el, value) => {
+    const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype
+        : el.tagName === 'SELECT' ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+};
+const elements = Array.from(modal.querySelectorAll('input, select, textarea'));
+const failed = [];
+for (const {key, value} of fills) {
+    const want = norm(value);
+    if (key.startsWith('radio:')) {
+        const name = key.slice(6);
+        const match = elements.find(el => el.type === 'radio' && el.name === name && norm(labelFor(el)) === want)
+            || elements.find(el => el.type === 'radio' && el.name === name && norm(labelFor(el)).startsWith(want));
+        if (match) match.click(); else failed.push(key);
+        continue;
+    }
+    const el = elements[Number(key)];
+    if (!el) { failed.push(key); continue; }
+    if (el.tagName === 'SELECT') {
+        const opt = Array.from(el.options).find(o => norm(o.text) === want)
+            || Array.from(el.options).find(o => norm(o.text).startsWith(want));
+        if (opt) setValue(el, opt.value); else failed.push(key);
+    } else if (el.type === 'checkbox') {
+        // Setting .value does not tick a box: click it, and report it if it stays wrong
+        const checked = ['yes', 'y', 'true', '1', 'on', 'checked', 'agree', 'i agree'].includes(want);
+        if (el.checked !== checked && !el.disabled) el.click();
+        if (el.checked !== checked) failed.push(key);
+    } else {
+        setValue(el, value);
+    }
+}
+return failed;
+"""
+
+class EasyApplyFlow:
+    """
+    Walks an Easy Apply modal page by page:
+
+        fill  -> answer known questions, upload the resume, note unanswered ones
+        next / review -> advance and wait for the next page to render
+        submit -> click Submit and wait for the confirmation
+
+    Returns 'success' once the submission is confirmed, or 'partial' if the flow
+    gets stuck (unanswered required question, validation error, no way forward,
+    no confirmation after Submit).
+    Other portals' multi-step forms reuse it by overriding the locators below.
+    """
+    name = 'Easy Apply'
+    modal_selector = MODAL_SELECTOR
+    modal_locators = MODAL_LOCATORS
+    upload_confirm_locators = UPLOAD_CONFIRM_LOCATORS
+    submitted_locators = SUBMITTED_LOCATORS
+    # Buttons that move the flow forward, in order of preference
+    actions = (('submit', SUBMIT_LOCATORS), ('review', REVIEW_LOCATORS), ('next', NEXT_LOCATORS),
+               ('submit', SUBMIT_FALLBACK_LOCATORS))
+
+    def __init__(self, driver, job, config, ready, answers=None):
+        self.driver = driver
+        self.job = job
+        self.config = config
+        self.ready = ready
+        self.answers = answers if answers is not None else get_answer_cache(config)
+        self.resume_uploaded = False
+        self.unanswered = []
+
+    def run(self):
+        for step in range(1, MAX_STEPS + 1):
+            page = self.read_page()
+            logger.info(f"{self.name} step {step}: {page['heading'] or 'form'} "
+                        f"({len(page['fields'])} fields{', ' + page['progress'] + '%' if page['progress'] else ''})")
+            self.upload_resume()
+            with span('form.fill'):
+                filled = self.fill_page(page)
+            if not filled:
+                logger.warning(f"Unanswered required questions: {self.unanswered}")
+                return 'partial'
+
+            action, button = self.next_action()
+            if action is None:
+                logger.warning("No Next/Review/Submit button found. Manual completion may be required.")
+                return 'partial'
+
+            self.ready.pause(f'{action}_button')
+            logger.info(f"Clicking {action} button...")
+            if action == 'submit':
+                with span('submit'):
+                    button.click()
+                    # Submission is done when the modal closes or shows its confirmation
+                    if not self.ready.until('submit', lambda d: self.ready.find(d, 'submitted', self.submitted_locators)
+                                            or not self.ready.find(d, 'modal', self.modal_locators)):
+                        logger.warning("No submission confirmation seen. Manual check required.")
+                        return 'partial'
+                self.ready.pause('submit', kind='after_submit')
+                logger.info("Application submitted successfully!")
+                return 'success'
+
+            with span('click', action):
+                button.click()
+
+            if not self.wait_for_next_page(page):
+                logger.warning("Form did not advance (validation error?). Manual completion may be required.")
+                return 'partial'
+
+        logger.warning(f"Gave up after {MAX_STEPS} {self.name} steps")
+        return 'partial'
+
+    def read_page(self):
+        with span('form.read'):
+            return self.driver.execute_script(FORM_PAGE_SCRIPT, self.modal_selector) or {
+                'heading': '', 'progress': '', 'errors': 0, 'fields': []}
+
+    def upload_resume(self):
+        """Upload the resume picked for this job (resume_staging.py) on the first page that has a file input"""
+        if self.resume_uploaded:
+            return
+        staging = get_resume_staging(self.config)
+        resume = staging.choose(self.job)
+        if resume is None:  # none configured, or none usable (warned about at startup)
+            self.resume_uploaded = True
+            return
+        upload_inputs = self.driver.find_elements(By.CSS_SELECTOR, 'input[type="file"]')
+        if not upload_inputs:
+            return
+        logger.info(f"Uploading resume: {resume.name}")
+        with span('upload'):
+            upload_inputs[0].send_keys(staging.upload_path(self.driver, resume))
+            if not self.ready.upload_accepted('upload', upload_inputs[0], resume.name,
+                                              self.upload_confirm_locators):
+                logger.warning("Resume upload was not confirmed by the page")
+        self.resume_uploaded = True
+        self.ready.pause('upload')
+
+    def fill_page(self, page):
+        """Answer empty fields from the cache in one round-trip; False if a required one is left"""
+        fills, missing = [], []
+        for field in page['fields']:
+            question = field['question']
+            if field['value']:
+                # Already filled (often prefilled by the portal): learn it for next time
+                if field['kind'] != 'checkbox' and self.answers.lookup(question) is None:
+                    self.answers.remember(question, field['value'], self.job)
+                continue
+            answer = self.answers.lookup(question)
+            if answer is not None:
+                fills.append({'key': field['key'], 'value': answer})
+            elif field['required']:
+                missing.append(question)
+                self.answers.remember(question, None, self.job)
+
+        if fills:
+            failed = set(self.driver.execute_script(FILL_FIELDS_SCRIPT, self.modal_selector, fills) or [])
+            logger.info(f"Filled {len(fills) - len(failed)} of {len(fills)} answers from cache")
+            for field in page['fields']:
+                if field['key'] in failed and field['required']:
+                    missing.append(field['question'])
+        self.unanswered.extend(missing)
+        return not missing
+
+    def next_action(self):
+        """Find the button that moves the flow forward: Submit, then Review, then Next"""
+        def condition(driver):
+            for action, locators in self.actions:
+                button = self.ready.find(driver, f'{action}_button', locators, require_clickable=True)
+                if button:
+                    return action, button
+            return None
+
+        return self.ready.until('next_button', condition, timeout=self.ready.optional_timeout) or (None, None)
+
+    def wait_for_next_page(self, previous):
+        """True once the modal shows a different page; False on validation errors or timeout"""
+        before = _signature(previous)
+
+        def condition(driver):
+            page = self.read_page()
+            if page['errors']:
+                return 'errors'
+            if not self.ready.find(driver, 'modal', self.modal_locators):
+                return 'closed'
+            return 'advanced' if _signature(page) != before else None
+
+        return self.ready.until('next_page', condition) == 'advanced'
+
+def _signature(page):
+    return (page['heading'], page['progress'], tuple(f['question'] for f in page['fields']))
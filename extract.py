@@ -0,0 +1,406 @@
+# extract.py - Single round-trip job card extraction (browser script + HTML parser modes)
+import re, logging
+from collections import namedtuple
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+# A portal's selector fallbacks. Each field is tried in order, first non-empty match wins.
+SelectorSet = namedtuple('SelectorSet', ['cards', 'title', 'company', 'snippet', 'link', 'job_id_attr'])
+# Fields with per-selector [tried, hits, errors] counts in extraction results (selector_stats.py)
+COUNTED_FIELDS = ('cards', 'title', 'company', 'snippet', 'link')
+
+LINKEDIN_SELECTORS = SelectorSet(
+    cards=('.job-card-container', '[data-job-id]', '.jobs-search__results-list li', '.job-search-card'),
+    title=('.job-title', '[data-test="job-title"]', '.job-card__title'),
+    company=('.company-name', '[data-test="company-name"]', '.job-card__company'),
+    snippet=('.job-card-container__metadata-wrapper', '.job-card-list__insight', '.job-search-card__snippet'),
+    link=('a',),
+    job_id_attr='data-job-id',
+)
+
+# Runs inside the browser: evaluates every selector fallback for every card and
+# returns plain objects, so the whole results list costs one WebDriver call.
+JOB_CARDS_SCRIPT = """
+const [cardSels, titleSels, companySels, snippetSels, linkSels, idAttr, limit] = arguments;
+// Per field and selector: [tried, hits, errors], for selector_stats.py
+const counts = {cards: cardSels.map(() => [0, 0, 0]), title: titleSels.map(() => [0, 0, 0]),
+                company: companySels.map(() => [0, 0, 0]), snippet: snippetSels.map(() => [0, 0, 0]),
+                link: linkSels.map(() => [0, 0, 0])};
+const query = (root, sel, all) => {
+    try { return all ? root.querySelectorAll(sel) : root.querySelector(sel); }
+    catch (e) { return undefined; }
+};
+const first = (card, sels, field, pick) => {
+    for (let i = 0; i < sels.length; i++) {
+        const row = counts[field][i];
+        row[0]++;
+        const el = query(card, sels[i], false);
+        if (el === undefined) { row[2]++; continue; }
+        const value = el && pick(el);
+        if (value) { row[1]++; return value; }
+    }
+    return null;
+};
+const text = el => (el.innerText || el.textContent || '').trim();
+let cards = [];
+let cardSelector = null;
+for (let i = 0; i < cardSels.length; i++) {
+    const row = counts.cards[i];
+    row[0]++;
+    const found = query(document, cardSels[i], true);
+    if (found === undefined) { row[2]++; continue; }
+    if (found.length) { row[1]++; cards = Array.from(found); cardSelector = cardSels[i]; break; }
+}
+if (limit) cards = cards.slice(0, limit);
+return {
+    selector: cardSelector,
+    total: cards.length,
+    counts,
+    cards: cards.map(card => {
+        let jobId = card.getAttribute(idAttr);
+        if (!jobId) {
+            const inner = query(card, '[' + idAttr + ']', false);
+            jobId = inner ? inner.getAttribute(idAttr) : null;
+        }
+        return {
+            title: first(card, titleSels, 'title', text),
+            company: first(card, companySels, 'company', text),
+            snippet: first(card, snippetSels, 'snippet', text),
+            link: first(card, linkSels, 'link', el => el.href),
+            job_id: jobId,
+        };
+    }),
+};
+"""
+
+class InvalidSelector(ValueError):
+    """Raised for selectors the parser cannot compile (the browser would throw too)"""
+
+def extract_job_cards(driver, selectors=LINKEDIN_SELECTORS, limit=None, stats=None, name='cards'):
+    """
+    Extract all job cards on the current page with a single execute_script call.
+    Returns a list of dicts with title, company, snippet, link and job_id (None when missing).
+    With `stats` (a selector_stats.SelectorStats), fallbacks are passed in learned order
+    and the per-selector hit counts the script returns are recorded under `name`.
+    """
+    if stats is not None:
+        selectors = stats.order_set(name, selectors)
+    result = driver.execute_script(
+        JOB_CARDS_SCRIPT,
+        list(selectors.cards), list(selectors.title), list(selectors.company),
+        list(selectors.snippet), list(selectors.link), selectors.job_id_attr, limit or 0,
+    ) or {}
+    if stats is not None:
+        stats.record_extraction(name, selectors, result.get('counts'))
+    if result.get('selector'):
+        logger.info(f"Found {result['total']} job cards using selector: {result['selector']}")
+    return result.get('cards') or []
+
+def parse_job_cards(html, selectors=LINKEDIN_SELECTORS, limit=None, base_url=None, stats=None, name='cards'):
+    """
+    Same extraction as extract_job_cards, but from page HTML (e.g. driver.page_source).
+    Uses the compiled selector set, so no browser round-trips are needed at all.
+    """
+    if stats is not None:
+        selectors = stats.order_set(name, selectors)
+    result = extract_from_tree(parse_html(html), selectors, limit=limit, base_url=base_url)
+    if stats is not None:
+        stats.record_extraction(name, selectors, result['counts'])
+    if result['selector']:
+        logger.info(f"Found {result['total']} job cards using selector: {result['selector']}")
+    return result['cards']
+
+def extract_from_tree(root, selectors=LINKEDIN_SELECTORS, limit=None, base_url=None):
+    """Run the extraction against a parsed tree; returns the same shape as JOB_CARDS_SCRIPT"""
+    compiled = compile_selector_set(selectors)
+    counts = {field: [[0, 0, 0] for _ in getattr(compiled, field)] for field in COUNTED_FIELDS}
+    cards, card_selector = [], None
+    for sel, row in zip(compiled.cards, counts['cards']):
+        row[0] += 1
+        if sel is None:
+            row[2] += 1  # invalid selector: the browser would throw
+            continue
+        cards = sel.select_all(root)
+        if cards:
+            row[1] += 1
+            card_selector = sel.source
+            break
+    if limit:
+        cards = cards[:limit]
+
+    jobs = []
+    for card in cards:
+        href = _first(card, compiled.link, counts['link'], lambda node: node.attrs.get('href'))
+        jobs.append({
+            'title': _first(card, compiled.title, counts['title'], _node_text),
+            'company': _first(card, compiled.company, counts['company'], _node_text),
+            'snippet': _first(card, compiled.snippet, counts['snippet'], _node_text),
+            'link': urljoin(base_url, href) if (href and base_url) else href,
+            'job_id': card.attrs.get(selectors.job_id_attr) or _first_attr(card, compiled.job_id, selectors.job_id_attr),
+        })
+    return {'selector': card_selector, 'total': len(jobs), 'counts': counts, 'cards': jobs}
+
+def _node_text(node):
+    return node.text
+
+def _first(card, compiled_selectors, rows, pick):
+    """First non-empty pick(node) over the fallbacks, counting [tried, hits, errors] per selector"""
+    for sel, row in zip(compiled_selectors, rows):
+        row[0] += 1
+        if sel is None:
+            row[2] += 1
+            continue
+        node = sel.select_one(card)
+        value = pick(node) if node is not None else None
+        if value:
+            row[1] += 1
+            return value
+    return None
+
+def _first_attr(card, compiled_selectors, attr):
+    for sel in compiled_selectors:
+        node = sel.select_one(card)
+        if node is not None and node.attrs.get(attr):
+            return node.attrs[attr]
+    return None
+
+# ---------------------------------------------------------------------------
+# Minimal DOM + CSS selector engine for parser mode
+# ---------------------------------------------------------------------------
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+             'meta', 'param', 'source', 'track', 'wbr'}
+
+class Node:
+    """A parsed HTML element"""
+    __slots__ = ('tag', 'attrs', 'children', 'parent', '_text')
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+        self._text = None
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    @property
+    def text(self):
+        """Whitespace-normalized text content, like WebElement.text"""
+        if self._text is None:
+            parts = []
+            self._collect_text(parts)
+            self._text = ' '.join(' '.join(parts).split())
+        return self._text
+
+    def _collect_text(self, parts):
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif child.tag not in ('script', 'style'):
+                child._collect_text(parts)
+
+    def iter_descendants(self):
+        stack = [c for c in reversed(self.children) if not isinstance(c, str)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(c for c in reversed(node.children) if not isinstance(c, str))
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else '') for k, v in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else '') for k, v in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # Close back to the matching open tag; tolerate unclosed <li>/<p> etc.
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+def parse_html(html):
+    """Parse HTML into a Node tree rooted at a #document node"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+_COMPOUND_RE = re.compile(r'''
+    (?P<tag>^[a-zA-Z][\w-]*|^\*)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*)?\]
+''', re.VERBOSE)
+
+_ATTR_OPS = {
+    '=': lambda v, x: v == x,
+    '~=': lambda v, x: x in v.split(),
+    '^=': lambda v, x: bool(x) and v.startswith(x),
+    '$=': lambda v, x: bool(x) and v.endswith(x),
+    '*=': lambda v, x: bool(x) and x in v,
+    '|=': lambda v, x: v == x or v.startswith(x + '-'),
+}
+
+class _Compound:
+    __slots__ = ('tag', 'ids', 'classes', 'attrs')
+
+    def __init__(self, source):
+        self.tag, self.ids, self.classes, self.attrs = None, [], [], []
+        pos = 0
+        while pos < len(source):
+            m = _COMPOUND_RE.match(source, pos)
+            if not m or m.end() == pos:
+                raise InvalidSelector(f"Unsupported selector syntax: {source!r}")
+            if m.group('tag'):
+                self.tag = None if m.group('tag') == '*' else m.group('tag').lower()
+            elif m.group('id'):
+                self.ids.append(m.group('id'))
+            elif m.group('cls'):
+                self.classes.append(m.group('cls'))
+            else:
+                value = next((g for g in (m.group('dq'), m.group('sq'), m.group('bare')) if g is not None), None)
+                self.attrs.append((m.group('attr').lower(), m.group('op'), value))
+            pos = m.end()
+
+    def matches(self, node):
+        if self.tag and node.tag != self.tag:
+            return False
+        if self.ids and any(node.attrs.get('id') != i for i in self.ids):
+            return False
+        if self.classes:
+            node_classes = node.classes
+            if any(c not in node_classes for c in self.classes):
+                return False
+        for name, op, value in self.attrs:
+            if name not in node.attrs:
+                return False
+            if op and not _ATTR_OPS[op](node.attrs[name], value):
+                return False
+        return True
+
+def _tokenize(source):
+    """Split a selector on combinators, keeping [attr="a b"] blocks intact"""
+    tokens, current, quote, depth = [], '', None, 0
+    for ch in source.strip():
+        if quote:
+            quote = None if ch == quote else quote
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '[':
+            depth += 1
+        elif ch == ']':
+            depth -= 1
+        elif depth == 0 and (ch.isspace() or ch == '>'):
+            if current:
+                tokens.append(current)
+                current = ''
+            if ch == '>':
+                tokens.append('>')
+            continue
+        current += ch
+    if quote or depth:
+        raise InvalidSelector(f"Unbalanced selector: {source!r}")
+    if current:
+        tokens.append(current)
+    return tokens
+
+class CompiledSelector:
+    """A CSS selector compiled for the parser-mode DOM (descendant and child combinators)"""
+    __slots__ = ('source', 'parts')
+
+    def __init__(self, source):
+        self.source = source
+        tokens = _tokenize(source)
+        if not tokens or tokens[0] == '>' or tokens[-1] == '>':
+            raise InvalidSelector(f"Unsupported selector syntax: {source!r}")
+        # Stored right-to-left as (compound, combinator-to-the-left)
+        parts, combinator = [], ' '
+        for token in reversed(tokens):
+            if token == '>':
+                combinator = '>'
+                continue
+            if parts:
+                parts[-1] = (parts[-1][0], combinator)
+            parts.append((_Compound(token), None))
+            combinator = ' '
+        self.parts = parts
+
+    def matches(self, node):
+        return self._match_from(node, 0)
+
+    def _match_from(self, node, index):
+        compound, combinator = self.parts[index]
+        if not compound.matches(node):
+            return False
+        if combinator is None:
+            return True
+        parent = node.parent
+        if combinator == '>':
+            return parent is not None and parent.tag != '#document' and self._match_from(parent, index + 1)
+        while parent is not None and parent.tag != '#document':
+            if self._match_from(parent, index + 1):
+                return True
+            parent = parent.parent
+        return False
+
+    def select_all(self, root):
+        return [n for n in root.iter_descendants() if self.matches(n)]
+
+    def select_one(self, root):
+        for node in root.iter_descendants():
+            if self.matches(node):
+                return node
+        return None
+
+CompiledSelectorSet = namedtuple('CompiledSelectorSet', ['cards', 'title', 'company', 'snippet', 'link', 'job_id'])
+
+_compiled_cache = {}
+
+def compile_selectors(sources, placeholders=False):
+    """
+    Compile a selector fallback list, dropping (and logging) selectors that cannot
+    compile, or with `placeholders` keeping None in their place so positions match
+    """
+    compiled = []
+    for source in sources:
+        try:
+            compiled.append(CompiledSelector(source))
+        except InvalidSelector as e:
+            logger.debug(f"Skipping selector: {e}")
+            if placeholders:
+                compiled.append(None)
+    return tuple(compiled)
+
+def compile_selector_set(selectors):
+    """Compile (and memoize) a SelectorSet for parser mode"""
+    compiled = _compiled_cache.get(selectors)
+    if compiled is None:
+        compiled = CompiledSelectorSet(
+            cards=compile_selectors(selectors.cards, placeholders=True),
+            title=compile_selectors(selectors.title, placeholders=True),
+            company=compile_selectors(selectors.company, placeholders=True),
+            snippet=compile_selectors(selectors.snippet, placeholders=True),
+            link=compile_selectors(selectors.link, placeholders=True),
+            job_id=compile_selectors([f'[{selectors.job_id_attr}]']),
+        )
+        _compiled_cache[selectors] = compiled
+    return compiled
@@ -1,17 +1,250 @@
 # gui.py
-from flask import Flask, render_template_string, request, redirect
-import pandas as pd
-import json, os, threading
-from run import main_automation_process
+from flask import Flask, render_template_string, request, redirect, jsonify, Response
+import datetime, itertools, json, os, threading
+from collections import deque
+from config import Config
+from analytics import get_analytics
+from log_stats import LogTail
 
 app = Flask(__name__)
 CONFIG_FILE = 'config.json'
 LOG_FILE = 'application_log.csv'
+MAX_PER_PAGE = 500
+MAX_RUN_EVENTS = 1000
+SSE_HEARTBEAT_SEC = 15
+
+class ConfigCache:
+    """
+    One config.Config for the GUI, validated when loaded and re-read only when
+    config.json changes. Runs are started with this same object, so filter and
+    pacing edits reach a running batch before its next job.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._config = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._config is None:
+                self._config = Config.load(self.path)
+            else:
+                self._config.reload()
+            return self._config
+
+    def save(self, conf):
+        with self._lock:
+            with open(self.path, 'w') as f:
+                json.dump(conf, f, indent=2)
+            if self._config is not None:
+                self._config.reload(force=True)
+
+config_cache = ConfigCache(CONFIG_FILE)
+_tails = {}
+
+def log_tail():
+    """The LogTail for the configured CSV log, refreshed with rows appended since the last request"""
+    path = config_cache.get().get('csv_log_file', LOG_FILE)
+    tail = _tails.get(path)
+    if tail is None:
+        tail = _tails.setdefault(path, LogTail(path))
+    tail.refresh()
+    return tail
+
+class Run:
+    """
+    One background automation run: its state, result counters and a bounded
+    history of progress events (numbered, so SSE clients can resume with
+    Last-Event-ID). States: starting, waiting_for_login, running, finished, failed.
+    """
+
+    def __init__(self, run_id, profile, config):
+        self.id = run_id
+        self.profile = profile
+        self.config = config
+        self.state = 'starting'
+        self.stage = None
+        self.started = datetime.datetime.now().isoformat()
+        self.finished = None
+        self.results = {}
+        self.error = None
+        self.events = deque(maxlen=MAX_RUN_EVENTS)
+        self._seq = 0
+        self._changed = threading.Condition()
+        self._logged_in = threading.Event()
+
+    @property
+    def active(self):
+        return self.state not in ('finished', 'failed')
+
+    def emit(self, event):
+        """Record a progress event from main_automation_process and update the run state"""
+        kind = event.get('type')
+        with self._changed:
+            if kind == 'stage':
+                self.stage = event['stage']
+                if self.state != 'waiting_for_login' and self.stage != 'config':
+                    self.state = 'running'
+            elif kind == 'job':
+                status = event.get('status')
+                self.results[status] = self.results.get(status, 0) + 1
+            elif kind == 'summary':
+                self.results = dict(event.get('results') or {})
+            elif kind == 'error':
+                self.error = event.get('message')
+            self._append(event)
+
+    def _append(self, event):
+        self._seq += 1
+        self.events.append((self._seq, dict(event, time=datetime.datetime.now().isoformat(), state=self.state)))
+        self._changed.notify_all()
+
+    def _set_state(self, state, **event):
+        with self._changed:
+            self.state = state
+            if not self.active:
+                self.finished = datetime.datetime.now().isoformat()
+            self._append(dict(event, type='state'))
+
+    def wait_for_login(self, portal):
+        """Replaces the console input() prompt: blocks until /api/run/<id>/continue is posted"""
+        self._set_state('waiting_for_login', portal=portal)
+        self._logged_in.wait()
+        self._logged_in.clear()  # each worker session waits for its own confirmation
+        self._set_state('running', portal=portal)
+
+    def continue_login(self):
+        if self.state != 'waiting_for_login':
+            return False
+        self._logged_in.set()
+        return True
+
+    def events_after(self, seq, timeout=None):
+        """Events newer than `seq`, waiting up to `timeout` for one if there are none yet"""
+        with self._changed:
+            if self._seq <= seq and self.active:
+                self._changed.wait(timeout)
+            return [(n, e) for n, e in self.events if n > seq]
+
+    def to_dict(self):
+        with self._changed:
+            return {
+                'id': self.id, 'profile': self.profile, 'state': self.state, 'stage': self.stage,
+                'started': self.started, 'finished': self.finished, 'results': dict(self.results),
+                'error': self.error, 'events': self._seq,
+            }
+
+class RunManager:
+    """Starts runs in background threads, allowing one active run per browser profile"""
+
+    def __init__(self, target=None):
+        self.target = target  # default run.main_automation_process, imported with the first run
+        self.runs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def profile_key(config):
+        from driver_factory import profile_dir_for
+        profile_dir = profile_dir_for(config)
+        return os.path.abspath(profile_dir) if profile_dir else 'default'
+
+    def active_run(self, profile):
+        for run in self.runs.values():
+            if run.profile == profile and run.active:
+                return run
+        return None
+
+    def start(self, config, workers=None):
+        """Start a run, or return (None, busy_run) if its profile is already in use"""
+        profile = self.profile_key(config)
+        with self._lock:
+            busy = self.active_run(profile)
+            if busy:
+                return None, busy
+            run = Run(str(next(self._ids)), profile, config)
+            self.runs[run.id] = run
+        thread = threading.Thread(target=self._run, args=(run, workers), name=f'run-{run.id}', daemon=True)
+        thread.start()
+        return run, None
+
+    def _run(self, run, workers):
+        try:
+            target = self.target
+            if target is None:
+                # Selenium and the apply modules load here, not at server startup
+                from run import main_automation_process as target
+            results = target(workers=workers, config=run.config,
+                             wait_for_login=run.wait_for_login, on_event=run.emit)
+        except Exception as e:
+            run.emit({'type': 'error', 'message': str(e)})
+            results = None
+        if results is None:
+            run._set_state('failed', error=run.error)
+        else:
+            run._set_state('finished', results=results)
+
+    def get(self, run_id):
+        return self.runs.get(run_id)
+
+run_manager = RunManager()
+
+DASHBOARD = """
+<h2>Job Auto Applier</h2>
+<p>{{ stats.total }} applications logged
+{% for status, count in stats.by_status.items() %} &middot; {{ status }}: {{ count }}{% endfor %}</p>
+<form method="post">
+  <label>Keywords <input name="keywords" value="{{ conf.filters.keywords|join(',') }}"></label>
+  <label>Location <input name="location" value="{{ conf.filters.location }}"></label>
+  <label>Experience <input name="experience_level" value="{{ conf.filters.experience_level }}"></label>
+  <label>Resume <input name="resume_path" value="{{ conf.resume_path }}"></label>
+  <button type="submit">Save</button>
+</form>
+<h3>Run</h3>
+<form id="start-run"><button type="submit">Start run</button></form>
+<button id="continue-login" hidden>Logged in, continue</button>
+<p id="run-state">{% if run %}Run {{ run.id }}: {{ run.state }}{% else %}No run started{% endif %}</p>
+<ul id="run-events"></ul>
+<script>
+const state = document.getElementById('run-state');
+const events = document.getElementById('run-events');
+const continueButton = document.getElementById('continue-login');
+let runId = {{ (run.id if run else '')|tojson }};
+function follow(id) {
+  runId = id;
+  const source = new EventSource('/api/run/' + id + '/events');
+  source.onmessage = msg => {
+    const e = JSON.parse(msg.data);
+    state.textContent = 'Run ' + id + ': ' + e.state + (e.stage ? ' (' + e.stage + ')' : '');
+    continueButton.hidden = e.state !== 'waiting_for_login';
+    const li = document.createElement('li');
+    li.textContent = e.type === 'job' ? e.status + ': ' + e.title + ' at ' + e.company
+      : e.type + ': ' + (e.stage || e.message || e.portal || JSON.stringify(e.results || ''));
+    events.prepend(li);
+  };
+  source.addEventListener('end', () => source.close());
+}
+document.getElementById('start-run').onsubmit = ev => {
+  ev.preventDefault();
+  fetch('/api/run', {method: 'POST'}).then(r => r.json()).then(r => {
+    if (r.id) { events.innerHTML = ''; follow(r.id); } else { state.textContent = r.error; }
+  });
+};
+continueButton.onclick = () => fetch('/api/run/' + runId + '/continue', {method: 'POST'});
+if (runId) follow(runId);
+</script>
+<h3>Recent failures</h3>
+<ul>{% for row in stats.recent_failures[:10] %}<li>{{ row.time }} {{ row.title }} at {{ row.company }}: {{ row.error }}</li>{% endfor %}</ul>
+<p>JSON: <a href="/api/stats">/api/stats</a> &middot; <a href="/api/applications">/api/applications</a>
+&middot; <a href="/api/runs">/api/runs</a></p>
+"""
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
-    conf = json.load(open(CONFIG_FILE, 'r'))
+    conf = config_cache.get()
     if request.method == 'POST':
+        conf = dict(conf)
         form_filters = {
             "keywords": request.form['keywords'].split(','),
             "location": request.form['location'],
@@ -19,11 +252,86 @@ def index():
         }
         conf['filters'] = form_filters
         conf['resume_path'] = request.form['resume_path']
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(conf, f)
+        config_cache.save(conf)
         return redirect('/')
-    df = pd.read_csv(LOG_FILE) if os.path.exists(LOG_FILE) else pd.DataFrame()
-    return '<h2>Job Auto Applier - Edit config.json and run.py manually</h2>'
+    run = run_manager.active_run(RunManager.profile_key(conf))
+    return render_template_string(DASHBOARD, conf=conf, stats=log_tail().stats(), run=run)
+
+@app.route('/api/stats')
+def api_stats():
+    return jsonify(log_tail().stats(top_companies=request.args.get('top', 20, type=int)))
+
+@app.route('/api/analytics')
+def api_analytics():
+    conf = config_cache.get()
+    options = conf.get('analytics')
+    # Reported even when job ordering by it is switched off (config "analytics": false)
+    analytics = get_analytics({'csv_log_file': conf.get('csv_log_file', LOG_FILE),
+                               'analytics': options if isinstance(options, dict) else {}})
+    analytics.refresh()
+    return jsonify(analytics.report(top=request.args.get('top', 10, type=int),
+                                    min_attempts=request.args.get('min_attempts', 3, type=int)))
+
+@app.route('/api/applications')
+def api_applications():
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), MAX_PER_PAGE)
+    status = request.args.get('status') or None
+    return jsonify(log_tail().page(page, per_page, status=status))
+
+@app.route('/api/run', methods=['POST'])
+def api_start_run():
+    """Start a run with the saved config; 409 if its browser profile already has an active run"""
+    workers = request.args.get('workers', type=int)
+    run, busy = run_manager.start(config_cache.get(), workers=workers)
+    if busy:
+        return jsonify({'error': f"Run {busy.id} is already using this browser profile", 'run': busy.to_dict()}), 409
+    return jsonify(run.to_dict()), 202
+
+@app.route('/api/runs')
+def api_runs():
+    return jsonify([run.to_dict() for run in run_manager.runs.values()])
+
+@app.route('/api/run/<run_id>')
+def api_run(run_id):
+    run = run_manager.get(run_id)
+    if run is None:
+        return jsonify({'error': 'unknown run'}), 404
+    return jsonify(run.to_dict())
+
+@app.route('/api/run/<run_id>/continue', methods=['POST'])
+def api_continue_run(run_id):
+    """The browser login is done: let the run proceed"""
+    run = run_manager.get(run_id)
+    if run is None:
+        return jsonify({'error': 'unknown run'}), 404
+    if not run.continue_login():
+        return jsonify({'error': f"Run is not waiting for login (state: {run.state})"}), 409
+    return jsonify(run.to_dict())
+
+@app.route('/api/run/<run_id>/events')
+def api_run_events(run_id):
+    """Server-sent events with the run's progress; resumes after Last-Event-ID and ends with the run"""
+    run = run_manager.get(run_id)
+    if run is None:
+        return jsonify({'error': 'unknown run'}), 404
+    last_seen = request.headers.get('Last-Event-ID', request.args.get('after', 0), type=int)
+
+    def stream(seq):
+        while True:
+            batch = run.events_after(seq, timeout=SSE_HEARTBEAT_SEC)
+            for seq, event in batch:
+                yield f"id: {seq}\ndata: {json.dumps(event)}\n\n"
+            if not batch:
+                if not run.active:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                yield ": keep-alive\n\n"
+
+    return Response(stream(last_seen), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 if __name__ == '__main__':
-    app.run(port=8080, debug=True)
+    from cli import configure_logging, read_settings
+    configure_logging(read_settings(CONFIG_FILE))
+    app.run(port=8080, debug=True, threaded=True)
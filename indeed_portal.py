@@ -0,0 +1,123 @@
+# indeed_portal.py - Indeed adapter: job search and the Indeed Apply form
+import logging
+from urllib.parse import urlencode
+from selenium.webdriver.common.by import By
+from easy_apply import EasyApplyFlow
+from extract import SelectorSet
+from job_details import DetailSelectors
+from portals import PortalAdapter, normalize_job
+from waits import css
+
+logger = logging.getLogger(__name__)
+
+INDEED_DOMAIN = 'www.indeed.com'
+
+INDEED_SELECTORS = SelectorSet(
+    cards=('.job_seen_beacon', '.jobsearch-ResultsList > li .cardOutline', '.tapItem', 'div[data-jk]'),
+    title=('h2.jobTitle span[title]', 'h2.jobTitle', '.jobTitle', '[data-testid="jobTitle"]'),
+    company=('[data-testid="company-name"]', '.companyName', '.company'),
+    snippet=('[data-testid="job-snippet"]', '.job-snippet', '[data-testid="text-location"]', '.companyLocation'),
+    link=('a.jcs-JobTitle', 'h2.jobTitle a', 'a[data-jk]', 'a'),
+    job_id_attr='data-jk',
+)
+
+JOB_PAGE_LOCATORS = css('#jobDescriptionText', '.jobsearch-JobComponent', '#viewJobSSRRoot', 'main')
+INDEED_DETAIL_SELECTORS = DetailSelectors(
+    description=('#jobDescriptionText', '.jobsearch-jobDescriptionText', '[data-testid="jobDescriptionText"]'),
+    apply_button=('#indeedApplyButton', '[data-testid="indeedApplyButton"]', '.jobsearch-IndeedApplyButton-newDesign',
+                  '#applyButtonLinkContainer a', '#applyButtonLinkContainer button', 'button[aria-label*="Apply"]'),
+    applicants=(),  # Indeed does not show applicant counts
+)
+
+# "Apply now" opens the Indeed Apply form; anything else ("Apply on company site") leaves Indeed
+INDEED_APPLY_LOCATORS = css('#indeedApplyButton', '[data-testid="indeedApplyButton"]',
+                            '.jobsearch-IndeedApplyButton-newDesign')
+
+class IndeedApplyFlow(EasyApplyFlow):
+    """The Indeed Apply form (contact info, resume, employer questions, review), walked like Easy Apply"""
+    name = 'Indeed Apply'
+    modal_selector = '#ia-container, .ia-BasePage, [data-testid="ia-container"]'
+    modal_locators = css('#ia-container', '.ia-BasePage', '[data-testid="ia-container"]')
+    upload_confirm_locators = css('[data-testid="FileResumeCardHeader-title"]', '.ia-ResumeCard-fileName',
+                                  '[data-testid="resume-file-name"]')
+    submitted_locators = css('.ia-PostApply', '[data-testid="ia-PostApply"]', '[data-testid="post-apply-page"]')
+    actions = (
+        ('submit', css('button[data-testid*="submit"]', '.ia-SubmitButton', 'button[aria-label*="Submit"]')
+         + [(By.XPATH, '//button[contains(., "Submit your application")]')]),
+        ('review', css('button[data-testid*="review"]', 'button[aria-label*="Review"]')),
+        ('next', css('button[data-testid*="continue"]', '.ia-continueButton', 'button[aria-label*="Continue"]')
+         + [(By.XPATH, '//button[contains(., "Continue")]')]),
+        ('submit', css('button[type="submit"]')),
+    )
+
+def _window_handles(driver):
+    try:
+        return list(driver.window_handles)
+    except Exception:
+        return []
+
+class IndeedAdapter(PortalAdapter):
+    name = 'indeed'
+    display_name = 'Indeed'
+    home_url = f'https://{INDEED_DOMAIN}/'
+    page_size = 10
+    selectors = INDEED_SELECTORS
+    results_list = None  # paginated, not infinite scroll
+    job_page_locators = JOB_PAGE_LOCATORS
+    detail_selectors = INDEED_DETAIL_SELECTORS
+    easy_apply_labels = ('apply now', 'easily apply', 'indeed apply')
+    session_cookies = ('SOCK', 'SHOE')
+    logged_in_locators = css('[data-gnav-element-name="AccountMenu"]', '#AccountMenu', 'a[href*="/account/view"]')
+    login_paths = ('secure.indeed.com/auth', '/account/login')
+
+    def domain(self, config):
+        """Country site from config 'indeed_domain', e.g. "in.indeed.com" (default www.indeed.com)"""
+        return config.get('indeed_domain') or INDEED_DOMAIN
+
+    def login_url(self, config):
+        return f"https://{self.domain(config)}/"
+
+    def search_url(self, config, page):
+        filters = config.get('filters') or {}
+        params = {
+            'q': ' OR '.join(filters.get('keywords') or []),
+            'l': filters.get('location') or '',
+            'start': page * self.page_size,
+        }
+        return f"https://{self.domain(config)}/jobs?{urlencode(params)}"
+
+    def normalize(self, card, config):
+        job = normalize_job(card, self.name)
+        # Result links are click-tracking redirects (/rc/clk?jk=...); the job key makes a stable one
+        if job and job['job_id']:
+            job['link'] = f"https://{self.domain(config)}/viewjob?jk={job['job_id']}"
+        return job
+
+    def apply(self, driver, job, config, ready):
+        try:
+            logger.info("Looking for Indeed Apply button...")
+            button = ready.clickable('indeed_apply_button', INDEED_APPLY_LOCATORS, timeout=ready.optional_timeout)
+            if not button:
+                logger.warning("No Indeed Apply button; this job applies on the company site.")
+                return 'manual_required'
+
+            logger.info("Clicking Indeed Apply button...")
+            ready.pause('indeed_apply_button')
+            before = _window_handles(driver)
+            button.click()
+            # Indeed Apply sometimes opens in a new tab
+            opened = [h for h in _window_handles(driver) if h not in before]
+            if opened:
+                driver.switch_to.window(opened[-1])
+            try:
+                if not ready.present('modal', IndeedApplyFlow.modal_locators):
+                    logger.warning("Indeed Apply form did not appear. This may be an external application.")
+                    return 'manual_required'
+                return IndeedApplyFlow(driver, job, config, ready).run()
+            finally:
+                if opened:
+                    driver.close()
+                    driver.switch_to.window(before[0])
+        except Exception as e:
+            logger.error(f"Error in Indeed Apply: {e}")
+            return 'failed'
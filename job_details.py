@@ -0,0 +1,232 @@
+# job_details.py - Lazily fetched job-detail pages with a content-addressed disk cache
+import hashlib, json, logging, re, sqlite3, threading, time
+from collections import namedtuple
+from extract import compile_selectors, parse_html
+from job_index import canonical_job_id
+from job_records import with_fields
+from portals import adapter_for
+from tracing import span
+from waits import Readiness, css
+
+logger = logging.getLogger(__name__)
+
+DETAIL_CACHE_FILE = 'job_details.db'
+DEFAULT_TTL_HOURS = 24 * 7
+DEFAULT_MAX_ENTRIES = 5000
+
+# A job page's selector fallbacks, tried in order (like extract.SelectorSet)
+DetailSelectors = namedtuple('DetailSelectors', ['description', 'apply_button', 'applicants'])
+
+# LinkedIn: the job page has rendered once one of these is present
+JOB_PAGE_LOCATORS = css('.jobs-unified-top-card', '.job-details-jobs-unified-top-card__container--two-pane',
+                        '.jobs-details', 'main')
+DESCRIPTION_SELECTORS = ('.jobs-description__content', '.jobs-description-content__text', '#job-details',
+                         '.jobs-box__html-content')
+APPLY_BUTTON_SELECTORS = ('.jobs-apply-button', '[data-test-job-apply-button]', 'button[aria-label*="Apply"]')
+APPLICANT_SELECTORS = ('.jobs-unified-top-card__applicant-count', '.num-applicants__caption',
+                       '.jobs-unified-top-card__bullet')
+LINKEDIN_DETAIL_SELECTORS = DetailSelectors(DESCRIPTION_SELECTORS, APPLY_BUTTON_SELECTORS, APPLICANT_SELECTORS)
+
+_COUNT_RE = re.compile(r'(\d[\d,]*)')
+
+# Reads everything the detail cache stores from the open job page in one round-trip
+JOB_DETAILS_SCRIPT = """
+const [descSels, applySels, applicantSels] = arguments;
+const first = sels => {
+    for (const sel of sels) {
+        try { const el = document.querySelector(sel); if (el) return el; } catch (e) {}
+    }
+    return null;
+};
+const text = el => (el ? (el.innerText || el.textContent || '') : '').replace(/\\s+/g, ' ').trim();
+const button = first(applySels);
+return {
+    description: text(first(descSels)),
+    apply_label: button ? ((button.getAttribute('aria-label') || '') + ' ' + text(button)).trim() : null,
+    applicants: text(first(applicantSels)),
+};
+"""
+
+def normalize_details(raw, easy_apply_labels=('easy apply',)):
+    """
+    Turn raw page fields into the cached record:
+    {description, apply_type: 'easy_apply' | 'external' | None, applicants: int | None}
+    The apply button counts as Easy Apply when its label contains one of `easy_apply_labels`.
+    """
+    raw = raw or {}
+    label = raw.get('apply_label')
+    if label is None:
+        apply_type = None
+    else:
+        label = label.lower()
+        apply_type = 'easy_apply' if any(text in label for text in easy_apply_labels) else 'external'
+    m = _COUNT_RE.search(raw.get('applicants') or '')
+    return {
+        'description': raw.get('description') or '',
+        'apply_type': apply_type,
+        'applicants': int(m.group(1).replace(',', '')) if m else None,
+    }
+
+def extract_details_from_tree(root, selectors=LINKEDIN_DETAIL_SELECTORS):
+    """Parser-mode equivalent of JOB_DETAILS_SCRIPT (raw fields)"""
+    def first(candidates):
+        for sel in compile_selectors(candidates):
+            node = sel.select_one(root)
+            if node is not None:
+                return node
+        return None
+
+    button = first(selectors.apply_button)
+    description, applicants = first(selectors.description), first(selectors.applicants)
+    return {
+        'description': description.text if description is not None else '',
+        'apply_label': f"{button.attrs.get('aria-label', '')} {button.text}".strip() if button is not None else None,
+        'applicants': applicants.text if applicants is not None else '',
+    }
+
+def read_job_details(driver, mode='script', selectors=LINKEDIN_DETAIL_SELECTORS, easy_apply_labels=('easy apply',)):
+    """Parsed details of the job page currently open in `driver` (one round-trip either way)"""
+    if mode == 'parser':
+        raw = extract_details_from_tree(parse_html(driver.page_source), selectors)
+    else:
+        raw = driver.execute_script(JOB_DETAILS_SCRIPT, list(selectors.description), list(selectors.apply_button),
+                                    list(selectors.applicants))
+    return normalize_details(raw, easy_apply_labels)
+
+def content_hash(details):
+    return hashlib.sha1(json.dumps(details, sort_keys=True).encode('utf-8')).hexdigest()
+
+class JobDetailCache:
+    """
+    On-disk cache of parsed job details (SQLite, WAL).
+
+    Details are stored once per content hash in `pages`; `jobs` maps each
+    canonical job ID to the hash it last had, so reposted or unchanged jobs
+    share one record. Entries older than `ttl_sec` are misses, and once there
+    are more than `max_entries` jobs the least recently used ones are evicted
+    along with details no job refers to any more.
+    """
+
+    def __init__(self, path=DETAIL_CACHE_FILE, ttl_sec=DEFAULT_TTL_HOURS * 3600, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS pages (digest TEXT PRIMARY KEY, details TEXT NOT NULL)'
+                           ' WITHOUT ROWID')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, digest TEXT NOT NULL,'
+                           ' fetched REAL NOT NULL, accessed REAL NOT NULL) WITHOUT ROWID')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_accessed ON jobs (accessed)')
+        self._conn.commit()
+        self._count = self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def get(self, job):
+        """Cached details for a job, or None if unknown or expired (never navigates)"""
+        job_id = canonical_job_id(job)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT p.details, j.fetched FROM jobs j JOIN pages p ON p.digest = j.digest WHERE j.job_id = ?',
+                (job_id,)).fetchone()
+            if row is None or (self.ttl_sec and now - row[1] > self.ttl_sec):
+                return None
+            self._conn.execute('UPDATE jobs SET accessed = ? WHERE job_id = ?', (now, job_id))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, job, details):
+        """Store a job's details; returns their content hash"""
+        digest = content_hash(details)
+        now = time.time()
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO pages VALUES (?, ?)', (digest, json.dumps(details)))
+            self._conn.execute('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)',
+                               (canonical_job_id(job), digest, now, now))
+            self._count += 1  # an upper bound; _evict() recounts before evicting anything
+            if self.max_entries and self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+        return digest
+
+    def _evict(self):
+        self._count = self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+        if self._count <= self.max_entries:
+            return
+        excess = self._count - int(self.max_entries * 0.9)  # evict in batches, not on every put
+        self._conn.execute('DELETE FROM jobs WHERE job_id IN '
+                           '(SELECT job_id FROM jobs ORDER BY accessed LIMIT ?)', (excess,))
+        self._conn.execute('DELETE FROM pages WHERE digest NOT IN (SELECT digest FROM jobs)')
+        self._count -= excess
+        logger.info(f"Evicted {excess} least recently used job details from {self.path}")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_detail_cache(config):
+    """
+    Shared JobDetailCache from config 'detail_cache' (None when set to false):
+    {"path": "job_details.db", "ttl_hours": 168, "max_entries": 5000}
+    """
+    options = config.get('detail_cache', {})
+    if options is False:
+        return None
+    options = options if isinstance(options, dict) else {}
+    path = options.get('path', DETAIL_CACHE_FILE)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = JobDetailCache(path, ttl_sec=options.get('ttl_hours', DEFAULT_TTL_HOURS) * 3600,
+                                           max_entries=options.get('max_entries', DEFAULT_MAX_ENTRIES))
+        return _caches[path]
+
+class JobDetailFetcher:
+    """
+    Job details for the stages that need them, from the cache when possible.
+    cached() never touches the browser, fetch() navigates only on a cache miss,
+    and visit() always opens the job page (the apply stage needs it open anyway)
+    and refreshes the cache from it.
+    """
+
+    def __init__(self, driver, config, cache=None, ready=None):
+        self.driver = driver
+        self.config = config
+        self.cache = cache if cache is not None else get_detail_cache(config)
+        self.ready = ready
+        self.mode = config.get('extraction_mode', 'script')
+
+    def cached(self, job):
+        return self.cache.get(job) if self.cache is not None else None
+
+    def fetch(self, job):
+        details = self.cached(job)
+        if details is None:
+            details = self.visit(job)
+        return details
+
+    def visit(self, job):
+        ready = self.ready or Readiness(self.driver, self.config)
+        adapter = adapter_for(job, self.config)
+        with span('navigate', 'job_page'):
+            self.driver.get(job['link'])
+        ready.page_loaded('job_page', adapter.job_page_locators)
+        with span('details.read'):
+            details = read_job_details(self.driver, self.mode, adapter.detail_selectors, adapter.easy_apply_labels)
+        if self.cache is not None:
+            self.cache.put(job, details)
+        return details
+
+def with_details(jobs, fetcher, fields=('description',)):
+    """Yield jobs with detail `fields` filled in (from the cache, or by opening the job page)"""
+    for job in jobs:
+        details = fetcher.fetch(job)
+        yield with_fields(job, **{f: details.get(f) for f in fields})
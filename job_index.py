@@ -0,0 +1,134 @@
+# job_index.py - Persistent index of seen/applied jobs for dedup across runs
+import csv, hashlib, logging, os, re, sqlite3, threading, datetime
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'job_index.db'
+
+# Jobs in these states are never attempted again; 'failed' and 'seen' are retried
+DONE_STATUSES = ('success', 'manual_required', 'partial')
+
+_LINK_ID_PATTERNS = [
+    ('linkedin', re.compile(r'linkedin\.com/jobs/view/(?:[^/?#]*-)?(\d+)')),
+    ('linkedin', re.compile(r'[?&]currentJobId=(\d+)')),
+    ('indeed', re.compile(r'indeed\.[^/]+/.*[?&](?:jk|vjk)=([0-9a-fA-F]+)')),
+]
+
+def canonical_job_id(job):
+    """
+    Stable ID for a job: the portal's own job ID when known (data-job-id, or parsed
+    from the link), otherwise a hash of the normalized link, otherwise of title+company.
+    """
+    portal = (job.get('portal') or '').lower()
+    if job.get('job_id'):
+        return f"{portal or 'job'}:{job['job_id']}"
+    link = job.get('link') or ''
+    if link and link != 'N/A':
+        for link_portal, pattern in _LINK_ID_PATTERNS:
+            m = pattern.search(link)
+            if m:
+                return f"{link_portal}:{m.group(1).lower()}"
+        parts = urlsplit(link.strip())
+        host = parts.netloc.lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        normalized = f"{host}{parts.path.rstrip('/')}"
+        return 'url:' + hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:20]
+    key = f"{job.get('title', '')}|{job.get('company', '')}".lower()
+    return 'tc:' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+class JobIndex:
+    """
+    SQLite-backed job index keyed on canonical_job_id.
+    Opening it is constant-time whatever the history size: rows are looked up
+    through the primary key on demand, never loaded up front.
+    """
+
+    def __init__(self, path=INDEX_FILE, csv_log=None):
+        fresh = not os.path.exists(path)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' job_id TEXT PRIMARY KEY, status TEXT NOT NULL, title TEXT, company TEXT,'
+            ' link TEXT, updated_at TEXT) WITHOUT ROWID'
+        )
+        self._conn.commit()
+        if fresh and csv_log and os.path.exists(csv_log):
+            self.import_csv(csv_log)
+
+    def status(self, job):
+        """Last recorded status for a job, or None if it has never been seen"""
+        with self._lock:
+            row = self._conn.execute('SELECT status FROM jobs WHERE job_id = ?',
+                                     (canonical_job_id(job),)).fetchone()
+        return row[0] if row else None
+
+    def is_done(self, job):
+        """True if the job was already applied to (or needs manual handling)"""
+        return self.status(job) in DONE_STATUSES
+
+    def done_ids(self, job_ids):
+        """The canonical IDs among `job_ids` that were already applied to (or need manual handling)"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return set()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_id FROM jobs WHERE job_id IN ({','.join('?' * len(job_ids))})"
+                f" AND status IN ({','.join('?' * len(DONE_STATUSES))})", job_ids + list(DONE_STATUSES)).fetchall()
+        return {row[0] for row in rows}
+
+    def rows(self):
+        """(job_id, title, company, link) of every indexed job, oldest first"""
+        with self._lock:
+            return self._conn.execute('SELECT job_id, title, company, link FROM jobs ORDER BY updated_at').fetchall()
+
+    def mark_seen(self, job):
+        """Record a job found by search without overwriting an existing status"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO jobs VALUES (?, ?, ?, ?, ?, ?)',
+                (canonical_job_id(job), 'seen', job.get('title'), job.get('company'),
+                 job.get('link'), datetime.datetime.now().isoformat()),
+            )
+            self._conn.commit()
+
+    def record(self, job, status):
+        """Record the outcome of an application attempt"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)',
+                (canonical_job_id(job), status, job.get('title'), job.get('company'),
+                 job.get('link'), datetime.datetime.now().isoformat()),
+            )
+            self._conn.commit()
+
+    def import_csv(self, csv_log):
+        """Backfill the index from an existing application_log.csv (done once, on creation)"""
+        count = 0
+        with open(csv_log, newline='', encoding='utf-8') as f, self._lock:
+            for row in csv.DictReader(f):
+                status = row.get('status')
+                if not status:
+                    continue
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)',
+                    (canonical_job_id(row), status, row.get('title'), row.get('company'),
+                     row.get('link'), row.get('time')),
+                )
+                count += 1
+            self._conn.commit()
+        logger.info(f"Imported {count} past applications from {csv_log} into {self.path}")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,523 @@
+# job_records.py - Compact job records: a slotted JobRecord, a columnar JobBatch, JSONL and Arrow hand-off files
+import json, logging, math, sys
+from array import array
+from itertools import accumulate
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('title', 'company', 'snippet', 'link', 'portal', 'job_id', 'score')
+TEXT_FIELDS = ('title', 'snippet', 'link', 'job_id')
+CATEGORY_FIELDS = ('company', 'portal')  # few distinct values: interned, stored as codes in a batch
+_MISSING = object()  # a field the job does not have (unlike None, which it has)
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+class JobRecord:
+    """
+    One job, in the shape normalize_job() produces, without a per-job dict: the
+    known fields are slots, company and portal strings are interned (one object
+    per distinct company), and any other key goes to a small `extra` dict made on
+    first use. Reads and writes like the dict it replaces (`job['title']`,
+    `job.get('score')`, `'score' in job`, `dict(job)`), so code written for dicts
+    keeps working; with_fields() copies it with fields added.
+    """
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, title=None, company=None, snippet=None, link=None, portal=None, job_id=None,
+                 score=_MISSING, **extra):
+        self.title = title
+        self.company = _intern(company)
+        self.snippet = snippet
+        self.link = link
+        self.portal = _intern(portal)
+        self.job_id = job_id
+        self.score = score
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, job):
+        """A JobRecord for a dict (or a JobRecord, returned as is)"""
+        if isinstance(job, cls):
+            return job
+        record = cls.__new__(cls)
+        record.title = record.snippet = record.link = record.job_id = record.score = _MISSING
+        record.company = record.portal = _MISSING
+        record.extra = None
+        for key, value in job.items():
+            record[key] = value
+        return record
+
+    def copy(self, **fields):
+        record = JobRecord.__new__(JobRecord)
+        for name in FIELDS:
+            setattr(record, name, getattr(self, name))
+        record.extra = dict(self.extra) if self.extra else None
+        for key, value in fields.items():
+            record[key] = value
+        return record
+
+    # Mapping interface
+    def __getitem__(self, key):
+        if key in FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in FIELDS:
+            setattr(self, key, _intern(value) if key in CATEGORY_FIELDS else value)
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self):
+        names = [name for name in FIELDS if getattr(self, name) is not _MISSING]
+        return names + list(self.extra) if self.extra else names
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return list(self.to_dict().items())
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def to_dict(self):
+        job = {}
+        for name in FIELDS:
+            value = getattr(self, name)
+            if value is not _MISSING:
+                job[name] = value
+        if self.extra:
+            job.update(self.extra)
+        return job
+
+    def __eq__(self, other):
+        if isinstance(other, (JobRecord, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None  # mutable, like the dict it stands in for
+
+    def __repr__(self):
+        return f"JobRecord({self.get('title')!r} at {self.get('company')!r}, {self.get('link')!r})"
+
+def as_dict(job):
+    """A plain dict for a job (JSON, the checkpoint journal)"""
+    return job.to_dict() if isinstance(job, JobRecord) else job
+
+def with_fields(job, **fields):
+    """A copy of a job (JobRecord or dict) with `fields` set"""
+    return job.copy(**fields) if isinstance(job, JobRecord) else dict(job, **fields)
+
+class _TextColumn:
+    """Strings as one UTF-8 buffer plus end offsets: no object per value until it is read"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array('q')
+        self.nulls = set()
+
+    def append(self, value):
+        if value is None or value is _MISSING:
+            self.nulls.add(len(self.ends))
+        else:
+            self.data += str(value).encode('utf-8')
+        self.ends.append(len(self.data))
+
+    def __getitem__(self, i):
+        if i in self.nulls:
+            return None
+        start = self.ends[i - 1] if i else 0
+        return self.data[start:self.ends[i]].decode('utf-8')
+
+    def __len__(self):
+        return len(self.ends)
+
+    def values(self, start=0, stop=None):
+        """Rows start..stop decoded; ASCII text (the usual case) is decoded in one call and sliced"""
+        stop = len(self.ends) if stop is None else stop
+        if start >= stop:
+            return []
+        first = self.ends[start - 1] if start else 0
+        ends = self.ends[start:stop]
+        chunk = self.data[first:ends[-1]]
+        if chunk.isascii():
+            text = chunk.decode('ascii')
+            out, offset = [], first
+            for end in ends:
+                out.append(text[offset - first:end - first])
+                offset = end
+        else:
+            view, out, offset = memoryview(chunk), [], first
+            for end in ends:
+                out.append(str(view[offset - first:end - first], 'utf-8'))
+                offset = end
+        for i in self.nulls:
+            if start <= i < stop:
+                out[i - start] = None
+        return out
+
+    def take(self, indices):
+        column = _TextColumn()
+        data, ends = self.data, self.ends
+        pieces = [data[ends[i - 1] if i else 0:ends[i]] for i in indices]
+        column.data = bytearray().join(pieces)
+        column.ends = array('q', accumulate(map(len, pieces)))
+        if self.nulls:
+            column.nulls = {row for row, i in enumerate(indices) if i in self.nulls}
+        return column
+
+    def to_arrow(self, pa):
+        """A large_string array over copies of this column's buffers"""
+        offsets = array('q', [0])
+        offsets.extend(self.ends)
+        validity = None
+        if self.nulls:
+            validity = pa.array([i not in self.nulls for i in range(len(self))], pa.bool_()).buffers()[1]
+        return pa.Array.from_buffers(pa.large_string(), len(self),
+                                     [validity, pa.py_buffer(offsets.tobytes()), pa.py_buffer(bytes(self.data))],
+                                     null_count=len(self.nulls))
+
+    @classmethod
+    def from_arrow(cls, pa, arr):
+        column = cls()
+        arr = arr.cast(pa.large_string())
+        n = len(arr)
+        offsets = array('q')
+        offsets.frombytes(arr.buffers()[1].to_pybytes()[8 * arr.offset:8 * (arr.offset + n + 1)])
+        first = offsets[0]
+        column.data = bytearray(arr.buffers()[2].to_pybytes()[first:offsets[-1]] if n else b'')
+        column.ends = array('q', [end - first for end in offsets[1:]])
+        if arr.null_count:
+            column.nulls = {i for i, null in enumerate(arr.is_null().to_pylist()) if null}
+        return column
+
+    def nbytes(self):
+        return len(self.data) + self.ends.itemsize * len(self.ends)
+
+class _CategoryColumn:
+    """Dictionary-encoded strings: one code per row, each distinct (interned) value stored once"""
+
+    def __init__(self, values=None):
+        self.codes = array('i')
+        self.values = list(values or [])
+        self._lookup = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        if value is _MISSING:
+            value = None
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(_intern(value))
+        return code
+
+    def append(self, value):
+        self.codes.append(self.code(value))
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def take(self, indices):
+        column = _CategoryColumn(self.values)
+        codes = self.codes
+        column.codes = array('i', [codes[i] for i in indices])
+        return column
+
+    def to_arrow(self, pa):
+        return pa.DictionaryArray.from_arrays(pa.array(self.codes, pa.int32()), pa.array(self.values, pa.string()))
+
+    @classmethod
+    def from_arrow(cls, pa, arr):
+        if not pa.types.is_dictionary(arr.type):
+            column = cls()
+            for value in arr.to_pylist():
+                column.append(value)
+            return column
+        column = cls(arr.dictionary.to_pylist())
+        null = column.code(None) if arr.null_count else None
+        column.codes = array('i', [null if c is None else c for c in arr.indices.to_pylist()])
+        return column
+
+    def nbytes(self):
+        return self.codes.itemsize * len(self.codes)
+
+class JobBatch:
+    """
+    Many jobs stored by column: title, snippet, link and job_id as UTF-8 buffers
+    with offsets, company and portal as integer codes into the distinct values,
+    score as an array of doubles (NaN: not scored). Rows come back as JobRecords.
+    Bulk operations (filter, take, argsort, score) work on the columns; company
+    rules are evaluated once per distinct company, not once per row. Keys other
+    than FIELDS are kept per row in a sparse dict.
+    """
+    ITER_CHUNK = 4096  # rows decoded at a time when iterating
+
+    def __init__(self, jobs=()):
+        self.text = {name: _TextColumn() for name in TEXT_FIELDS}
+        self.categories = {name: _CategoryColumn() for name in CATEGORY_FIELDS}
+        self.scores = array('d')
+        self.extra = {}
+        self.extend(jobs)
+
+    def append(self, job):
+        i = len(self.scores)
+        for name, column in self.text.items():
+            column.append(job.get(name))
+        for name, column in self.categories.items():
+            column.append(job.get(name))
+        score = job.get('score')
+        self.scores.append(math.nan if score is None else score)
+        extra = job.extra if isinstance(job, JobRecord) else {k: v for k, v in job.items() if k not in FIELDS}
+        if extra:
+            self.extra[i] = dict(extra)
+
+    def extend(self, jobs):
+        for job in jobs:
+            self.append(job)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._record(i, *(column[i] for column in self.text.values()),
+                            *(column[i] for column in self.categories.values()))
+
+    def _record(self, i, title, snippet, link, job_id, company, portal):
+        record = JobRecord(title, company, snippet, link, portal, job_id, **self.extra.get(i, {}))
+        if self.scores[i] == self.scores[i]:  # not NaN
+            record.score = self.scores[i]
+        return record
+
+    def _rows(self):
+        """(index, title, snippet, link, job_id, company, portal) per row, decoding a chunk of rows at a time"""
+        for start in range(0, len(self), self.ITER_CHUNK):
+            stop = min(start + self.ITER_CHUNK, len(self))
+            columns = [column.values(start, stop) for column in self.text.values()]
+            columns += [[column.values[c] for c in column.codes[start:stop]] for column in self.categories.values()]
+            yield from zip(range(start, stop), *columns)
+
+    def __iter__(self):
+        for row in self._rows():
+            yield self._record(*row)
+
+    def dicts(self):
+        """The rows as plain dicts, in normalize_job() key order (JSON, hand-off files)"""
+        scores, extra = self.scores, self.extra
+        for i, title, snippet, link, job_id, company, portal in self._rows():
+            job = {'title': title, 'company': company, 'snippet': snippet, 'link': link, 'portal': portal,
+                   'job_id': job_id}
+            if scores[i] == scores[i]:
+                job['score'] = scores[i]
+            if i in extra:
+                job.update(extra[i])
+            yield job
+
+    def column(self, name):
+        """All values of one field, as a list"""
+        if name == 'score':
+            return [None if s != s else s for s in self.scores]
+        if name in self.text:
+            return self.text[name].values()
+        column = self.categories[name]
+        return [column.values[c] for c in column.codes]
+
+    def take(self, indices):
+        """A new batch of the rows at `indices`, in that order"""
+        indices = list(indices)
+        batch = JobBatch()
+        batch.text = {name: column.take(indices) for name, column in self.text.items()}
+        batch.categories = {name: column.take(indices) for name, column in self.categories.items()}
+        scores = self.scores
+        batch.scores = array('d', [scores[i] for i in indices])
+        if self.extra:
+            batch.extra = {row: self.extra[i] for row, i in enumerate(indices) if i in self.extra}
+        return batch
+
+    def filter(self, mask):
+        """Rows whose `mask` entry is true"""
+        return self.take([i for i, keep in enumerate(mask) if keep])
+
+    def category_mask(self, name, predicate):
+        """[predicate(value) per row] for company or portal, calling predicate once per distinct value"""
+        column = self.categories[name]
+        by_code = [bool(predicate(value)) for value in column.values]
+        return [by_code[code] for code in column.codes]
+
+    def argsort(self, key='score', reverse=False):
+        """Row indices ordered by a field (stable; unscored rows last)"""
+        if key == 'score':
+            missing = -math.inf if reverse else math.inf
+            values = [missing if s != s else s for s in self.scores]
+        elif key in self.categories:
+            column = self.categories[key]
+            order = sorted(range(len(column.values)), key=lambda c: column.values[c] or '')
+            ranks = [0] * len(order)
+            for rank, code in enumerate(order):
+                ranks[code] = rank
+            values = [ranks[code] for code in column.codes]
+        else:
+            values = [v or '' for v in self.column(key)]
+        return sorted(range(len(self)), key=values.__getitem__, reverse=reverse)
+
+    def sort(self, key='score', reverse=False):
+        return self.take(self.argsort(key, reverse))
+
+    def score(self, scorer):
+        """
+        scoring.JobScorer.select() over the batch: drops excluded and blocklisted
+        jobs and those below min_score and returns a new batch of the rest, scored
+        and, with top_k, only the K best (best first). The blocklist runs once per distinct company, and
+        only the fields the scorer reads are decoded.
+        """
+        if not scorer.active:
+            return self
+        blocked = (self.category_mask('company', lambda c: scorer.blocklist.search(c or ''))
+                   if scorer.blocklist else [False] * len(self))
+        companies = self.column('company')
+        titles, snippets = self.text['title'].values(), self.text['snippet'].values()
+        fields = [f for f in scorer.field_weights if f not in ('title', 'snippet', 'company')]
+        exclude = scorer.exclude.search if scorer.exclude else None
+        stats, keep = scorer.stats, []
+        for i, (title, snippet) in enumerate(zip(titles, snippets)):
+            if blocked[i]:
+                stats['blocklisted'] += 1
+                continue
+            if exclude and (exclude(title or '') or exclude(snippet or '')):
+                stats['excluded'] += 1
+                continue
+            row = {'title': title, 'snippet': snippet, 'company': companies[i]}
+            if fields and i in self.extra:
+                row.update((f, self.extra[i].get(f)) for f in fields)
+            score = scorer.score(row)
+            if score < scorer.min_score:
+                stats['below_threshold'] += 1
+                continue
+            stats['kept'] += 1
+            keep.append((i, score))
+        if scorer.top_k:
+            keep.sort(key=lambda pair: -pair[1])  # stable: ties stay in search order
+            keep = keep[:scorer.top_k]
+        batch = self.take([i for i, _ in keep])
+        batch.scores = array('d', [score for _, score in keep])
+        return batch
+
+    def nbytes(self):
+        """Approximate size of the column buffers (distinct company/portal strings and extras not included)"""
+        return (sum(c.nbytes() for c in self.text.values()) + sum(c.nbytes() for c in self.categories.values())
+                + self.scores.itemsize * len(self.scores))
+
+    # Arrow
+    def to_arrow(self):
+        """A pyarrow Table (company and portal dictionary-encoded, other keys as JSON in an `extra` column)"""
+        pa = import_pyarrow()
+        columns = {name: column.to_arrow(pa) for name, column in self.text.items()}
+        columns.update((name, column.to_arrow(pa)) for name, column in self.categories.items())
+        columns['score'] = pa.array(self.scores, pa.float64(), from_pandas=True)  # NaN -> null
+        columns['extra'] = pa.array([json.dumps(self.extra[i], default=str) if i in self.extra else None
+                                     for i in range(len(self))], pa.string())
+        return pa.table({name: columns[name] for name in FIELDS + ('extra',)})
+
+    @classmethod
+    def from_arrow(cls, table):
+        pa = import_pyarrow()
+        batch = cls()
+        for name in TEXT_FIELDS:
+            if name in table.column_names:
+                batch.text[name] = _TextColumn.from_arrow(pa, table.column(name).combine_chunks())
+        for name in CATEGORY_FIELDS:
+            if name in table.column_names:
+                batch.categories[name] = _CategoryColumn.from_arrow(pa, table.column(name).combine_chunks())
+        scores = table.column('score').to_pylist() if 'score' in table.column_names else [None] * table.num_rows
+        batch.scores = array('d', [math.nan if s is None else s for s in scores])
+        if 'extra' in table.column_names:
+            batch.extra = {i: json.loads(e) for i, e in enumerate(table.column('extra').to_pylist()) if e}
+        for name, column in list(batch.text.items()) + list(batch.categories.items()):
+            if len(column) != table.num_rows:  # a column the file lacks
+                for _ in range(table.num_rows):
+                    column.append(None)
+        return batch
+
+    def write_arrow(self, path):
+        """Write the batch as an Arrow IPC file"""
+        pa = import_pyarrow()
+        table = self.to_arrow()
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    @classmethod
+    def read_arrow(cls, path):
+        pa = import_pyarrow()
+        return cls.from_arrow(pa.ipc.open_file(pa.memory_map(path)).read_all())
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("Arrow job files require pyarrow: pip install pyarrow")
+    return pyarrow
+
+# JSONL
+_json_encoder = json.JSONEncoder(default=str)
+
+def write_jsonl(jobs, f):
+    """Write jobs to an open text file, one JSON object per line; returns the count"""
+    written = 0
+    encode = _json_encoder.encode
+    for job in (jobs.dicts() if isinstance(jobs, JobBatch) else map(as_dict, jobs)):
+        f.write(encode(job) + '\n')
+        written += 1
+    return written
+
+def read_jsonl(path):
+    """JobRecords from a JSONL file (one JSON object per line); raises ValueError naming a bad line"""
+    jobs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}, line {number}: {e}")
+            if not isinstance(job, dict):
+                raise ValueError(f"{path}, line {number}: expected a JSON object")
+            jobs.append(JobRecord.from_dict(job))
+    return jobs
+
+def read_jobs(path):
+    """Jobs from a hand-off file: Arrow IPC for a .arrow path, JSONL otherwise"""
+    if path.endswith('.arrow'):
+        return list(JobBatch.read_arrow(path))
+    return read_jsonl(path)
@@ -0,0 +1,37 @@
+# linkedin_portal.py - LinkedIn adapter: job search and Easy Apply
+from urllib.parse import urlencode
+from apply_jobs import apply_to_job_linkedin
+from extract import LINKEDIN_SELECTORS
+from job_details import JOB_PAGE_LOCATORS, LINKEDIN_DETAIL_SELECTORS
+from portals import PortalAdapter
+from waits import css
+
+def linkedin_search_url(filters, start=0):
+    """Build a LinkedIn job search URL for the given filters and result offset"""
+    params = {
+        'keywords': ' OR '.join(filters.get('keywords') or []),
+        'location': filters.get('location') or '',
+        'start': start,
+    }
+    return f"https://www.linkedin.com/jobs/search/?{urlencode(params)}"
+
+class LinkedInAdapter(PortalAdapter):
+    name = 'linkedin'
+    display_name = 'LinkedIn'
+    home_url = 'https://www.linkedin.com/'
+    page_size = 25
+    selectors = LINKEDIN_SELECTORS
+    results_list = '.jobs-search-results-list, .scaffold-layout__list'
+    job_page_locators = JOB_PAGE_LOCATORS
+    detail_selectors = LINKEDIN_DETAIL_SELECTORS
+    easy_apply_labels = ('easy apply',)
+    session_cookies = ('li_at',)
+    logged_in_locators = css('.global-nav__me', 'img.global-nav__me-photo', '[data-control-name="nav.settings"]')
+    login_paths = ('/login', '/authwall', '/checkpoint', '/uas/')
+    blocked_urls = {'images': ('*media.licdn.com/dms/image/*',), 'media': ('*dms.licdn.com/playlist/*',)}
+
+    def search_url(self, config, page):
+        return linkedin_search_url(config.get('filters') or {}, start=page * self.page_size)
+
+    def apply(self, driver, job, config, ready):
+        return apply_to_job_linkedin(driver, job, config, ready=ready)
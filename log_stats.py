@@ -0,0 +1,147 @@
+# log_stats.py - Incrementally tailed, indexed aggregates over application_log.csv
+import csv, io, os, threading
+from array import array
+from collections import Counter, deque
+
+RECENT_FAILURES = 50
+READ_CHUNK = 1 << 20  # bytes per read when ingesting the log, so a first refresh of a large log stays small
+
+def csv_records(data, start_offset):
+    """
+    Split complete CSV records out of a byte chunk, yielding (offset, end, text).
+    A physical line only ends a record when its quotes are balanced, so error
+    messages with embedded newlines stay in one record. Trailing partial data
+    is left for the next read.
+    """
+    record_start, quotes, pos = 0, 0, 0
+    while True:
+        newline = data.find(b'\n', pos)
+        if newline < 0:
+            return
+        quotes += data.count(b'"', pos, newline)
+        pos = newline + 1
+        if quotes % 2 == 0:
+            yield start_offset + record_start, start_offset + pos, data[record_start:pos].decode('utf-8', errors='replace')
+            record_start, quotes = pos, 0
+
+def csv_record_batches(f, offset, end, chunk_size=READ_CHUNK):
+    """
+    csv_records over bytes `offset` to `end` of an open file, read `chunk_size` at a
+    time: yields each chunk's complete records as a list, carrying a record cut off
+    at the end of a chunk over into the next one
+    """
+    f.seek(offset)
+    carry, pos = b'', offset
+    while pos < end:
+        chunk = f.read(min(chunk_size, end - pos))
+        if not chunk:
+            return
+        pos += len(chunk)
+        data, start = carry + chunk, pos - len(carry) - len(chunk)
+        records = list(csv_records(data, start))
+        carry = data[records[-1][1] - start:] if records else data
+        if records:
+            yield records
+
+def _read_record(f, offset, size=4096):
+    """Read the single CSV record starting at `offset`"""
+    while True:
+        f.seek(offset)
+        data = f.read(size)
+        for _, _, text in csv_records(data, offset):
+            return text
+        if len(data) < size:
+            return data.decode('utf-8', errors='replace')
+        size *= 4
+
+class LogTail:
+    """
+    In-memory view of the application log that only reads bytes appended since the
+    last refresh(). Keeps counts per status, company and day, the most recent
+    failures, and a byte-offset index of every row (plus one per status) so any page
+    of rows is served with a seek instead of a rescan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.file_id = None
+        self.fieldnames = None
+        self.by_status = Counter()
+        self.by_company = Counter()
+        self.by_day = Counter()
+        self.recent_failures = deque(maxlen=RECENT_FAILURES)
+        self.row_offsets = array('q')
+        self.status_offsets = {}
+
+    def refresh(self):
+        """Ingest rows appended since the last call; starts over if the file was replaced or truncated"""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return 0
+            file_id = (st.st_dev, st.st_ino)
+            if file_id != self.file_id or st.st_size < self.offset:
+                self._reset()
+                self.file_id = file_id
+            if st.st_size == self.offset:
+                return 0
+            added = 0
+            with open(self.path, 'rb') as f:
+                for records in csv_record_batches(f, self.offset, st.st_size):
+                    # One reader per batch of complete records: each record parses to exactly one row
+                    for (offset, _, _), row in zip(records, csv.reader(text for _, _, text in records)):
+                        if not row:
+                            continue
+                        if self.fieldnames is None:
+                            self.fieldnames = row
+                            continue
+                        self._add(offset, dict(zip(self.fieldnames, row)))
+                        added += 1
+                    self.offset = records[-1][1]
+            return added
+
+    def _add(self, offset, row):
+        status = row.get('status') or ''
+        self.row_offsets.append(offset)
+        self.status_offsets.setdefault(status, array('q')).append(offset)
+        self.by_status[status] += 1
+        self.by_company[row.get('company') or ''] += 1
+        self.by_day[(row.get('time') or '')[:10]] += 1
+        if status == 'failed':
+            self.recent_failures.append(row)
+
+    def stats(self, top_companies=20):
+        with self._lock:
+            return {
+                'total': len(self.row_offsets),
+                'by_status': dict(self.by_status),
+                'by_company': dict(self.by_company.most_common(top_companies)),
+                'by_day': dict(sorted(self.by_day.items())),
+                'recent_failures': list(reversed(self.recent_failures)),
+            }
+
+    def page(self, page=1, per_page=50, status=None, newest_first=True):
+        """One page of rows (optionally of one status), read by seeking through the offset index"""
+        with self._lock:
+            offsets = self.row_offsets if status is None else self.status_offsets.get(status, array('q'))
+            total = len(offsets)
+            start = max(page - 1, 0) * per_page
+            if newest_first:
+                picked = [offsets[i] for i in range(total - 1 - start, max(total - 1 - start - per_page, -1), -1)]
+            else:
+                picked = list(offsets[start:start + per_page])
+            fieldnames = self.fieldnames
+        rows = []
+        if picked:
+            with open(self.path, 'rb') as f:
+                for offset in picked:
+                    values = next(csv.reader(io.StringIO(_read_record(f, offset))), [])
+                    rows.append(dict(zip(fieldnames, values)))
+        return {'page': page, 'per_page': per_page, 'total': total, 'rows': rows}
@@ -1,21 +1,233 @@
 # logger.py
-import csv, datetime, os
+import atexit, csv, datetime, logging, os, sqlite3, threading
+
+logger = logging.getLogger(__name__)
 
 LOG_FILE = 'application_log.csv'
+SQLITE_LOG_FILE = 'application_log.db'
+ARROW_LOG_DIR = 'application_log.arrow'
+FIELDNAMES = ['time', 'title', 'company', 'link', 'status', 'error']
 
-def log_application(job, status, error=''):
-    fieldnames = ['time', 'title', 'company', 'link', 'status', 'error']
-    log_entry = {
-        "time": datetime.datetime.now().isoformat(),
-        "title": job.get('title'),
-        "company": job.get('company'),
-        "link": job.get('link'),
-        "status": status,
-        "error": error
-    }
-    file_exists = os.path.exists(LOG_FILE)
-    with open(LOG_FILE, mode='a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+class CsvSink:
+    """Appends rows to a CSV file through one long-lived handle (the default sink)"""
+
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+        self.fieldnames = FIELDNAMES
+        file_exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if file_exists:
+            # Keep the column order of an existing log
+            with open(path, newline='', encoding='utf-8') as f:
+                self.fieldnames = next(csv.reader(f), None) or FIELDNAMES
+        self._file = open(path, mode='a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore')
         if not file_exists:
-            writer.writeheader()
-        writer.writerow(log_entry)
+            self._writer.writeheader()
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class SqliteSink:
+    """Appends rows to an indexed SQLite table in WAL mode, so it can be queried while a run appends"""
+
+    def __init__(self, path=SQLITE_LOG_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS applications '
+                           '(time TEXT, title TEXT, company TEXT, link TEXT, status TEXT, error TEXT)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS applications_time ON applications (time)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS applications_status ON applications (status)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS applications_company ON applications (company)')
+        self._conn.commit()
+
+    def write_rows(self, rows):
+        self._conn.executemany('INSERT INTO applications VALUES (?, ?, ?, ?, ?, ?)',
+                               [tuple(row[f] for f in FIELDNAMES) for row in rows])
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+class ArrowSink:
+    """
+    Append-only columnar log: each flush writes one Arrow IPC segment into a directory.
+    Read it back with pyarrow.dataset.dataset(path, format='arrow'); compact() merges
+    the segments into one file. Requires pyarrow.
+    """
+
+    def __init__(self, path=ARROW_LOG_DIR):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("The 'arrow' application log sink requires pyarrow: pip install pyarrow")
+        self.pa = pyarrow
+        self.path = path
+        self.schema = pyarrow.schema([(f, pyarrow.string()) for f in FIELDNAMES])
+        os.makedirs(path, exist_ok=True)
+        self._seq = 0
+
+    def _segment_path(self, prefix='part'):
+        self._seq += 1
+        stamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        return os.path.join(self.path, f'{prefix}-{stamp}-{os.getpid()}-{self._seq}.arrow')
+
+    def _write_table(self, table, prefix='part'):
+        target = self._segment_path(prefix)
+        tmp = target + '.tmp'
+        with self.pa.OSFile(tmp, 'wb') as sink, self.pa.ipc.new_file(sink, self.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, target)  # readers never see a half-written segment
+        return target
+
+    def write_rows(self, rows):
+        columns = {f: [None if row[f] is None else str(row[f]) for row in rows] for f in FIELDNAMES}
+        self._write_table(self.pa.table(columns, schema=self.schema))
+
+    def compact(self):
+        """Merge all segments into a single one"""
+        segments = sorted(os.path.join(self.path, n) for n in os.listdir(self.path) if n.endswith('.arrow'))
+        if len(segments) < 2:
+            return
+        tables = [self.pa.ipc.open_file(self.pa.memory_map(p)).read_all() for p in segments]
+        self._write_table(self.pa.concat_tables(tables), prefix='compact')
+        for p in segments:
+            os.remove(p)
+
+    def close(self):
+        pass
+
+class MirroredSink:
+    """
+    Writes to the configured sink and keeps the CSV log in step with it, since the
+    dashboard, stats, analytics and the job index backfill read the CSV. Rows the CSV
+    could not take are kept and written ahead of the next batch, so a failed mirror
+    write neither loses rows nor, retried, duplicates them in the primary sink.
+    """
+
+    def __init__(self, primary, mirror):
+        self.primary = primary
+        self.mirror = mirror
+        self._pending = []
+
+    def write_rows(self, rows):
+        self.primary.write_rows(rows)
+        self._pending.extend(rows)
+        try:
+            self.mirror.write_rows(self._pending)
+        except OSError as e:
+            logger.warning(f"Could not mirror {len(self._pending)} application log rows to {self.mirror.path}: {e}")
+            return
+        self._pending = []
+
+    def close(self):
+        if self._pending:
+            try:
+                self.mirror.write_rows(self._pending)
+            except OSError:
+                pass
+        self.primary.close()
+        self.mirror.close()
+
+SINKS = {'csv': (CsvSink, LOG_FILE), 'sqlite': (SqliteSink, SQLITE_LOG_FILE), 'arrow': (ArrowSink, ARROW_LOG_DIR)}
+
+class ApplicationLog:
+    """
+    Long-lived, buffered application log. Rows are handed to the sink in batches,
+    once `flush_rows` rows are buffered, `flush_interval` seconds after the first
+    buffered row, on flush()/close(), and at interpreter exit. Thread-safe.
+    """
+
+    def __init__(self, sink=None, flush_rows=20, flush_interval=5.0):
+        self.sink = sink or CsvSink()
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.RLock()
+        self._timer = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def log(self, job, status, error=''):
+        row = {
+            "time": datetime.datetime.now().isoformat(),
+            "title": job.get('title'),
+            "company": job.get('company'),
+            "link": job.get('link'),
+            "status": status,
+            "error": error
+        }
+        with self._lock:
+            if self._closed:
+                raise ValueError("ApplicationLog is closed")
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_rows:
+                self.flush()
+            elif self._timer is None and self.flush_interval:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._buffer and not self._closed:
+                # Dropped from the buffer only once written: a failed write is retried with the next flush
+                self.sink.write_rows(self._buffer)
+                self._buffer = []
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            self.sink.close()
+        atexit.unregister(self.close)
+
+def _sink_options(config):
+    config = config or {}
+    options = config.get('application_log') or {}
+    sink_name = options.get('sink', 'csv')
+    if sink_name not in SINKS:
+        raise ValueError(f"Unknown application log sink: {sink_name} (expected one of {', '.join(SINKS)})")
+    default_path = config.get('csv_log_file', LOG_FILE) if sink_name == 'csv' else SINKS[sink_name][1]
+    return sink_name, options.get('path', default_path), options
+
+def open_application_log(config=None):
+    """
+    Create an ApplicationLog from config 'application_log':
+    {"sink": "csv" | "sqlite" | "arrow", "path": ..., "flush_rows": 20, "flush_interval_sec": 5}
+    The CSV sink writes to 'csv_log_file' (default application_log.csv). The other sinks
+    also mirror their rows there unless "mirror_csv" is false, because the dashboard,
+    stats, analytics and the job index read the CSV.
+    """
+    sink_name, path, options = _sink_options(config)
+    sink = SINKS[sink_name][0](path)
+    if sink_name != 'csv' and options.get('mirror_csv', True):
+        sink = MirroredSink(sink, CsvSink((config or {}).get('csv_log_file', LOG_FILE)))
+    return ApplicationLog(sink,
+                          flush_rows=options.get('flush_rows', 20),
+                          flush_interval=options.get('flush_interval_sec', 5.0))
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+def get_application_log(config=None):
+    """Process-wide ApplicationLog for the configured sink and path, opened on first use"""
+    sink_name, path, _ = _sink_options(config)
+    with _logs_lock:
+        log = _logs.get((sink_name, path))
+        if log is None or log._closed:
+            log = _logs[(sink_name, path)] = open_application_log(config)
+        return log
+
+def log_application(job, status, error=''):
+    get_application_log().log(job, status, error=error)
@@ -0,0 +1,42 @@
+# portal_registry.py - Portal names: the adapter registry, without importing any adapter
+# (portals.py loads them), so checking a config's portal names stays cheap
+
+# Third-party packages can add portals under this entry point group, e.g. in setup.cfg:
+#   [options.entry_points]
+#   job_auto_applier.portals =
+#       glassdoor = my_package.glassdoor:GlassdoorAdapter
+ENTRY_POINT_GROUP = 'job_auto_applier.portals'
+
+# Portal name -> 'module:Class'. Adapter modules are only imported when a run
+# first needs that portal, so unused portals cost nothing at startup.
+PORTALS = {
+    'linkedin': 'linkedin_portal:LinkedInAdapter',
+    'indeed': 'indeed_portal:IndeedAdapter',
+}
+
+def portal_key(name):
+    return (name or '').strip().lower()
+
+def find_entry_point(name):
+    """The installed entry point for a portal key, or None"""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return None
+    try:
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10: a dict of groups
+        found = entry_points().get(ENTRY_POINT_GROUP, [])
+    return next((ep for ep in found if portal_key(ep.name) == name), None)
+
+def is_known_portal(name):
+    """True if `name` has a registered or installed adapter; unlike get_adapter, imports nothing"""
+    key = portal_key(name)
+    return key in PORTALS or find_entry_point(key) is not None
+
+def configured_portals(config):
+    """Portal names to search: config 'job_portals' (a list), else 'job_portal' (a name or a list)"""
+    portals = config.get('job_portals') or config.get('job_portal') or []
+    if isinstance(portals, str):
+        portals = [portals]
+    return list(dict.fromkeys(portals))
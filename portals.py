@@ -0,0 +1,259 @@
+# portals.py - Job portal adapters: lazy registry and the shared search loop
+import importlib, logging, threading, time
+from extract import extract_job_cards, parse_job_cards
+from job_records import JobRecord
+from selector_stats import get_selector_stats
+from portal_registry import PORTALS, configured_portals, find_entry_point, is_known_portal, portal_key
+from tracing import span
+from waits import Readiness, css
+
+logger = logging.getLogger(__name__)
+
+# Scrolls the results container (or the page) to the bottom and returns its height
+SCROLL_RESULTS_SCRIPT = """
+const list = document.querySelector(arguments[0]) || document.scrollingElement;
+list.scrollTop = list.scrollHeight;
+return list.scrollHeight;
+"""
+
+# Height of the results container (or the page), without scrolling
+RESULTS_HEIGHT_SCRIPT = """
+const list = document.querySelector(arguments[0]) || document.scrollingElement;
+return list.scrollHeight;
+"""
+
+class UnknownPortal(ValueError):
+    """Raised for a portal name that is neither registered nor provided by an entry point"""
+
+def normalize_job(card, portal):
+    """Turn an extracted card into a job record; returns None if title or company is missing"""
+    title = ' '.join((card.get('title') or '').split())
+    company = ' '.join((card.get('company') or '').split())
+    if not (title and company):
+        return None
+    link = card.get('link')
+    if link:
+        link = link.split('?', 1)[0].split('#', 1)[0]  # drop tracking parameters
+    return JobRecord(
+        title=title,
+        company=company,
+        snippet=' '.join((card.get('snippet') or '').split()),
+        link=link or 'N/A',
+        portal=portal,
+        job_id=card.get('job_id'),
+    )
+
+class PortalAdapter:
+    """
+    Everything portal-specific: where to search, how to read result cards and
+    job pages, and how to apply. Subclasses fill in the class attributes and
+    implement search_url() and apply(); the search loop (pagination, single
+    round-trip extraction, dedup, index checks) is shared.
+    """
+    name = None
+    display_name = None
+    home_url = None
+    page_size = 25
+    selectors = None           # extract.SelectorSet for the result cards
+    results_list = None        # scrollable results container, for infinite-scroll lists
+    job_page_locators = None   # the job page has rendered once one of these is present
+    detail_selectors = None    # job_details.DetailSelectors for the job page
+    easy_apply_labels = ()     # apply button texts that mean the form is on the portal itself
+    session_cookies = ()       # cookies that are only set while logged in (all must be present)
+    logged_in_locators = None  # present on the home page only when logged in
+    login_paths = ('/login', '/signin')  # the portal redirected to its login page
+    blocked_urls = {}          # extra Network.setBlockedURLs patterns per resource kind (driver_factory)
+
+    def search_url(self, config, page):
+        """URL of results page `page` (0-based) for config 'filters'"""
+        raise NotImplementedError
+
+    def apply(self, driver, job, config, ready):
+        """Apply to the job whose page is open in `driver`; returns the status"""
+        raise NotImplementedError
+
+    def login_url(self, config):
+        """Page opened for the manual login"""
+        return self.home_url
+
+    def is_logged_in(self, driver, config, timeout=None):
+        """
+        Whether the login_url() page open in `driver` shows a valid session: the
+        session cookies exist and have not expired, the portal did not redirect to
+        a login page, and one of logged_in_locators renders within `timeout`
+        """
+        now = time.time()
+        for name in self.session_cookies:
+            cookie = driver.get_cookie(name)
+            if not cookie or cookie.get('expiry', now + 1) <= now:
+                logger.debug(f"{self.display_name} session cookie {name} missing or expired")
+                return False
+        url = (driver.current_url or '').lower()
+        if any(path in url for path in self.login_paths):
+            return False
+        if self.logged_in_locators:
+            ready = Readiness(driver, config)
+            return bool(ready.present('logged_in', self.logged_in_locators, timeout=timeout))
+        return bool(self.session_cookies)
+
+    def normalize(self, card, config):
+        return normalize_job(card, self.name)
+
+    def scroll_results(self, driver, ready, rounds=3, timeout=None):
+        """
+        Scroll the results list so lazily-loaded cards are rendered (infinite scroll).
+        After each scroll, waits up to `timeout` (default: the optional wait timeout)
+        for the list to grow, and stops as soon as a scroll loads nothing more.
+        """
+        if not self.results_list:
+            return
+        for _ in range(rounds):
+            height = driver.execute_script(SCROLL_RESULTS_SCRIPT, self.results_list)
+            grown = lambda d, last=height: (d.execute_script(RESULTS_HEIGHT_SCRIPT, self.results_list) or 0) > last
+            if not height or not ready.until('search_scroll', grown, timeout or ready.optional_timeout):
+                break
+
+    def parse(self, driver, config, url):
+        """
+        Every card on the current results page in one round-trip: selector fallbacks
+        run in the browser ("script" mode) or against page_source ("parser" mode)
+        """
+        stats = get_selector_stats(config)
+        if config.get('extraction_mode', 'script') == 'parser':
+            return parse_job_cards(driver.page_source, self.selectors, base_url=url, stats=stats, name=self.name)
+        return extract_job_cards(driver, self.selectors, stats=stats, name=self.name)
+
+    def iter_jobs(self, driver, config, index=None, progress=None):
+        """
+        Page through search results, yielding each page's jobs as soon as it is parsed;
+        `progress` (a SearchProgress) counts the parsed jobs not yet yielded
+        """
+        max_pages = config.get('max_search_pages', 1)
+        max_results = config.get('max_search_results')
+        seen = set()
+        found = 0
+        ready = Readiness(driver, config)
+        try:
+            for page in range(max_pages):
+                url = self.search_url(config, page)
+                logger.info(f"Navigating to {self.display_name} jobs page {page + 1}/{max_pages}...")
+                # The span ends before the jobs are yielded: applying to them is not search time
+                with span('search.page', portal=self.name, page=page + 1) as page_span:
+                    with span('navigate', 'search_page'):
+                        driver.get(url)
+                    ready.page_loaded('search_page', css(*self.selectors.cards))
+                    ready.pause('search_page')
+                    self.scroll_results(driver, ready)
+
+                    logger.info("Looking for job listings...")
+                    with span('search.parse'):
+                        cards = self.parse(driver, config, url)
+                    if not cards:
+                        if page == 0:
+                            logger.warning(f"No job cards found. {self.display_name} may have updated their page structure.")
+                            logger.info(f"Please inspect the page and update the selectors in {type(self).__module__}.py")
+                        break
+
+                    logger.info(f"Processing {len(cards)} job listings...")
+                    page_span.set(cards=len(cards))
+
+                    # Parse the whole page before yielding: the consumer navigates away to apply
+                    page_jobs = []
+                    new_cards = 0
+                    debug = logger.isEnabledFor(logging.DEBUG)
+                    for idx, card in enumerate(cards):
+                        with span('search.card'):
+                            job = self.normalize(card, config)
+                            if not job:
+                                if debug:
+                                    logger.debug(f"Skipped job card {idx+1} - missing title or company")
+                                continue
+                            key = job['job_id'] or job['link']
+                            if key in seen:
+                                continue
+                            seen.add(key)
+                            new_cards += 1
+                            if index is not None:
+                                if index.is_done(job):
+                                    logger.info(f"Skipping already processed job: {job['title']} at {job['company']}")
+                                    continue
+                                index.mark_seen(job)
+                            page_jobs.append(job)
+                            if debug:
+                                logger.debug(f"Found job {found + len(page_jobs)}: {job['title']} at {job['company']}")
+                    logger.info(f"Found {len(page_jobs)} new jobs on page {page + 1}")
+
+                if not new_cards:
+                    logger.info("No new jobs on this page, stopping pagination")
+                    break
+
+                if progress is not None:
+                    progress.add(len(page_jobs))
+                for i, job in enumerate(page_jobs, 1):
+                    if progress is not None:
+                        progress.add(-1)
+                    yield job
+                    found += 1
+                    if max_results and found >= max_results:
+                        logger.info(f"Reached search result budget: {max_results}")
+                        if progress is not None:
+                            progress.add(i - len(page_jobs))
+                        return
+
+            logger.info(f"{self.display_name} search completed. Found {found} jobs.")
+            logger.info(f"Search timing: {ready.metrics.format()}")
+
+        except Exception as e:
+            logger.error(f"Error in {self.display_name} search: {e}")
+
+class SearchProgress:
+    """
+    How many jobs a search has parsed but not yet handed on. At 0, taking the next
+    job waits for a search page, so consumers that hold jobs back to reorder them
+    (analytics.prioritize) let go of them first.
+    """
+
+    def __init__(self):
+        self.available = 0
+        self._lock = threading.Lock()
+
+    def add(self, n):
+        with self._lock:
+            self.available += n
+
+_adapters = {}
+_adapters_lock = threading.Lock()
+
+def register_portal(name, target):
+    """Register an adapter: `target` is a PortalAdapter subclass or a lazy 'module:Class' string"""
+    with _adapters_lock:
+        PORTALS[portal_key(name)] = target
+        _adapters.pop(portal_key(name), None)
+
+def _load(name):
+    target = PORTALS.get(name)
+    if target is None:
+        ep = find_entry_point(name)
+        if ep is None:
+            raise UnknownPortal(f"No adapter for portal {name!r} (known: {', '.join(sorted(PORTALS))})")
+        cls = ep.load()
+    elif isinstance(target, str):
+        module, _, attr = target.partition(':')
+        cls = getattr(importlib.import_module(module), attr)
+    else:
+        cls = target
+    logger.debug(f"Loaded {name} portal adapter {cls.__module__}.{cls.__name__}")
+    return cls()
+
+def get_adapter(name):
+    """The adapter for a portal name (case-insensitive), imported on first use"""
+    key = portal_key(name)
+    with _adapters_lock:
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter = _adapters[key] = _load(key)
+        return adapter
+
+def adapter_for(job, config):
+    """The adapter for a job record, falling back to the first configured portal"""
+    return get_adapter(job.get('portal') or configured_portals(config)[0])
@@ -0,0 +1,194 @@
+# resume_staging.py - Resume variants: validated and hashed once, uploaded once per remote browser session
+import base64, hashlib, io, json, logging, os, threading, zipfile
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+logger = logging.getLogger(__name__)
+
+RESUME_CACHE_FILE = 'resume_cache.json'
+MAX_RESUME_BYTES = 2 * 1024 * 1024  # LinkedIn's Easy Apply limit (Indeed allows 5 MB)
+# Leading bytes of each accepted format
+RESUME_SIGNATURES = {
+    '.pdf': b'%PDF-',
+    '.docx': b'PK\x03\x04',
+    '.doc': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+}
+
+def resume_variants(config):
+    """
+    Configured resumes as [{'path', 'keywords'}]: config 'resumes' (each picked
+    for jobs whose title mentions one of its keywords), then 'resume_path' as the
+    default for every other job.
+    """
+    variants = [{'path': v['path'], 'keywords': [k.lower() for k in v.get('keywords', [])]}
+                for v in config.get('resumes') or [] if v.get('path')]
+    if config.get('resume_path'):
+        variants.append({'path': config['resume_path'], 'keywords': []})
+    return variants
+
+def resume_max_bytes(config):
+    """Upload size limit from config 'resume_max_mb' (default 2)"""
+    return int(config.get('resume_max_mb', MAX_RESUME_BYTES / 1024 / 1024) * 1024 * 1024)
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def size_problems(size, max_bytes):
+    if max_bytes and size > max_bytes:
+        return [f"{size / 1024 / 1024:.1f} MB is over the {max_bytes / 1024 / 1024:.0f} MB upload limit"]
+    return []
+
+def validate_resume(path, max_bytes=MAX_RESUME_BYTES):
+    """Problems that would make a portal reject the file (empty list when it is fine)"""
+    if not os.path.isfile(path):
+        return ['file not found']
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in RESUME_SIGNATURES:
+        return [f"unsupported type {ext or '(none)'} (use {', '.join(RESUME_SIGNATURES)})"]
+    size = os.path.getsize(path)
+    if size == 0:
+        return ['file is empty']
+    problems = size_problems(size, max_bytes)
+    with open(path, 'rb') as f:
+        head = f.read(len(RESUME_SIGNATURES[ext]))
+        if ext == '.pdf':
+            f.seek(max(size - 1024, 0))
+            tail = f.read()
+    if head != RESUME_SIGNATURES[ext]:
+        problems.append(f"not a {ext[1:].upper()} file (unexpected header)")
+    elif ext == '.pdf' and b'%%EOF' not in tail:
+        problems.append("PDF is truncated (no %%EOF marker)")
+    return problems
+
+class StagedResume:
+    """A validated resume file: absolute path, content hash and the keywords that select it"""
+
+    def __init__(self, path, sha256, size, keywords, problems):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.sha256 = sha256
+        self.size = size
+        self.keywords = keywords
+        self.problems = problems
+
+    def matches(self, text):
+        return any(keyword in text for keyword in self.keywords)
+
+class ResumeStaging:
+    """
+    Resumes checked once at startup. Each file's hash and validation result are
+    cached in `cache_path` by path, size and mtime, so an unchanged file is not
+    read again on later runs. Files with problems are logged and left out.
+
+    For a remote (Grid) browser, Selenium zips and base64-encodes a file for
+    every send_keys; here each file is encoded once and uploaded once per
+    browser session, and later uploads type the remote path it was stored at.
+    """
+
+    def __init__(self, variants, cache_path=RESUME_CACHE_FILE, max_bytes=MAX_RESUME_BYTES):
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._payloads = {}  # sha256 -> zipped, base64-encoded file
+        self._remote = {}    # (session id, sha256) -> path on the remote browser's machine
+        cache = self._load_cache()
+        changed = False
+        self.resumes = []
+        for variant in variants:
+            resume, fresh = self._stage(variant, cache)
+            changed = changed or fresh
+            if resume.problems:
+                logger.warning(f"Resume {variant['path']} not used: {'; '.join(resume.problems)}")
+            else:
+                self.resumes.append(resume)
+        if changed and cache_path:
+            self._save_cache(cache)
+        self.default = next((r for r in self.resumes if not r.keywords), None)
+        if self.resumes:
+            logger.info(f"Resumes staged: {', '.join(r.name for r in self.resumes)}")
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable resume cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_cache(self, cache):
+        tmp = f'{self.cache_path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.cache_path)
+
+    def _stage(self, variant, cache):
+        """StagedResume for a variant, and whether the cache entry had to be (re)computed"""
+        path = os.path.abspath(variant['path'])
+        try:
+            st = os.stat(path)
+        except OSError:
+            return StagedResume(path, None, 0, variant['keywords'], ['file not found']), False
+        entry = cache.get(path)
+        fresh = not entry or entry['size'] != st.st_size or entry['mtime_ns'] != st.st_mtime_ns
+        if fresh:
+            # The size limit is checked below, so a changed limit needs no re-read
+            entry = cache[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_sha256(path),
+                                   'problems': validate_resume(path, max_bytes=None)}
+        problems = entry['problems'] + size_problems(entry['size'], self.max_bytes)
+        return StagedResume(path, entry['sha256'], entry['size'], variant['keywords'], problems), fresh
+
+    def choose(self, job):
+        """The resume for a job: the first variant with a keyword in the title, then in the snippet, else the default"""
+        for field in ('title', 'snippet'):
+            text = (job.get(field) or '').lower()
+            if text:
+                for resume in self.resumes:
+                    if resume.keywords and resume.matches(text):
+                        return resume
+        return self.default or (self.resumes[0] if self.resumes else None)
+
+    def _payload(self, resume):
+        payload = self._payloads.get(resume.sha256)
+        if payload is None:
+            buffer = io.BytesIO()
+            with open(resume.path, 'rb') as f, zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipped:
+                zipped.writestr(resume.name, f.read())
+            payload = self._payloads[resume.sha256] = base64.encodebytes(buffer.getvalue()).decode('ascii')
+        return payload
+
+    def upload_path(self, driver, resume):
+        """What to type into a file input: the local path, or for a remote browser where it was uploaded"""
+        if not getattr(driver, '_is_remote', False):
+            return resume.path
+        key = (driver.session_id, resume.sha256)
+        with self._lock:
+            remote = self._remote.get(key)
+            if remote is None:
+                try:
+                    remote = driver.execute(Command.UPLOAD_FILE, {'file': self._payload(resume)})['value']
+                    logger.info(f"Uploaded {resume.name} to the remote browser once ({resume.size / 1024:.0f} KB)")
+                except WebDriverException as e:  # endpoint unsupported: let send_keys transfer the file
+                    logger.debug(f"Remote upload unavailable, sending {resume.name} with each application: {e}")
+                    remote = resume.path
+                self._remote[key] = remote
+        return remote
+
+_stagings = {}
+_stagings_lock = threading.Lock()
+
+def get_resume_staging(config):
+    """Shared ResumeStaging for the configured resumes (validated once per process)"""
+    variants = resume_variants(config)
+    cache_path = config.get('resume_cache_file', RESUME_CACHE_FILE)
+    max_bytes = resume_max_bytes(config)
+    key = (cache_path, max_bytes, tuple((v['path'], tuple(v['keywords'])) for v in variants))
+    with _stagings_lock:
+        if key not in _stagings:
+            _stagings[key] = ResumeStaging(variants, cache_path, max_bytes)
+        return _stagings[key]
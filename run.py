@@ -1,25 +1,155 @@
 # run.py - Main entry point for Job Auto Applier
 import logging
-from scraper import load_config, login_and_prepare_driver, search_jobs
-from apply_jobs import apply_batch_jobs
+from functools import partial
+from itertools import chain
+from job_index import JobIndex, INDEX_FILE
+from config import ConfigError, as_config
+from portal_registry import configured_portals, portal_key
+from checkpoint import Checkpoint, CHECKPOINT_FILE
+from logger import LOG_FILE
+from tracing import configure_tracing, finish_tracing, now, record
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the entry point (cli.configure_logging), not on import.
+# The browser, search and apply modules (driver_factory, scraper, apply_jobs, ...)
+# are imported by the functions that use them, so importing this module loads no Selenium.
 logger = logging.getLogger(__name__)
 
-def main_automation_process():
+def open_browsers(config, portals, driver_factory):
+    """
+    The first portal's browser and, with several portals, PortalSessions holding
+    one browser per portal (a Chrome profile can only be open once), so all are
+    searched at once. Returns (driver, sessions or None).
+    """
+    from driver_factory import profile_dir_for
+    from scraper import PortalSessions
+    profile_dir = profile_dir_for(config)
+    driver = driver_factory(portals[0], config, profile_dir=profile_dir)
+    if len(portals) == 1:
+        return driver, None
+    drivers = {portals[0]: driver}
+    try:
+        for portal in portals[1:]:
+            drivers[portal] = driver_factory(portal, config,
+                                             profile_dir=profile_dir and f"{profile_dir}-{portal_key(portal)}")
+    except Exception:
+        for browser in drivers.values():
+            browser.quit()
+        raise
+    return driver, PortalSessions(drivers)
+
+def search_stream(driver, config, index=None, sessions=None):
+    """
+    The lazy, scored job stream: search pages are fetched as jobs are taken.
+    Cards are scored and filtered before any job page is opened (see scoring.py),
+    unless scoring weighs the description, which is then fetched (or read from the cache).
+    The jobs already found are then ordered by expected success from past results
+    (see analytics.py), unless config "analytics" is false.
+    """
+    from analytics import get_analytics, prioritize
+    from job_details import JobDetailFetcher, with_details
+    from portals import SearchProgress
+    from scraper import SessionDetailFetcher, iter_jobs
+    scorer = config.scorer
+    progress = SearchProgress()
+    jobs = iter_jobs(driver, config, index=index, sessions=sessions, progress=progress)
+    if scorer.field_weights.get('description'):
+        fetcher = SessionDetailFetcher(sessions, config) if sessions else JobDetailFetcher(driver, config)
+        jobs = with_details(jobs, fetcher)
+    jobs = scorer.select(jobs)
+    analytics = get_analytics(config)
+    return prioritize(jobs, analytics, progress=progress) if analytics is not None else jobs
+
+def close_browsers(driver, sessions):
+    if sessions:
+        logger.info("Closing browsers...")
+        sessions.quit()
+        logger.info("Browsers closed")
+    elif driver:
+        logger.info("Closing browser...")
+        driver.quit()
+        logger.info("Browser closed")
+
+def search_only(write, limit=None, driver_factory=None, config=None, wait_for_login=None):
+    """
+    Dry run: log in and search like main_automation_process (steps 1-3), passing
+    each selected job to `write(job)` instead of applying. Jobs already in the
+    applied-jobs index are left out; nothing is applied or journaled. Stops after
+    `limit` jobs. Returns the number of jobs written, or None on failure.
+    """
+    driver = None
+    sessions = None
+    index = None
+    written = 0
+    from scraper import load_config, login_and_prepare_driver
+    driver_factory = driver_factory or login_and_prepare_driver
+    if wait_for_login:
+        driver_factory = partial(driver_factory, wait_for_login=wait_for_login)
+    try:
+        config = as_config(config if config is not None else load_config())
+        portals = configured_portals(config)
+        logger.info(f"Searching {', '.join(portals)} (dry run, nothing is applied)")
+        index = JobIndex(config.get('index_file', INDEX_FILE), csv_log=config.get('csv_log_file', LOG_FILE))
+        driver, sessions = open_browsers(config, portals, driver_factory)
+        for job in search_stream(driver, config, index=index, sessions=sessions):
+            write(job)
+            written += 1
+            if limit and written >= limit:
+                break
+        logger.info(f"Search finished: {written} jobs")
+        return written
+    except FileNotFoundError as e:
+        logger.error(f"Configuration file not found: {e}")
+    except ConfigError as e:
+        logger.error(f"Invalid configuration ({len(e.problems)} problems); run python cli.py validate for details")
+    except KeyboardInterrupt:
+        logger.info(f"\nSearch interrupted by user after {written} jobs")
+    except Exception as e:
+        logger.error(f"Unexpected error occurred: {e}", exc_info=True)
+    finally:
+        close_browsers(driver, sessions)
+        if index:
+            index.close()
+
+def main_automation_process(workers=None, driver_factory=None, config=None,
+                            wait_for_login=None, on_event=None, resume=False, use_async=None, jobs=None):
     """
     Main automation workflow:
     1. Load configuration
     2. Open browser and perform manual login
-    3. Search for jobs based on filters
-    4. Apply to jobs automatically
+    3. Search for jobs based on filters (streamed page by page), scored and pre-filtered
+    4. Apply to jobs automatically as they arrive
     5. Generate report
+    
+    With workers > 1, step 4 runs in a pool of browser sessions (see worker_pool.py)
+    fed by the search session. With several portals (config "job_portals"), each
+    gets its own browser: they are searched concurrently into one deduplicated queue,
+    and each job is applied to in its portal's browser. `driver_factory` replaces login_and_prepare_driver,
+    e.g. with a fake driver for offline runs. With `use_async` (or config "async"),
+    step 4 runs on the asyncio orchestrator (see async_pipeline.py), which overlaps
+    search, job page preloading and pacing waits across the same sessions.
+    
+    Embedding callers (gui.py) can pass an already loaded `config` (a config.Config,
+    which keeps picking up edits to config.json between jobs, or a plain dict), replace the
+    console login prompt with `wait_for_login(portal)`, and receive progress as
+    dicts through `on_event`. Returns the results counters, or None on failure.
+    
+    Progress is journaled to a checkpoint after every job (see checkpoint.py); with
+    `resume`, an interrupted run continues with its pending jobs and counters
+    before searching on (already handled jobs are skipped without navigation).
+    
+    `jobs` (e.g. the output of a `cli.py search` dry run) replaces the search in
+    step 3: those jobs are applied to as given, without scoring them again.
     """
     driver = None
+    sessions = None
+    index = None
+    checkpoint = None
+    emit = on_event or (lambda event: None)
+    started = now()
+    from scraper import load_config, login_and_prepare_driver
+    driver_factory = driver_factory or login_and_prepare_driver
+    if wait_for_login:
+        driver_factory = partial(driver_factory, wait_for_login=wait_for_login)
     try:
         logger.info("="*60)
         logger.info("Job Auto Applier - Starting Process")
@@ -27,58 +157,140 @@ def main_automation_process():
         
         # Step 1: Load configuration
         logger.info("Step 1: Loading configuration...")
-        config = load_config()
+        emit({'type': 'stage', 'stage': 'config'})
+        loaded = config is None
+        config = as_config(config if config is not None else load_config())
+        # Tracing is configured from the config, so its load is recorded afterwards
+        if configure_tracing(config, origin=started) and loaded:
+            record('config.load', started)
         logger.info(f"Configuration loaded successfully")
-        logger.info(f"  Job Portal: {config['job_portal']}")
+        portals = configured_portals(config)
+        logger.info(f"  Job Portal: {', '.join(portals)}")
         logger.info(f"  Resume Path: {config.get('resume_path', 'Not set')}")
+        # Resumes are validated and hashed here, once, rather than on every upload
+        from resume_staging import get_resume_staging
+        get_resume_staging(config)
+        
+        # Applied-jobs index: skips jobs handled in earlier runs before any navigation
+        index = JobIndex(config.get('index_file', INDEX_FILE), csv_log=config.get('csv_log_file', LOG_FILE))
+        
+        checkpoint = Checkpoint(config.get('checkpoint_file', CHECKPOINT_FILE))
+        previous = checkpoint.load() if resume else None
+        if previous is not None and previous.finished:
+            logger.info("The last run completed; nothing to resume, starting a new run")
+            previous = None
+        elif previous is not None:
+            logger.info(f"Resuming run from {previous.started}: {previous.attempted} jobs handled, "
+                        f"{len(previous.pending)} pending{'' if previous.search_done else ', search unfinished'}")
+        elif resume:
+            logger.info("No checkpoint found; starting a new run")
+        checkpoint.start(previous)
         
         # Step 2: Initialize driver and manual login
         logger.info("\nStep 2: Initializing browser...")
-        driver = login_and_prepare_driver(config['job_portal'], config)
+        emit({'type': 'stage', 'stage': 'login'})
+        driver, sessions = open_browsers(config, portals, driver_factory)
         logger.info("Browser initialized successfully")
         
-        # Step 3: Search for jobs
+        # Step 3: Search for jobs (lazily - later pages are fetched while applying)
         logger.info("\nStep 3: Searching for jobs...")
-        jobs = search_jobs(driver, config)
-        logger.info(f"Found {len(jobs)} matching jobs")
+        emit({'type': 'stage', 'stage': 'search'})
+        if jobs is not None:
+            logger.info("Applying to the given job list instead of searching")
+            jobs = iter(jobs)
+        elif checkpoint.state.search_done:
+            jobs = iter(())
+        else:
+            jobs = search_stream(driver, config, index=index, sessions=sessions)
+        # Jobs pending from an interrupted run go first; every job is journaled as it is queued
+        jobs = checkpoint.track(chain(checkpoint.state.pending, jobs))
+        first_job = next(jobs, None)
         
-        if not jobs:
+        if first_job is None:
             logger.warning("No jobs found to apply to. Exiting.")
-            return
+            checkpoint.finish()
+            emit({'type': 'summary', 'results': {}})
+            return {}
+        jobs = chain([first_job], jobs)
         
         # Step 4: Apply to jobs
         logger.info("\nStep 4: Starting application process...")
+        emit({'type': 'stage', 'stage': 'apply'})
+        def on_result(job, status):
+            checkpoint.record(job, status)
+            emit({'type': 'job', 'status': status, 'title': job.get('title'),
+                  'company': job.get('company'), 'link': job.get('link')})
+        
         max_applications = config.get('max_applications', None)
+        cap_reached = False
         if max_applications:
             logger.info(f"Will apply to maximum {max_applications} jobs")
+            # Attempts made before an interruption count toward the cap
+            max_applications -= checkpoint.state.attempted
+            cap_reached = max_applications <= 0
         
-        results = apply_batch_jobs(driver, jobs, config, max_applications=max_applications)
+        workers = workers or config.get('workers', 1)
+        use_async = use_async if use_async is not None else bool(config.get('async'))
+        if cap_reached:
+            logger.info("Max applications limit was already reached before the interruption")
+        elif use_async:
+            logger.info("Applying on the async orchestrator")
+            from async_pipeline import run_async
+            run_async(jobs, config, driver=driver, sessions=sessions, workers=workers, driver_factory=driver_factory,
+                      max_applications=max_applications, index=index, on_result=on_result)
+        elif workers > 1:
+            logger.info(f"Applying with {workers} browser sessions")
+            from worker_pool import apply_with_worker_pool
+            apply_with_worker_pool(jobs, config, workers, driver_factory=driver_factory,
+                                   max_applications=max_applications, index=index,
+                                   on_result=on_result)
+        else:
+            from apply_jobs import apply_batch_jobs
+            apply_batch_jobs(driver, jobs, config, max_applications=max_applications, index=index,
+                             on_result=on_result, sessions=sessions)
+        checkpoint.finish()
+        results = checkpoint.state.results  # includes jobs handled before a resume
         
         # Step 5: Print summary
         logger.info("\nFinal Summary:")
-        logger.info(f"  Total Jobs Found: {len(jobs)}")
+        logger.info(f"  Total Jobs Processed: {sum(results.values())}")
         logger.info(f"  Successful Applications: {results['success']}")
         logger.info(f"  Failed Applications: {results['failed']}")
         logger.info(f"  Manual Required: {results['manual_required']}")
         logger.info(f"  Partial Applications: {results['partial']}")
         logger.info("\nCheck 'application_log.csv' and 'job_scraper.log' for detailed results")
         logger.info("="*60)
+        emit({'type': 'summary', 'results': results})
+        return results
         
     except FileNotFoundError as e:
         logger.error(f"Configuration file not found: {e}")
         logger.error("Please ensure config.json exists in the project directory")
+        emit({'type': 'error', 'message': str(e)})
+    except ConfigError as e:
+        logger.error(f"Invalid configuration ({len(e.problems)} problems); run python cli.py validate for details")
+        emit({'type': 'error', 'message': str(e)})
     except KeyboardInterrupt:
         logger.info("\nProcess interrupted by user")
+        if checkpoint is not None:
+            logger.info("Progress is checkpointed; continue with: python run.py --resume")
+        emit({'type': 'error', 'message': 'interrupted'})
     except Exception as e:
         logger.error(f"Unexpected error occurred: {e}", exc_info=True)
+        emit({'type': 'error', 'message': str(e)})
     finally:
         # Cleanup
-        if driver:
-            logger.info("Closing browser...")
-            driver.quit()
-            logger.info("Browser closed")
+        close_browsers(driver, sessions)
+        if index:
+            index.close()
+        if checkpoint:
+            checkpoint.close()
+        finish_tracing()
         logger.info("\nProcess completed")
         logger.info("="*60)
 
 if __name__ == '__main__':
-    main_automation_process()
+    # Same as: python cli.py apply [--workers N] [--resume] [--async]
+    import sys
+    from cli import main
+    sys.exit(main(['apply'] + sys.argv[1:]))
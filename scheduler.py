@@ -0,0 +1,284 @@
+# scheduler.py - Adaptive pacing between applications, driven by what the pages show
+import asyncio, logging, random, threading, time
+from collections import deque
+import tracing
+from tracing import span
+from waits import JitterPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PACING = {
+    'portal_jobs_per_hour': 600,    # token bucket shared by all sessions on a portal
+    'session_jobs_per_hour': 240,   # token bucket per browser session
+    'burst': 3,
+    'min_interval_sec': None,       # default: half of between_jobs_sec[0]
+    'max_interval_sec': 900,
+    'backoff': 2.0,                 # cooldown multiplier per consecutive warning signal
+    'recovery': 0.85,               # interval multiplier after a healthy job
+    'floor_margin': 1.25,           # a warning raises the interval floor to this x the pace that caused it
+    'floor_decay': 0.995,           # the floor relaxes by this after every healthy job
+    'slow_page_sec': 8.0,
+    'error_window': 10,
+    'max_error_rate': 0.5,
+}
+
+# Reads warning signs from the current page in one round-trip: limit banners,
+# captcha/challenge pages, and how long the page took to load.
+PAGE_SIGNALS_SCRIPT = """
+const text = (document.body ? document.body.innerText || document.body.textContent || '' : '').toLowerCase();
+const limited = ["you've reached the", "reached the limit", "too many requests", "try again later",
+                 "unusual activity"].some(s => text.includes(s));
+const captcha = !!document.querySelector(
+    'iframe[src*="captcha"], iframe[title*="challenge"], #captcha-internal, .g-recaptcha, [data-sitekey]');
+const nav = performance.getEntriesByType ? performance.getEntriesByType('navigation')[0] : null;
+return {rate_limited: limited, captcha, load_sec: nav ? nav.duration / 1000 : null};
+"""
+
+def read_page_signals(driver):
+    """The current page's warning signals (PAGE_SIGNALS_SCRIPT), {} when they cannot be read"""
+    try:
+        return driver.execute_script(PAGE_SIGNALS_SCRIPT) or {}
+    except Exception as e:
+        logger.debug(f"Could not read page signals: {e}")
+        return {}
+
+def throttle_reason(signals):
+    """'captcha page' or 'rate limit banner' when the signals show the portal throttling, else None"""
+    if signals.get('captcha'):
+        return 'captcha page'
+    if signals.get('rate_limited'):
+        return 'rate limit banner'
+    return None
+
+class SystemClock:
+    now = staticmethod(time.monotonic)
+    sleep = staticmethod(time.sleep)
+
+class SimulatedClock:
+    """Clock whose sleep() advances time instantly, for testing pacing without waiting"""
+
+    def __init__(self, start=0.0):
+        self.t = start
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self.t
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.t += max(seconds, 0)
+
+class TokenBucket:
+    """`rate_per_hour` tokens per hour, holding at most `burst`"""
+
+    def __init__(self, rate_per_hour, burst, clock):
+        self.rate = rate_per_hour / 3600.0
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock.now()
+
+    def update(self, rate_per_hour, burst):
+        """Change the rate and burst, keeping the tokens already earned (at most the new burst)"""
+        self._refill()
+        self.rate = rate_per_hour / 3600.0
+        self.burst = max(burst, 1)
+        self.tokens = min(self.tokens, self.burst)
+
+    def _refill(self):
+        now = self.clock.now()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        """Seconds until a token is available"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 or not self.rate else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+class AdaptiveScheduler:
+    """
+    Decides how long each session waits before its next application.
+
+    The interval starts at the mean of `between_jobs_sec` and every healthy job
+    shrinks it by `recovery`, down to a floor. Warning signals (rate-limit
+    banners, captchas, a high recent error rate) pause all sessions for a
+    cooldown that doubles with each consecutive warning (captchas: the maximum),
+    and raise the floor above the pace that caused them, so the interval settles
+    just under the portal's limit; the floor slowly relaxes while all is well.
+    Slow page loads stretch the interval without a cooldown. Token buckets per
+    portal and per session cap the rate whatever the interval is, and the
+    jitter policy's pauses are scaled along with the interval.
+    Thread-safe; sessions are identified by any hashable key (worker id).
+    When `config` is a hot-reloaded config.Config, changed pacing settings are
+    picked up before the next wait, keeping the learned interval and cooldown.
+    """
+
+    def __init__(self, config, clock=None, portal=None):
+        self.config = config
+        self.clock = clock or SystemClock()
+        self.portal = portal or config.get('job_portal', 'portal')
+        self.jitter = JitterPolicy.from_config(config)
+        self.jitter.sleep = self.clock.sleep
+        self.interval = None
+        self.floor = None
+        self.streak = 0
+        self.session_buckets = {}
+        self.last_finished = {}
+        self.recent = deque()
+        self._configure(config)
+        self.cooldown_until = 0.0
+        self.started = None
+        self.completed = 0
+        self.backoffs = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def _configure(self, config):
+        """
+        Read the pacing settings; on a reload the interval and floor are kept within
+        the new bounds, and the token buckets keep their level under the new rate
+        """
+        options = dict(DEFAULT_PACING, **(config.get('pacing') or {}))
+        low, high = config.get('between_jobs_sec', [10, 20])
+        self.version = getattr(config, 'version', 0)
+        self.base_interval = (low + high) / 2.0
+        self.min_interval = options['min_interval_sec'] if options['min_interval_sec'] is not None else low / 2.0
+        self.max_interval = options['max_interval_sec']
+        self.backoff = options['backoff']
+        self.recovery = options['recovery']
+        self.floor_margin = options['floor_margin']
+        self.floor_decay = options['floor_decay']
+        self.slow_page_sec = options['slow_page_sec']
+        self.max_error_rate = options['max_error_rate']
+        self.session_rate = options['session_jobs_per_hour']
+        self.burst = options['burst']
+        if self.interval is None:
+            self.portal_bucket = TokenBucket(options['portal_jobs_per_hour'], self.burst, self.clock)
+        else:
+            # A reload must not hand out a fresh burst: the buckets keep their tokens
+            self.portal_bucket.update(options['portal_jobs_per_hour'], self.burst)
+        for bucket in self.session_buckets.values():
+            bucket.update(self.session_rate, self.burst)
+        self.recent = deque(self.recent, maxlen=options['error_window'])
+        if self.interval is None:
+            self.interval = self.base_interval
+            self.floor = self.min_interval
+        else:
+            self.jitter.ranges = JitterPolicy.from_config(config).ranges
+            self.floor = min(max(self.floor, self.min_interval), self.max_interval)
+            self.interval = min(max(self.interval, self.floor), self.max_interval)
+
+    def _bucket(self, session):
+        bucket = self.session_buckets.get(session)
+        if bucket is None:
+            bucket = self.session_buckets[session] = TokenBucket(self.session_rate, self.burst, self.clock)
+        return bucket
+
+    def _delay(self, session):
+        with self._lock:
+            if getattr(self.config, 'version', 0) != self.version:
+                self._configure(self.config)
+                logger.info(f"{self.portal}: pacing settings reloaded (interval {self.interval:.0f}s)")
+            now = self.clock.now()
+            if self.started is None:
+                self.started = now
+            delays = [self.cooldown_until - now, self.portal_bucket.delay(), self._bucket(session).delay()]
+            if session in self.last_finished:
+                delays.append(self.last_finished[session] + self.interval * random.uniform(0.75, 1.25) - now)
+            delay = max(max(delays), 0.0)
+        if delay > 0:
+            logger.info(f"Waiting {delay:.0f} seconds before next application (interval {self.interval:.0f}s)")
+        return delay
+
+    def _start(self, session, delay):
+        with self._lock:
+            self.portal_bucket.take()
+            self._bucket(session).take()
+            self.waited += delay
+        return delay
+
+    def wait(self, session=0):
+        """Sleep until `session` may start its next application; returns the seconds waited"""
+        delay = self._delay(session)
+        if delay > 0:
+            with span('sleep', 'pacing'):
+                self.clock.sleep(delay)
+        return self._start(session, delay)
+
+    async def wait_async(self, session=0):
+        """wait() for the asyncio orchestrator: other tasks run while this session waits"""
+        delay = self._delay(session)
+        if delay > 0:
+            started = tracing.now()
+            if isinstance(self.clock, SystemClock):
+                await asyncio.sleep(delay)
+            else:
+                self.clock.sleep(delay)
+            tracing.record('sleep.pacing', started)
+        return self._start(session, delay)
+
+    def read_signals(self, driver):
+        return read_page_signals(driver)
+
+    def after_job(self, session, status, driver=None, navigated=True, signals=None):
+        """
+        Record a finished application; reads the page's warning signals when it was
+        opened, unless `signals` were already read (apply_to_job(signals=...))
+        """
+        if signals is None:
+            signals = self.read_signals(driver) if (driver is not None and navigated) else {}
+        self.record(session, status, signals)
+
+    def record(self, session, status, signals=None):
+        signals = signals or {}
+        with self._lock:
+            now = self.clock.now()
+            self.completed += 1
+            self.last_finished[session] = now
+            self.recent.append(status == 'failed')
+            error_rate = sum(self.recent) / len(self.recent)
+            throttle = throttle_reason(signals)
+            if throttle == 'captcha page':
+                self._back_off(now, throttle, cooldown=self.max_interval)
+            elif throttle:
+                self._back_off(now, throttle)
+            elif len(self.recent) >= 3 and error_rate >= self.max_error_rate:
+                self._back_off(now, f'error rate {error_rate:.0%}')
+                self.recent.clear()
+            elif (signals.get('load_sec') or 0) > self.slow_page_sec:
+                self.interval = min(self.max_interval, self.interval * self.backoff ** 0.5)
+                logger.info(f"{self.portal}: slow page ({signals['load_sec']:.1f}s), interval now {self.interval:.0f}s")
+            else:
+                self.streak = 0
+                self.floor = max(self.min_interval, self.floor * self.floor_decay)
+                self.interval = max(self.floor, self.interval * self.recovery)
+            if self.base_interval:
+                self.jitter.scale = min(max(self.interval / self.base_interval, 0.25), 4.0)
+
+    def _back_off(self, now, reason, cooldown=None):
+        self.streak += 1
+        self.backoffs += 1
+        self.floor = min(self.max_interval, max(self.floor, self.interval * self.floor_margin))
+        self.interval = max(self.interval, self.floor)
+        cooldown = cooldown or min(self.max_interval, self.base_interval * self.backoff ** self.streak)
+        self.cooldown_until = max(self.cooldown_until, now + cooldown)
+        logger.warning(f"{self.portal}: {reason}, pausing {cooldown:.0f}s, "
+                       f"then one application per {self.interval:.0f}s at most")
+
+    def jobs_per_hour(self):
+        with self._lock:
+            elapsed = (self.clock.now() - self.started) if self.started is not None else 0
+        return self.completed / elapsed * 3600 if elapsed > 0 else 0.0
+
+    def report(self):
+        return {'completed': self.completed, 'jobs_per_hour': round(self.jobs_per_hour(), 1),
+                'interval_sec': round(self.interval, 1), 'backoffs': self.backoffs, 'waited_sec': round(self.waited, 1)}
+
+    def format(self):
+        r = self.report()
+        return (f"{r['jobs_per_hour']:.1f} jobs/hour ({r['completed']} jobs, {r['backoffs']} backoffs, "
+                f"{r['waited_sec']:.0f}s waiting, interval now {r['interval_sec']:.0f}s)")
@@ -0,0 +1,151 @@
+# scoring.py - Relevance scoring and pre-filtering of scraped jobs, before any navigation
+import heapq, logging, re
+from collections import Counter
+from itertools import count
+from job_records import with_fields
+
+logger = logging.getLogger(__name__)
+
+FIELD_WEIGHTS = {'title': 3.0, 'snippet': 1.0, 'company': 0.5}
+PHRASE_WEIGHT = 2.0  # a whole keyword phrase ("software intern") beats its words on their own
+WORD_WEIGHT = 1.0
+MIN_WORD_LEN = 3
+
+def _normalize(text):
+    return ' '.join(text.lower().split())
+
+def _alternation(terms):
+    """
+    One case-insensitive regex matching any term at a word start. There is no
+    trailing boundary, so "intern" also matches "Internship". Longest terms come
+    first, so a phrase wins over its first word.
+    """
+    terms = sorted({_normalize(t) for t in terms if t and t.strip()}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(t) for t in terms) + ')', re.IGNORECASE)
+
+class JobScorer:
+    """
+    Scores job cards against the search keywords with one precompiled regex.
+
+    Every keyword phrase and each of its words is a term; a job's score is the sum,
+    per field (title, snippet, company), of the field weight times the weights of
+    the distinct terms found in it. Jobs whose title or snippet contains an
+    `exclude` term, or whose company matches the `blocklist`, are dropped outright.
+    select() keeps jobs scoring at least `min_score`, and with `top_k` only the K
+    best (which means waiting for the whole search before applying).
+    """
+
+    def __init__(self, keywords=(), exclude=(), blocklist=(), min_score=0.0, top_k=None, field_weights=None):
+        terms = {}
+        for phrase in keywords:
+            words = _normalize(phrase).split()
+            if len(words) > 1:
+                terms[' '.join(words)] = PHRASE_WEIGHT
+            for word in words:
+                if len(word) >= MIN_WORD_LEN:
+                    terms.setdefault(word, WORD_WEIGHT)
+        self.keywords = _alternation(terms)
+        self.term_weights = terms
+        self.exclude = _alternation(exclude)
+        self.blocklist = _alternation(blocklist)
+        self.field_weights = dict(FIELD_WEIGHTS, **(field_weights or {}))
+        self.min_score = min_score
+        self.top_k = top_k
+        self.stats = Counter()
+
+    @staticmethod
+    def _options(config):
+        scoring = config.get('scoring') or {}
+        keywords = scoring.get('keywords')
+        if keywords is None:
+            keywords = (config.get('filters') or {}).get('keywords') or []
+        return dict(keywords=keywords,
+                    exclude=scoring.get('exclude') or (),
+                    blocklist=scoring.get('blocklist') or (),
+                    min_score=scoring.get('min_score', 0.0),
+                    top_k=scoring.get('top_k'),
+                    field_weights=scoring.get('field_weights'))
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build from config 'scoring' (keywords default to filters.keywords):
+        {"keywords": [...], "exclude": [...], "blocklist": [...], "min_score": 0,
+         "top_k": null, "field_weights": {"title": 3, "snippet": 1, "company": 0.5}}
+        """
+        return cls(**cls._options(config))
+
+    def reconfigure(self, config):
+        """Switch to a reloaded config's rules in place (a running select() uses them from its next job)"""
+        stats = self.stats
+        self.__init__(**self._options(config))
+        self.stats = stats
+
+    @property
+    def active(self):
+        return bool(self.keywords or self.exclude or self.blocklist or self.top_k)
+
+    def reject_reason(self, job):
+        """'excluded' or 'blocklisted' if the job must never be applied to, else None"""
+        if self.blocklist and self.blocklist.search(job.get('company') or ''):
+            return 'blocklisted'
+        if self.exclude and (self.exclude.search(job.get('title') or '')
+                             or self.exclude.search(job.get('snippet') or '')):
+            return 'excluded'
+        return None
+
+    def score(self, job):
+        """Relevance score of a job card (0.0 without keywords)"""
+        if self.keywords is None:
+            return 0.0
+        findall, weights = self.keywords.findall, self.term_weights
+        total = 0.0
+        for field, field_weight in self.field_weights.items():
+            text = job.get(field)
+            if text:
+                found = findall(text)
+                if found:
+                    # Distinct terms only; card text is whitespace-normalized, so a match is the term itself
+                    total += field_weight * sum(weights.get(term, 0.0) for term in {t.lower() for t in found})
+        return total
+
+    def scored(self, jobs):
+        """Yield (score, job) for jobs that pass the exclude list, blocklist and threshold"""
+        for job in jobs:
+            reason = self.reject_reason(job)
+            if reason:
+                self.stats[reason] += 1
+                logger.debug(f"Skipping ({reason}): {job.get('title')} at {job.get('company')}")
+                continue
+            score = self.score(job)
+            if score < self.min_score:
+                self.stats['below_threshold'] += 1
+                logger.debug(f"Skipping (score {score:.1f} < {self.min_score}): {job.get('title')}")
+                continue
+            self.stats['kept'] += 1
+            yield score, job
+
+    def select(self, jobs):
+        """
+        Filter (and with top_k, rank) a job stream. Returns an iterator; jobs get a
+        'score' key. Without top_k jobs stay lazy, in search order.
+        """
+        if not self.active:
+            return iter(jobs)
+        if self.top_k:
+            seq = count()
+            best = heapq.nlargest(self.top_k, ((score, -next(seq), job) for score, job in self.scored(jobs)))
+            self._log_stats(f", top {len(best)} kept")
+            return iter([with_fields(job, score=score) for score, _, job in best])
+        return self._filtered(jobs)
+
+    def _filtered(self, jobs):
+        for score, job in self.scored(jobs):
+            yield with_fields(job, score=score)
+        self._log_stats()
+
+    def _log_stats(self, extra=''):
+        summary = ', '.join(f"{k}: {v}" for k, v in sorted(self.stats.items()))
+        logger.info(f"Job scoring - {summary or 'no jobs'}{extra}")
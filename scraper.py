@@ -1,18 +1,21 @@
 # scraper.py - Enhanced job scraper with detailed logging
-import time, random, json, os, logging
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import time, random, json, os, logging, queue, re, threading
+from contextlib import contextmanager
+from itertools import chain
+from config import Config, ConfigError
+from dedup import get_dedup_index, skip_near_duplicates
+from driver_factory import create_driver
+from job_details import JobDetailFetcher
+from tracing import span
+from portals import UnknownPortal, configured_portals, get_adapter, portal_key
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('job_scraper.log'), logging.StreamHandler()]
-)
 logger = logging.getLogger(__name__)
 
+# Jobs found by concurrent portal searches but not yet taken by the apply stage
+SEARCH_QUEUE_SIZE = 50
+_SEARCH_DONE = object()  # queue sentinel
+_LISTING_RE = re.compile(r'[^0-9a-z]+')
+
 def random_delay(min_sec, max_sec):
     """Random delay between actions to avoid bot detection"""
     t = random.uniform(min_sec, max_sec)
@@ -20,158 +23,192 @@ def random_delay(min_sec, max_sec):
     time.sleep(t)
 
 def load_config(config_path='config.json'):
-    """Load configuration from JSON file"""
+    """Load and validate the configuration file as a hot-reloadable config.Config"""
+    with span('config.load'):
+        return _read_config(config_path)
+
+def _read_config(config_path):
     if not os.path.exists(config_path):
         logger.error(f"Config file {config_path} not found")
         raise FileNotFoundError(f"{config_path} not found")
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-            logger.info(f"Configuration loaded successfully from {config_path}")
-            return config
+        config = Config.load(config_path)
+        logger.info(f"Configuration loaded successfully from {config_path}")
+        return config
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in config file: {e}")
         raise
+    except ConfigError as e:
+        for problem in e.problems:
+            logger.error(f"Invalid config: {problem}")
+        raise
 
-def login_and_prepare_driver(portal, config):
-    """Open browser and wait for manual login"""
+def login_and_prepare_driver(portal, config, profile_dir=None, wait_for_login=None):
+    """
+    Open a browser logged in to `portal` (browser options in driver_factory.py).
+    With `profile_dir`, Chrome keeps its user data (and login cookies) there between runs,
+    so a still-valid session skips the login prompt.
+    `wait_for_login(portal)` replaces the console prompt (e.g. the GUI's continue button).
+    """
     logger.info(f"Starting {portal} driver...")
+    if profile_dir:
+        logger.info(f"Using browser profile: {profile_dir}")
     try:
-        driver = webdriver.Chrome()
-        portal_url = f'https://www.{portal.lower()}.com/'
-        logger.info(f"Opening {portal_url}")
-        driver.get(portal_url)
-        
-        print(f"\n{'='*60}")
-        print(f"Please log in to {portal} in the browser window.")
-        print(f"After logging in, press Enter here to continue...")
-        print(f"{'='*60}\n")
-        
-        input()  # Wait for manual login
-        logger.info(f"Manual login completed for {portal}")
-        return driver
+        return create_driver(portal, config, profile_dir=profile_dir, wait_for_login=wait_for_login)
     except Exception as e:
         logger.error(f"Error initializing driver: {e}")
         raise
 
-def search_jobs(driver, config):
+def search_jobs(driver, config, index=None):
     """Search for jobs based on config filters"""
-    portal = config['job_portal'].lower()
+    return list(iter_jobs(driver, config, index=index))
+
+def iter_jobs(driver, config, index=None, sessions=None, progress=None):
+    """
+    Generator version of search_jobs: yields normalized job records page by page,
+    so applying can start as soon as the first results page is parsed.
+    Jobs already handled according to `index` (a job_index.JobIndex) are skipped.
+    
+    Each portal is searched by its adapter (see portals.py). With several portals
+    (config "job_portals") and `sessions`, they are searched concurrently, each in
+    its own browser; without `sessions` one after the other in `driver`. Either way
+    the results are merged into one stream, deduplicated across portals.
+    
+    Near-duplicates (the same role on another portal or reposted under a new link,
+    see dedup.py) are dropped unless config "dedup" is false.
+    `progress` (a portals.SearchProgress) tells consumers when the next job needs a
+    search page loaded.
+    """
+    portals = configured_portals(config)
     filters = config['filters']
-    jobs = []
     
-    logger.info(f"Starting job search on {portal}")
+    logger.info(f"Starting job search on {', '.join(portals)}")
     logger.info(f"Search filters: {filters}")
     
     try:
-        if portal == 'linkedin':
-            return search_linkedin_jobs(driver, config, filters)
-        elif portal == 'indeed':
-            return search_indeed_jobs(driver, config, filters)
+        if len(portals) > 1 and sessions is not None:
+            jobs = search_portals(sessions, config, index=index, progress=progress)
+        elif len(portals) > 1:
+            jobs = dedup_listings(chain.from_iterable(
+                get_adapter(portal).iter_jobs(driver, config, index=index, progress=progress) for portal in portals))
         else:
-            logger.warning(f"Portal {portal} not supported yet")
-            return []
+            jobs = get_adapter(portals[0]).iter_jobs(driver, config, index=index, progress=progress)
+        dedup = get_dedup_index(config, index=index)
+        yield from skip_near_duplicates(jobs, dedup, index=index) if dedup is not None else jobs
+    except UnknownPortal as e:
+        logger.warning(f"Portal not supported: {e}")
     except Exception as e:
         logger.error(f"Error during job search: {e}")
-        return []
 
-def search_linkedin_jobs(driver, config, filters):
-    """LinkedIn specific job search"""
-    jobs = []
-    try:
-        logger.info("Navigating to LinkedIn jobs page...")
-        driver.get('https://www.linkedin.com/jobs/')
-        random_delay(*config['delay_range_sec'])
-        
-        # Try to find job cards - Updated selectors for current LinkedIn
-        logger.info("Looking for job listings...")
-        
-        # Common LinkedIn job card selectors
-        job_card_selectors = [
-            '.job-card-container',
-            '[data-job-id]',
-            '.jobs-search__results-list li',
-            '.job-search-card'
-        ]
-        
-        job_cards = []
-        for selector in job_card_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    job_cards = elements
-                    logger.info(f"Found {len(job_cards)} job cards using selector: {selector}")
-                    break
-            except:
-                continue
-        
-        if not job_cards:
-            logger.warning("No job cards found. LinkedIn may have updated their page structure.")
-            logger.info("Please inspect the page and update the selectors in search_linkedin_jobs()")
-            return []
-        
-        logger.info(f"Processing {len(job_cards)} job listings...")
-        
-        for idx, card in enumerate(job_cards[:10]):  # Limit to first 10 for testing
+def listing_key(job):
+    """Title and company, normalized: the same posting on two portals has the same key"""
+    return _LISTING_RE.sub(' ', f"{job.get('title', '')} | {job.get('company', '')}".lower()).strip()
+
+def dedup_listings(jobs):
+    """Drop jobs another portal already listed (same title and company)"""
+    first_portal = {}
+    for job in jobs:
+        portal = first_portal.setdefault(listing_key(job), job.get('portal'))
+        if portal != job.get('portal'):
+            logger.info(f"Skipping {job['title']} at {job['company']} on {job.get('portal')}: already found on {portal}")
+            continue
+        yield job
+
+class PortalSessions:
+    """
+    The browser session of each portal in a multi-portal run. Searching and
+    applying take turns on a session under its lock (portals sharing one browser
+    share one lock); search results are parsed whole before the lock is released,
+    so the apply stage may navigate away between pages.
+    """
+    
+    def __init__(self, drivers):
+        self.drivers = {portal_key(portal): driver for portal, driver in drivers.items()}
+        locks = {}
+        self.locks = {portal: locks.setdefault(id(driver), threading.RLock())
+                      for portal, driver in self.drivers.items()}
+        self.default = next(iter(self.drivers))
+    
+    @contextmanager
+    def use(self, portal):
+        """Hold `portal`'s session (the first one for portals without their own) and yield its driver"""
+        key = portal_key(portal)
+        key = key if key in self.drivers else self.default
+        with self.locks[key]:
+            yield self.drivers[key]
+    
+    def quit(self):
+        for driver in {id(d): d for d in self.drivers.values()}.values():
             try:
-                # Try multiple selector strategies
-                title = None
-                company = None
-                link = None
-                
-                # Try to get title
-                title_selectors = ['.job-title', '[data-test="job-title"]', '.job-card__title']
-                for sel in title_selectors:
-                    try:
-                        title_elem = card.find_element(By.CSS_SELECTOR, sel)
-                        title = title_elem.text
-                        if title:
-                            break
-                    except:
-                        continue
-                
-                # Try to get company
-                company_selectors = ['.company-name', '[data-test="company-name"]', '.job-card__company']
-                for sel in company_selectors:
-                    try:
-                        company_elem = card.find_element(By.CSS_SELECTOR, sel)
-                        company = company_elem.text
-                        if company:
-                            break
-                    except:
-                        continue
-                
-                # Try to get link
-                try:
-                    link_elem = card.find_element(By.CSS_SELECTOR, 'a')
-                    link = link_elem.get_attribute('href')
-                except:
-                    link = None
-                
-                if title and company:
-                    job = {
-                        'title': title,
-                        'company': company,
-                        'link': link or 'N/A',
-                        'portal': 'linkedin'
-                    }
-                    jobs.append(job)
-                    logger.info(f"Found job {idx+1}: {title} at {company}")
-                else:
-                    logger.debug(f"Skipped job card {idx+1} - missing title or company")
-                    
+                driver.quit()
             except Exception as e:
-                logger.debug(f"Error processing job card {idx+1}: {e}")
-                continue
-        
-        logger.info(f"Job search completed. Found {len(jobs)} jobs.")
-        return jobs
-        
-    except Exception as e:
-        logger.error(f"Error in LinkedIn search: {e}")
-        return []
+                logger.debug(f"Error closing browser: {e}")
 
-def search_indeed_jobs(driver, config, filters):
-    """Indeed specific job search - placeholder"""
-    logger.info("Indeed search not yet implemented")
-    return []
+class SessionDetailFetcher:
+    """job_details.JobDetailFetcher.fetch() in each job's own portal session"""
+    
+    def __init__(self, sessions, config):
+        self.sessions = sessions
+        self.config = config
+    
+    def fetch(self, job):
+        with self.sessions.use(job.get('portal')) as driver:
+            return JobDetailFetcher(driver, self.config).fetch(job)
+
+def search_portals(sessions, config, index=None, progress=None):
+    """
+    Search every configured portal at once, one thread per portal session, and
+    yield the jobs as they are found, merged through a bounded queue and deduplicated.
+    Stops the searches when the consumer stops pulling (e.g. max_applications).
+    `progress` (a portals.SearchProgress) counts the jobs waiting in the queue.
+    """
+    results = queue.Queue(maxsize=SEARCH_QUEUE_SIZE)
+    stop = threading.Event()
+    
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                if progress is not None and item is not _SEARCH_DONE:
+                    progress.add(1)
+                return
+            except queue.Full:
+                continue
+    
+    def search(portal):
+        with sessions.use(portal) as driver:
+            jobs = get_adapter(portal).iter_jobs(driver, config, index=index)
+        try:
+            while not stop.is_set():
+                # Each step navigates and parses a whole page at most, then lets go of the browser
+                with sessions.use(portal):
+                    job = next(jobs, None)
+                if job is None:
+                    break
+                put(job)
+        except Exception as e:
+            logger.error(f"Error during {portal} search: {e}")
+        finally:
+            put(_SEARCH_DONE)
+    
+    portals = configured_portals(config)
+    threads = [threading.Thread(target=search, args=(portal,), name=f'search-{portal_key(portal)}', daemon=True)
+               for portal in portals]
+    for t in threads:
+        t.start()
+    
+    def merged():
+        remaining = len(threads)
+        while remaining:
+            item = results.get()
+            if item is _SEARCH_DONE:
+                remaining -= 1
+            else:
+                if progress is not None:
+                    progress.add(-1)
+                yield item
+    
+    try:
+        yield from dedup_listings(merged())
+    finally:
+        stop.set()
@@ -0,0 +1,301 @@
+# selector_stats.py - Selector health telemetry, learned fallback order and quarantine
+import argparse, atexit, datetime, logging, sqlite3, threading, time
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from extract import COUNTED_FIELDS
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_STATS_FILE = 'selector_stats.db'
+QUARANTINE_AFTER = 3        # consecutive errors, with no hit ever, before a selector is skipped
+FLUSH_INTERVAL_SEC = 30
+DRIFT_RECENT_DAYS = 3       # report: recent window compared against the days before it
+
+HIT, MISS, ERROR = 'hit', 'miss', 'error'
+_SPARK = ' ▁▂▃▄▅▆▇█'
+
+def selector_key(locator):
+    """Stable name of a locator: the CSS text itself, otherwise 'by:value' (e.g. xpath:...)"""
+    if isinstance(locator, str):
+        return locator
+    by, value = locator
+    return value if by == By.CSS_SELECTOR else f'{by}:{value}'
+
+class SelectorStats:
+    """
+    Hit, miss and error counts plus lookup latency per (group, selector), where a
+    group is one fallback list (a wait step like 'easy_apply_button', or a card
+    field like 'linkedin.title'). Counters are kept per day in SQLite so drift
+    shows up over time; writes are batched and flushed every `flush_interval_sec`.
+
+    order() puts the selector that hit most recently first and leaves out
+    quarantined ones: selectors that errored `quarantine_after` times in a row
+    without ever hitting (invalid CSS, unsupported pseudo-classes).
+    """
+
+    def __init__(self, path=SELECTOR_STATS_FILE, quarantine_after=QUARANTINE_AFTER,
+                 flush_interval_sec=FLUSH_INTERVAL_SEC):
+        self.path = path
+        self.quarantine_after = quarantine_after
+        self.flush_interval_sec = flush_interval_sec
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS selector_days (day TEXT NOT NULL, grp TEXT NOT NULL,'
+                           ' selector TEXT NOT NULL, hits INTEGER NOT NULL, misses INTEGER NOT NULL,'
+                           ' errors INTEGER NOT NULL, latency_sec REAL NOT NULL, timed INTEGER NOT NULL,'
+                           ' PRIMARY KEY (day, grp, selector)) WITHOUT ROWID')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS selector_state (grp TEXT NOT NULL, selector TEXT NOT NULL,'
+                           ' last_hit REAL, error_streak INTEGER NOT NULL, ever_hit INTEGER NOT NULL,'
+                           ' quarantined INTEGER NOT NULL, PRIMARY KEY (grp, selector)) WITHOUT ROWID')
+        self._conn.commit()
+        # (grp, selector) -> [last_hit, error_streak, ever_hit, quarantined]
+        self.state = {(g, s): [last, streak, bool(hit), bool(q)] for g, s, last, streak, hit, q in
+                      self._conn.execute('SELECT * FROM selector_state')}
+        self._pending = {}  # (day, grp, selector) -> [hits, misses, errors, latency_sec, timed]
+        self._dirty = set()
+        self._last_flush = time.monotonic()
+
+    def record(self, group, selector, outcome, seconds=None, count=1):
+        """Count `count` lookups of `selector` in `group` with `outcome` (hit, miss or error)"""
+        if not count:
+            return
+        day = datetime.date.today().isoformat()
+        with self._lock:
+            key = (group, selector)
+            counters = self._pending.get((day,) + key)
+            if counters is None:
+                counters = self._pending[(day,) + key] = [0, 0, 0, 0.0, 0]
+            state = self.state.get(key)
+            if state is None:
+                state = self.state[key] = [None, 0, False, False]
+            if outcome == HIT:
+                counters[0] += count
+                state[0], state[1], state[2], state[3] = time.time(), 0, True, False
+            elif outcome == MISS:
+                counters[1] += count
+                state[1] = 0
+            else:
+                counters[2] += count
+                state[1] += count
+                if not state[2] and not state[3] and state[1] >= self.quarantine_after:
+                    state[3] = True
+                    logger.warning(f"Quarantined selector {selector!r} ({group}): "
+                                   f"{state[1]} errors in a row and never matched")
+            if seconds is not None:
+                counters[3] += seconds
+                counters[4] += count
+            self._dirty.add(key)
+            if time.monotonic() - self._last_flush >= self.flush_interval_sec:
+                self._flush()
+
+    def is_quarantined(self, group, selector):
+        state = self.state.get((group, selector))
+        return bool(state and state[3])
+
+    def order(self, group, items):
+        """`items` (locators or selector strings) minus quarantined ones, most recent hit first"""
+        with self._lock:
+            ranked = []
+            for i, item in enumerate(items):
+                state = self.state.get((group, selector_key(item)))
+                if state is None:
+                    ranked.append(((1, 0, i), item))
+                elif not state[3]:
+                    ranked.append(((0, -state[0], i) if state[0] else (1, 0, i), item))
+        ranked.sort(key=lambda pair: pair[0])
+        return [item for _, item in ranked]
+
+    def find_first(self, driver, locators, require_clickable=False, group='default', tries=None):
+        """
+        waits.find_first, trying locators in learned order and recording every try;
+        with a `tries` dict the outcomes are collected there ({selector: (outcome,
+        seconds)}) for record_tries() instead
+        """
+        def record(group, key, outcome, seconds):
+            if tries is None:
+                self.record(group, key, outcome, seconds)
+            else:
+                tries[key] = (outcome, seconds)
+
+        for by, value in self.order(group, locators):
+            key = selector_key((by, value))
+            start = time.perf_counter()
+            try:
+                elements = driver.find_elements(by, value)
+            except WebDriverException:
+                record(group, key, ERROR, time.perf_counter() - start)
+                continue
+            elapsed = time.perf_counter() - start
+            for element in elements:
+                try:
+                    if not require_clickable or (element.is_displayed() and element.is_enabled()):
+                        record(group, key, HIT, elapsed)
+                        return element
+                except WebDriverException:
+                    continue  # went stale between lookup and check
+            record(group, key, MISS, elapsed)
+        return None
+
+    def record_tries(self, group, tries):
+        """Record outcomes collected by find_first(tries=...), once each"""
+        for key, (outcome, seconds) in tries.items():
+            self.record(group, key, outcome, seconds)
+
+    def order_set(self, name, selectors):
+        """An extract.SelectorSet with each field's fallbacks in learned order (groups '<name>.<field>')"""
+        return selectors._replace(**{field: tuple(self.order(f'{name}.{field}', getattr(selectors, field)))
+                                     for field in COUNTED_FIELDS})
+
+    def record_extraction(self, name, selectors, counts):
+        """
+        Record the per-selector counts an extraction returns: counts[field] is a list of
+        [tried, hits, errors] per selector of selectors.<field>, in the order they were passed
+        """
+        for field, rows in (counts or {}).items():
+            for selector, (tried, hits, errors) in zip(getattr(selectors, field), rows):
+                group = f'{name}.{field}'
+                self.record(group, selector, ERROR, count=errors)
+                self.record(group, selector, MISS, count=tried - hits - errors)
+                self.record(group, selector, HIT, count=hits)
+
+    def _flush(self):
+        if self._pending:
+            self._conn.executemany(
+                'INSERT INTO selector_days VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (day, grp, selector) DO UPDATE'
+                ' SET hits = hits + excluded.hits, misses = misses + excluded.misses, errors = errors + excluded.errors,'
+                ' latency_sec = latency_sec + excluded.latency_sec, timed = timed + excluded.timed',
+                [key + tuple(counters) for key, counters in self._pending.items()])
+        if self._dirty:
+            self._conn.executemany('INSERT OR REPLACE INTO selector_state VALUES (?, ?, ?, ?, ?, ?)',
+                                   [key + tuple(self.state[key]) for key in self._dirty])
+        self._conn.commit()
+        self._pending.clear()
+        self._dirty.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def release(self, selector=None):
+        """Lift the quarantine of one selector (all of them when None); returns how many"""
+        with self._lock:
+            released = [key for key, state in self.state.items()
+                        if state[3] and (selector is None or key[1] == selector)]
+            for key in released:
+                self.state[key][1], self.state[key][3] = 0, False
+                self._dirty.add(key)
+            self._flush()
+        return len(released)
+
+    def report(self, days=14, group=None):
+        """
+        Per group and selector: totals, daily hit rates (oldest first) and a status:
+        'drift'       hit rate fell by half or more in the last DRIFT_RECENT_DAYS days
+        'dead'        used to match, tried recently without a hit
+        'quarantined' skipped, see order()
+        'unmatched'   a fallback that has never matched (fine while another one does)
+        'unused'      not tried recently; otherwise 'ok'
+        """
+        self.flush()
+        since = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+        recent = (datetime.date.today() - datetime.timedelta(days=DRIFT_RECENT_DAYS - 1)).isoformat()
+        query = 'SELECT * FROM selector_days WHERE day >= ?' + (' AND grp = ?' if group else '') + ' ORDER BY day'
+        with self._lock:
+            rows = self._conn.execute(query, (since, group) if group else (since,)).fetchall()
+            state = {key: list(value) for key, value in self.state.items()}
+        entries = {}
+        for day, grp, selector, hits, misses, errors, latency, timed in rows:
+            e = entries.setdefault((grp, selector), {
+                'group': grp, 'selector': selector, 'hits': 0, 'tries': 0, 'errors': 0, 'latency_sec': 0.0,
+                'timed': 0, 'daily': {}, 'before': [0, 0], 'recent': [0, 0]})
+            tries = hits + misses + errors
+            e['hits'] += hits
+            e['tries'] += tries
+            e['errors'] += errors
+            e['latency_sec'] += latency
+            e['timed'] += timed
+            e['daily'][day] = hits / tries if tries else None
+            window = e['recent'] if day >= recent else e['before']
+            window[0] += hits
+            window[1] += tries
+        for key, e in entries.items():
+            before = e['before'][0] / e['before'][1] if e['before'][1] else None
+            now = e['recent'][0] / e['recent'][1] if e['recent'][1] else None
+            last_hit, _, ever_hit, quarantined = state.get(key, [None, 0, False, False])
+            if quarantined:
+                e['status'] = 'quarantined'
+            elif now is None:
+                e['status'] = 'unused'
+            elif not e['recent'][0]:
+                e['status'] = 'dead' if (ever_hit or e['hits']) else 'unmatched'
+            elif before is not None and before >= 0.2 and now <= before / 2:
+                e['status'] = 'drift'
+            else:
+                e['status'] = 'ok'
+            e['hit_rate'] = e['hits'] / e['tries'] if e['tries'] else 0.0
+            e['avg_ms'] = e['latency_sec'] / e['timed'] * 1000 if e['timed'] else None
+        return sorted(entries.values(), key=lambda e: (e['group'], e['selector']))
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
+        atexit.unregister(self.flush)
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_selector_stats(config):
+    """
+    Shared SelectorStats from config 'selector_stats' (None when set to false):
+    {"path": "selector_stats.db", "quarantine_after": 3, "flush_interval_sec": 30}
+    """
+    options = config.get('selector_stats', {})
+    if options is False:
+        return None
+    options = options if isinstance(options, dict) else {}
+    path = options.get('path', SELECTOR_STATS_FILE)
+    with _registries_lock:
+        if path not in _registries:
+            stats = _registries[path] = SelectorStats(
+                path, quarantine_after=options.get('quarantine_after', QUARANTINE_AFTER),
+                flush_interval_sec=options.get('flush_interval_sec', FLUSH_INTERVAL_SEC))
+            atexit.register(stats.flush)
+        return _registries[path]
+
+def format_report(entries, days):
+    lines = [f"Selector health, last {days} days (daily hit rate oldest -> newest)", '']
+    today = datetime.date.today()
+    day_names = [(today - datetime.timedelta(days=n)).isoformat() for n in range(days - 1, -1, -1)]
+    group = None
+    for e in entries:
+        if e['group'] != group:
+            group = e['group']
+            lines.append(group)
+        spark = ''.join(' ' if e['daily'].get(day) is None else _SPARK[1 + round(e['daily'][day] * 7)]
+                        for day in day_names)
+        avg = f"{e['avg_ms']:6.1f}ms" if e['avg_ms'] is not None else '       -'
+        lines.append(f"  {e['selector'][:56]:<56} {e['tries']:>7} tries {e['hit_rate']:>5.0%} hit "
+                     f"{e['errors']:>6} err {avg} [{spark}] {e['status']}")
+    flagged = [e for e in entries if e['status'] in ('drift', 'dead', 'quarantined')]
+    lines.append('')
+    lines.append(f"{len(flagged)} selector(s) need attention" if flagged else "All selectors healthy")
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Selector health report')
+    parser.add_argument('command', nargs='?', default='report', choices=['report', 'release'])
+    parser.add_argument('--days', type=int, default=14, help='days of history to show (report)')
+    parser.add_argument('--group', default=None, help='only this group, e.g. easy_apply_button (report)')
+    parser.add_argument('--selector', default=None, help='selector to release (release; default: all)')
+    parser.add_argument('--db', default=SELECTOR_STATS_FILE)
+    args = parser.parse_args()
+    stats = SelectorStats(args.db)
+    if args.command == 'release':
+        print(f"Released {stats.release(args.selector)} quarantined selector(s)")
+    else:
+        print(format_report(stats.report(args.days, args.group), args.days))
+    stats.close()
@@ -0,0 +1,22 @@
+# conftest.py - Fixtures shared by the tests: quiet logging and delay-free configs
+import logging
+import pytest
+from benchmarks.fake_site import fake_config
+
+# No pacing: tests of the scheduler itself use SimulatedClock or set their own 'pacing'
+NO_WAITING = {'between_jobs_sec': [0, 0], 'wait_timeout_sec': 0.1, 'optional_wait_timeout_sec': 0.05,
+              'pacing': {'portal_jobs_per_hour': 10 ** 9, 'session_jobs_per_hour': 10 ** 9, 'min_interval_sec': 0}}
+
+@pytest.fixture(autouse=True)
+def quiet():
+    logging.disable(logging.WARNING)
+    yield
+    logging.disable(logging.NOTSET)
+
+@pytest.fixture
+def make_config(tmp_path):
+    """make_config(name='run', **overrides): a delay-free LinkedIn config with all run state in tmp_path"""
+    def make(name='run', **overrides):
+        config = dict(NO_WAITING, job_portal='LinkedIn', profiles_dir=str(tmp_path / 'profiles'))
+        return fake_config(dict(config, **overrides), str(tmp_path), name)
+    return make
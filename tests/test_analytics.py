@@ -0,0 +1,95 @@
+# test_analytics.py - Incremental analytics over the application log, and job ordering by expected success
+import csv
+from analytics import ApplicationAnalytics, error_template, prioritize
+from logger import FIELDNAMES
+from portals import SearchProgress
+
+def write_log(path, rows, mode='a'):
+    with open(path, mode, newline='') as f:
+        writer = csv.writer(f)
+        if mode == 'w':
+            writer.writerow(FIELDNAMES)
+        writer.writerows(rows)
+
+def row(i, company, status, error=''):
+    return [f'2026-05-01T{i % 24:02d}:00:00', 'Python Developer', company,
+            f'https://www.linkedin.com/jobs/view/{i}/', status, error]
+
+def history(n):
+    return [row(i, 'Acme' if i % 2 else 'Globex', 'success' if i % 2 else 'failed',
+                '' if i % 2 else f'Message: timeout: Timed out receiving message from renderer: {i}.5')
+            for i in range(n)]
+
+def test_refresh_reads_only_appended_rows(tmp_path):
+    log = str(tmp_path / 'application_log.csv')
+    write_log(log, history(20), mode='w')
+    analytics = ApplicationAnalytics(log, str(tmp_path / 'analytics.db'))
+    assert analytics.refresh() == 20
+    assert analytics.refresh() == 0
+    write_log(log, [row(20, 'Initech', 'success')])
+    assert analytics.refresh() == 1
+    report = analytics.report(min_attempts=1)
+    analytics.close()
+
+    rebuilt = ApplicationAnalytics(log, str(tmp_path / 'rebuilt.db'))
+    rebuilt.refresh()
+    assert rebuilt.report(min_attempts=1) == report
+    reopened = ApplicationAnalytics(log, str(tmp_path / 'analytics.db'))
+    assert reopened.refresh() == 0
+    assert reopened.report(min_attempts=1) == report
+
+def test_replaced_log_is_rebuilt(tmp_path):
+    log = str(tmp_path / 'application_log.csv')
+    write_log(log, history(20), mode='w')
+    analytics = ApplicationAnalytics(log, str(tmp_path / 'analytics.db'))
+    analytics.refresh()
+    write_log(log, history(4), mode='w')
+    assert analytics.refresh() == 4
+    assert analytics.report()['total'] == 4
+
+def test_failures_are_clustered_by_template(tmp_path):
+    log = str(tmp_path / 'application_log.csv')
+    write_log(log, history(20), mode='w')
+    analytics = ApplicationAnalytics(log, str(tmp_path / 'analytics.db'))
+    analytics.refresh()
+    clusters = analytics.report()['failure_clusters']
+    assert len(clusters) == 1 and clusters[0]['count'] == 10
+    assert clusters[0]['template'] == error_template('Message: timeout: Timed out receiving message from renderer: 1.5')
+
+def test_rank_puts_likely_successes_first(tmp_path):
+    log = str(tmp_path / 'application_log.csv')
+    write_log(log, history(40), mode='w')
+    analytics = ApplicationAnalytics(log, str(tmp_path / 'analytics.db'))
+    analytics.refresh()
+    jobs = [{'title': 'Python Developer', 'company': company, 'link': 'https://www.linkedin.com/jobs/view/1/'}
+            for company in ('Globex', 'NewCo', 'Acme')]
+    assert [job['company'] for job in analytics.rank(jobs)] == ['Acme', 'NewCo', 'Globex']
+
+def paged_search(pages, progress, loads):
+    """A search of `pages` pages of 10 jobs, counting page loads like PortalAdapter.iter_jobs"""
+    for page in range(pages):
+        loads.append(page)
+        page_jobs = [{'title': 'Python Developer', 'company': 'Acme' if i % 2 else 'Globex', 'link': ''}
+                     for i in range(10)]
+        progress.add(len(page_jobs))
+        for job in page_jobs:
+            progress.add(-1)
+            yield job
+
+def test_prioritize_does_not_wait_for_the_next_search_page(tmp_path):
+    log = str(tmp_path / 'application_log.csv')
+    write_log(log, history(40), mode='w')
+    analytics = ApplicationAnalytics(log, str(tmp_path / 'analytics.db'))
+    progress, loads = SearchProgress(), []
+    stream = prioritize(paged_search(3, progress, loads), analytics, window=25, progress=progress)
+    first = next(stream)
+    assert len(loads) == 1
+    assert first['company'] == 'Acme'
+    assert len([first] + list(stream)) == 30
+
+def test_prioritize_without_progress_holds_a_window(tmp_path):
+    analytics = ApplicationAnalytics(str(tmp_path / 'missing.csv'), str(tmp_path / 'analytics.db'))
+    loads = []
+    stream = prioritize(paged_search(3, SearchProgress(), loads), analytics, window=25)
+    next(stream)
+    assert len(loads) == 3
@@ -0,0 +1,78 @@
+# test_answers.py - Answer cache defaults, and filling form pages through the shared label lookup
+from answers import AnswerCache
+from easy_apply import FILL_FIELDS_SCRIPT, MODAL_SELECTOR, EasyApplyFlow
+from waits import Readiness
+from benchmarks.fake_driver import FakeDriver
+
+FORM = """<html><body><div role="dialog"><h3>Contact info</h3>
+<label for="phone">Phone number</label><input id="phone" name="phone" required>
+<fieldset><legend>Willing to relocate?</legend>
+<label><input type="radio" name="relocate" value="r1" required> Yes</label>
+<label><input type="radio" name="relocate" value="r2" required> No</label>
+</fieldset></div></body></html>"""
+
+CONSENT = """<html><body><div role="dialog"><h3>Review</h3>
+<label><input type="checkbox" name="terms" required> I agree to the terms</label>
+<label><input type="checkbox" name="updates" checked> Send me job updates</label>
+<label><input type="checkbox" name="locked" disabled required> Locked acknowledgement</label>
+<button aria-label="Submit application">Submit</button>
+</div></body></html>"""
+NO_WAITING = {'wait_timeout_sec': 0.05, 'optional_wait_timeout_sec': 0.02, 'wait_poll_sec': 0.001,
+              'jitter_sec': {'default': [0, 0]}, 'resume_path': ''}
+
+def make_flow(tmp_path, html, defaults):
+    driver = FakeDriver(html=html)
+    flow = EasyApplyFlow(driver, {'title': 'Job', 'company': 'Acme'}, NO_WAITING, Readiness(driver, NO_WAITING),
+                         answers=AnswerCache(str(tmp_path / 'answers.jsonl'), defaults=defaults))
+    return driver, flow
+
+def fill(tmp_path, defaults, html=FORM):
+    driver, flow = make_flow(tmp_path, html, defaults)
+    filled = flow.fill_page(flow.read_page())
+    return driver, flow, filled
+
+def checked(driver):
+    return [el.get_attribute('value') for el in driver.find_elements('css selector', 'input[type="radio"]')
+            if el.get_attribute('checked') is not None]
+
+def test_blank_defaults_are_unanswered(tmp_path):
+    cache = AnswerCache(str(tmp_path / 'answers.jsonl'), defaults={'phone': '', 'city': '  ', 'notice': None})
+    assert cache.lookup('Phone number') is None
+    assert cache.lookup('Current city') is None
+    assert cache.lookup('Notice period') is None
+
+def test_blank_cached_answer_falls_back_to_defaults(tmp_path):
+    path = tmp_path / 'answers.jsonl'
+    path.write_text('{"question": "Phone number", "answer": ""}\n')
+    assert AnswerCache(str(path), defaults={'phone': '555-0100'}).lookup('Phone number') == '555-0100'
+
+def test_blank_phone_default_leaves_required_field_missing(tmp_path):
+    driver, flow, filled = fill(tmp_path, {'phone': '', 'relocate': 'Yes'})
+    assert not filled
+    assert flow.unanswered == ['Phone number']
+
+def test_radio_in_wrapping_label_is_filled(tmp_path):
+    driver, flow, filled = fill(tmp_path, {'phone': '555-0100', 'relocate': 'No'})
+    assert filled
+    page = flow.read_page()
+    radio = next(f for f in page['fields'] if f['kind'] == 'radio')
+    assert radio['options'] == ['Yes', 'No']
+    assert radio['value'] == 'No'
+    assert checked(driver) == ['r2']
+
+def test_required_checkbox_is_ticked(tmp_path):
+    driver, flow, filled = fill(tmp_path, {'agree to the terms': 'Yes', 'job updates': 'no'}, html=CONSENT)
+    assert filled
+    boxes = {f['question']: f['value'] for f in flow.read_page()['fields']}
+    assert boxes['I agree to the terms'] == 'yes'
+    assert boxes['Send me job updates'] == 'yes'  # prefilled, so it is learned rather than changed
+
+def test_checkbox_that_cannot_be_ticked_is_reported(tmp_path):
+    driver = FakeDriver(html=CONSENT)
+    fills = [{'key': '0', 'value': 'yes'}, {'key': '2', 'value': 'yes'}]  # the third box is disabled
+    assert driver.execute_script(FILL_FIELDS_SCRIPT, MODAL_SELECTOR, fills) == ['2']
+
+def test_unconfirmed_submit_is_partial(tmp_path):
+    driver, flow = make_flow(tmp_path, CONSENT, {'terms': 'yes'})
+    assert flow.run() == 'partial'
+    assert any(node.attrs.get('aria-label') == 'Submit application' for node in driver.clicks)
@@ -0,0 +1,62 @@
+# test_application_log.py - Buffered application log: failed writes keep their rows, other sinks mirror the CSV
+import csv, sqlite3
+import pytest
+from logger import ApplicationLog, CsvSink, MirroredSink, open_application_log
+
+JOB = {'title': 'Engineer', 'company': 'Acme', 'link': 'https://example.com/1'}
+
+class FlakySink:
+    """Fails the first `failures` writes"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.path = 'flaky'
+        self.rows = []
+
+    def write_rows(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('disk full')
+        self.rows.extend(rows)
+
+    def close(self):
+        pass
+
+def csv_statuses(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row['status'] for row in csv.DictReader(f)]
+
+def test_failed_write_keeps_the_rows():
+    sink = FlakySink(failures=1)
+    log = ApplicationLog(sink, flush_rows=2, flush_interval=0)
+    log.log(JOB, 'success')
+    with pytest.raises(OSError):
+        log.log(JOB, 'failed')
+    log.log(JOB, 'partial')
+    log.close()
+    assert [row['status'] for row in sink.rows] == ['success', 'failed', 'partial']
+
+def test_sqlite_sink_mirrors_the_csv_log(tmp_path):
+    config = {'csv_log_file': str(tmp_path / 'application_log.csv'),
+              'application_log': {'sink': 'sqlite', 'path': str(tmp_path / 'application_log.db')}}
+    log = open_application_log(config)
+    log.log(JOB, 'success')
+    log.log(JOB, 'failed', error='timeout')
+    log.close()
+    assert csv_statuses(config['csv_log_file']) == ['success', 'failed']
+    with sqlite3.connect(config['application_log']['path']) as conn:
+        assert conn.execute('SELECT status FROM applications ORDER BY rowid').fetchall() == [('success',), ('failed',)]
+
+def test_failed_mirror_write_is_retried_without_duplicates():
+    primary, mirror = FlakySink(failures=0), FlakySink(failures=1)
+    log = ApplicationLog(MirroredSink(primary, mirror), flush_rows=1, flush_interval=0)
+    log.log(JOB, 'success')  # the mirror write fails and the rows wait for the next one
+    log.log(JOB, 'failed')
+    log.close()
+    assert [row['status'] for row in primary.rows] == ['success', 'failed']
+    assert [row['status'] for row in mirror.rows] == ['success', 'failed']
+
+def test_csv_sink_is_not_mirrored(tmp_path):
+    log = open_application_log({'csv_log_file': str(tmp_path / 'application_log.csv')})
+    assert isinstance(log.sink, CsvSink)
+    log.close()
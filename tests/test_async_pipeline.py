@@ -0,0 +1,102 @@
+# test_async_pipeline.py - The asyncio orchestrator against the sequential path, on fake browsers with latency
+import asyncio, time
+import async_pipeline
+from apply_jobs import apply_batch_jobs
+from async_pipeline import run_async
+from job_index import JobIndex
+from scheduler import AdaptiveScheduler
+from scraper import iter_jobs
+from benchmarks.fake_driver import FakeDriver
+from benchmarks.fake_site import linkedin_pages
+
+LATENCY = 0.001     # per WebDriver round-trip
+INTERVAL = 0.05     # pacing wait between jobs
+PAGES = linkedin_pages(external_every=4)
+PACED = {'max_search_pages': 1, 'between_jobs_sec': [INTERVAL, INTERVAL],
+         'pacing': {'portal_jobs_per_hour': 10 ** 9, 'session_jobs_per_hour': 10 ** 9, 'recovery': 1.0}}
+
+def factory(portal, config, profile_dir=None):
+    return FakeDriver(pages=PAGES, latency=LATENCY)
+
+class TimedDriver(FakeDriver):
+    """Records when each page was first opened"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.opened = {}
+
+    def get(self, url):
+        self.opened.setdefault(url, time.monotonic())
+        super().get(url)
+
+def record_waits(monkeypatch):
+    """Each pacing wait's end time, and whether it was cut short, in the order the waits start"""
+    waits = []
+    wait_async = AdaptiveScheduler.wait_async
+
+    async def timed_wait(self, session=0):
+        wait = {'cancelled': False}
+        waits.append(wait)
+        try:
+            return await wait_async(self, session)
+        except asyncio.CancelledError:
+            wait['cancelled'] = True
+            raise
+        finally:
+            wait['end'] = time.monotonic()
+
+    monkeypatch.setattr(AdaptiveScheduler, 'wait_async', timed_wait)
+    return waits
+
+def test_async_matches_the_sequential_path_and_overlaps_the_waits(make_config, monkeypatch):
+    config = make_config('sequential', **PACED)
+    driver = factory('LinkedIn', config)
+    expected = apply_batch_jobs(driver, iter_jobs(driver, config), config, max_applications=12)
+
+    config = make_config('async', **PACED)
+    driver = TimedDriver(pages=PAGES, latency=LATENCY)
+    waits = record_waits(monkeypatch)
+    handled = []
+    results = run_async(iter_jobs(driver, config), config, driver=driver, max_applications=12,
+                        on_result=lambda job, status: handled.append((job, status)))
+    assert results == expected
+    assert results['success'] and results['manual_required']  # both Easy Apply and company-website jobs
+    # One session: the n-th wait paces the n-th job. The first job is not paced
+    for (job, status), wait in list(zip(handled, waits))[1:]:
+        assert driver.opened[job['link']] < wait['end']  # the job page loaded during the wait
+        assert wait['cancelled'] == (status == 'manual_required')  # company-website jobs skip theirs
+
+def test_async_sessions_share_the_cap(make_config):
+    config = make_config('cap', **PACED)
+    driver = factory('LinkedIn', config)
+    handled = []
+    results = run_async(iter_jobs(driver, config), config, driver=driver, workers=3, driver_factory=factory,
+                        max_applications=5, on_result=lambda job, status: handled.append(status))
+    assert sum(results.values()) == 5
+    assert len(handled) == 5
+
+def test_async_reports_jobs_the_index_skips(tmp_path, make_config):
+    config = make_config('skip', **PACED)
+    driver = factory('LinkedIn', config)
+    jobs = list(iter_jobs(driver, config))
+    index = JobIndex(str(tmp_path / 'job_index.db'))
+    for job in jobs[:10]:
+        index.record(job, 'success')
+    reported = []
+    results = run_async(iter(jobs), config, driver=driver, index=index,
+                        on_result=lambda job, status: reported.append(status))
+    assert sum(results.values()) == len(jobs) - 10
+    assert reported.count('skipped') == 10
+
+def test_async_reports_the_job_whose_session_crashed(make_config, monkeypatch):
+    def crash(driver, job, config, **kwargs):
+        raise RuntimeError('invalid session id')
+
+    monkeypatch.setattr(async_pipeline, 'apply_to_job', crash)
+    config = make_config('crash', max_search_pages=1)
+    driver = factory('LinkedIn', config)
+    jobs = list(iter_jobs(driver, config))[:3]
+    reported = []
+    results = run_async(iter(jobs), config, driver=driver, on_result=lambda job, status: reported.append(status))
+    assert results['failed'] == 1 and sum(results.values()) == 1
+    assert reported == ['failed']
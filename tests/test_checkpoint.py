@@ -0,0 +1,59 @@
+# test_checkpoint.py - Resume journal: skipped jobs get a result, handled jobs survive repeated resumes
+from apply_jobs import apply_batch_jobs
+from checkpoint import Checkpoint
+from job_index import JobIndex
+from worker_pool import WorkerPool
+from benchmarks.fake_driver import FakeDriver
+
+def make_jobs(n):
+    return [{'title': f'Job {i}', 'company': 'Acme', 'portal': 'linkedin', 'job_id': str(i),
+             'link': f'https://www.linkedin.com/jobs/view/{i}/'} for i in range(n)]
+
+def done_index(tmp_path, jobs):
+    index = JobIndex(str(tmp_path / 'job_index.db'))
+    for job in jobs:
+        index.record(job, 'success')
+    return index
+
+def test_jobs_skipped_by_the_index_are_not_pending_on_resume(tmp_path, make_config):
+    jobs = make_jobs(3)
+    index = done_index(tmp_path, jobs)
+    checkpoint = Checkpoint(str(tmp_path / 'run_checkpoint.jsonl'))
+    checkpoint.start()
+    config = make_config('skip')
+    results = apply_batch_jobs(FakeDriver(), checkpoint.track(jobs), config, index=index,
+                               on_result=checkpoint.record)
+    checkpoint.close()
+    assert sum(results.values()) == 0
+    state = checkpoint.load()
+    assert state.pending == []
+    assert state.attempted == 0
+
+def test_worker_pool_reports_skipped_jobs(tmp_path, make_config):
+    jobs = make_jobs(4)
+    reported = []
+    config = make_config('pool')
+    pool = WorkerPool([FakeDriver(), FakeDriver()], config, index=done_index(tmp_path, jobs),
+                      on_result=lambda job, status: reported.append((job['job_id'], status)))
+    pool.run(jobs)
+    assert sorted(reported) == [(str(i), 'skipped') for i in range(4)]
+
+def test_handled_jobs_survive_repeated_resumes(tmp_path):
+    jobs = make_jobs(3)
+    checkpoint = Checkpoint(str(tmp_path / 'run_checkpoint.jsonl'))
+    checkpoint.start()
+    list(checkpoint.track(jobs))
+    checkpoint.record(jobs[0], 'success')
+    checkpoint.close()
+
+    for _ in range(2):  # the second resume starts from a compacted journal
+        checkpoint.start(checkpoint.load())
+        checkpoint.close()
+    state = checkpoint.load()
+    assert [job['job_id'] for job in state.pending] == ['1', '2']
+    assert state.results['success'] == 1
+
+    checkpoint.start(state)
+    tracked = list(checkpoint.track(make_jobs(3)))  # the resumed search finds all three again
+    checkpoint.close()
+    assert tracked == []
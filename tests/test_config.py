@@ -0,0 +1,25 @@
+# test_config.py - Config validation, and the optional features accepting every value the schema allows
+import pytest
+from config import ConfigError, as_config, validate_config
+from dedup import get_dedup_index
+from job_details import get_detail_cache
+from selector_stats import get_selector_stats
+
+def test_validate_reports_every_problem():
+    problems, warnings = validate_config({'job_portal': 'Nope', 'workers': 0, 'filters': {}, 'resume_path': '',
+                                          'colour': 'blue'})
+    assert len(problems) == 2
+    assert warnings == ["unknown key 'colour'"]
+    with pytest.raises(ConfigError):
+        as_config({'workers': 'two'})
+
+@pytest.mark.parametrize('key, getter', [
+    ('detail_cache', get_detail_cache),
+    ('selector_stats', get_selector_stats),
+    ('dedup', get_dedup_index),
+])
+def test_boolean_feature_switches(tmp_path, monkeypatch, key, getter):
+    monkeypatch.chdir(tmp_path)
+    assert not validate_config({key: True}, required=())[0]
+    assert getter({key: True}) is not None
+    assert getter({key: False}) is None
@@ -0,0 +1,54 @@
+# test_log_stats.py - Reading the application log in bounded chunks, and tailing it as it grows
+import csv
+from log_stats import LogTail, csv_record_batches, csv_records
+from logger import FIELDNAMES
+
+def write_log(path, rows, mode='w'):
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if mode == 'w':
+            writer.writerow(FIELDNAMES)
+        writer.writerows(rows)
+
+def make_rows(n):
+    # Every third error spans lines and holds quotes, so records cross chunk boundaries in every way
+    return [[f'2026-01-{1 + i % 28:02d}T10:00:00', f'Job {i}', f'Company {i % 5}', f'https://example.com/{i}',
+             'failed' if i % 3 == 0 else 'success', f'Message: "no such element"\n  (attempt {i})' if i % 3 == 0 else '']
+            for i in range(n)]
+
+def test_batches_match_a_single_read_for_any_chunk_size(tmp_path):
+    path = tmp_path / 'application_log.csv'
+    write_log(path, make_rows(40))
+    data = path.read_bytes()
+    expected = list(csv_records(data, 0))
+    for chunk_size in (1, 7, 64, 1000, len(data)):
+        with open(path, 'rb') as f:
+            batches = list(csv_record_batches(f, 0, len(data), chunk_size=chunk_size))
+        assert [record for batch in batches for record in batch] == expected
+        assert all(batches)
+
+def test_batches_leave_a_partial_last_record(tmp_path):
+    path = tmp_path / 'application_log.csv'
+    path.write_bytes(b'a,b\n1,"two\nlines"\n3,"unfinished\n')
+    with open(path, 'rb') as f:
+        records = [r for batch in csv_record_batches(f, 0, path.stat().st_size, chunk_size=5) for r in batch]
+    assert [(start, end) for start, end, _ in records] == [(0, 4), (4, 18)]
+
+def test_tail_reads_rows_as_they_are_appended(tmp_path):
+    path = tmp_path / 'application_log.csv'
+    rows = make_rows(30)
+    write_log(path, rows[:20])
+    tail = LogTail(str(path))
+    assert tail.refresh() == 20
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('2026-02-01T10:00:00,Job x,Company x,https://example.com/x,failed,"Message: half')
+    assert tail.refresh() == 0  # the partial row waits for the rest of it
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(' a row"\n')
+    write_log(path, rows[20:], mode='a')
+    assert tail.refresh() == 11
+    stats = tail.stats()
+    assert stats['total'] == 31
+    assert stats['by_status'] == {'failed': 11, 'success': 20}
+    assert stats['recent_failures'][0]['error'] == rows[-3][5]
+    assert tail.page(1, per_page=2)['rows'][0]['title'] == 'Job 29'
@@ -0,0 +1,41 @@
+# test_portals.py - Infinite-scroll results: wait for the list to grow instead of sleeping
+from linkedin_portal import LinkedInAdapter
+from portals import RESULTS_HEIGHT_SCRIPT, SCROLL_RESULTS_SCRIPT
+from waits import Readiness
+from benchmarks.fake_driver import FakeDriver
+
+class ScrollingList(FakeDriver):
+    """A results list that grows by one page `polls` height reads after a scroll, `pages` times"""
+
+    def __init__(self, pages, polls=3):
+        super().__init__(html='<html><body></body></html>')
+        self.height = 1000
+        self.pages = pages
+        self.polls = polls
+        self.scrolls = 0
+        self._due = None
+        self.script_handlers = dict(self.script_handlers, **{SCROLL_RESULTS_SCRIPT: ScrollingList._scroll,
+                                                              RESULTS_HEIGHT_SCRIPT: ScrollingList._measure})
+
+    def _scroll(self, selector):
+        self.scrolls += 1
+        if self.pages:
+            self.pages -= 1
+            self._due = self.polls
+        return self.height
+
+    def _measure(self, selector):
+        if self._due is not None:
+            self._due -= 1
+            if not self._due:
+                self._due = None
+                self.height += 1000
+        return self.height
+
+def test_scrolling_stops_when_nothing_more_loads():
+    driver = ScrollingList(pages=2)
+    ready = Readiness(driver, {'wait_timeout_sec': 0.2, 'optional_wait_timeout_sec': 0.05, 'wait_poll_sec': 0.001})
+    LinkedInAdapter().scroll_results(driver, ready, rounds=5)
+    assert driver.scrolls == 3  # two pages loaded, the third scroll found the end of the list
+    assert driver.height == 3000
+    assert ready.metrics.steps['search_scroll']['timeouts'] == 1
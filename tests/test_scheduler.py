@@ -0,0 +1,110 @@
+# test_scheduler.py - Adaptive pacing on a simulated clock, and throttled pages staying retryable
+import csv
+from apply_jobs import apply_batch_jobs
+from job_index import JobIndex
+from scheduler import AdaptiveScheduler, SimulatedClock, TokenBucket, throttle_reason
+from benchmarks.fake_driver import FakeDriver, load_fixture
+
+CAPTCHA_PAGE = '<html><body><iframe src="https://challenge.example/captcha"></iframe></body></html>'
+
+def make_jobs(n):
+    return [{'title': f'Job {i}', 'company': 'Acme', 'portal': 'LinkedIn', 'job_id': str(i),
+             'link': f'https://www.linkedin.com/jobs/view/{i}/'} for i in range(n)]
+
+def logged(config):
+    with open(config['csv_log_file'], newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_healthy_jobs_shrink_the_interval():
+    scheduler = AdaptiveScheduler({'between_jobs_sec': [10, 20]}, clock=SimulatedClock())
+    start = scheduler.interval
+    for _ in range(20):
+        scheduler.wait()
+        scheduler.record(0, 'success', {'load_sec': 1.0})
+    assert scheduler.interval < start
+    assert scheduler.interval >= scheduler.min_interval
+    assert scheduler.backoffs == 0
+
+def test_warning_signals_back_off_exponentially():
+    clock = SimulatedClock()
+    scheduler = AdaptiveScheduler({'between_jobs_sec': [10, 20]}, clock=clock)
+    scheduler.record(0, 'failed', {'rate_limited': True})
+    first = scheduler.cooldown_until - clock.now()
+    scheduler.record(0, 'failed', {'rate_limited': True})
+    second = scheduler.cooldown_until - clock.now()
+    assert scheduler.backoffs == 2
+    assert second == 2 * first
+    assert scheduler.wait() >= second
+
+def test_captcha_pauses_for_the_maximum():
+    clock = SimulatedClock()
+    scheduler = AdaptiveScheduler({'between_jobs_sec': [10, 20], 'pacing': {'max_interval_sec': 600}}, clock=clock)
+    scheduler.record(0, 'failed', {'captcha': True})
+    assert scheduler.cooldown_until == clock.now() + 600
+
+def test_token_bucket_caps_the_rate():
+    clock = SimulatedClock()
+    bucket = TokenBucket(3600, burst=2, clock=clock)
+    bucket.take()
+    bucket.take()
+    assert bucket.delay() == 1.0
+    clock.sleep(1.0)
+    assert bucket.delay() == 0.0
+
+def test_reload_keeps_the_token_levels():
+    class Reloaded(dict):
+        version = 0
+
+    clock = SimulatedClock()
+    config = Reloaded(between_jobs_sec=[0, 0], pacing={'portal_jobs_per_hour': 3600, 'session_jobs_per_hour': 3600})
+    scheduler = AdaptiveScheduler(config, clock=clock)
+    for _ in range(3):
+        scheduler.wait(0)  # the burst is spent
+    session_bucket = scheduler.session_buckets[0]
+    config['pacing'] = {'portal_jobs_per_hour': 7200, 'session_jobs_per_hour': 7200, 'burst': 2}
+    config.version += 1
+    assert scheduler.wait(0) == 0.5  # no fresh burst: the next token comes at the new rate
+    assert scheduler.session_buckets[0] is session_bucket and session_bucket.burst == 2
+
+def test_bucket_update_clamps_to_the_new_burst():
+    clock = SimulatedClock()
+    bucket = TokenBucket(3600, burst=3, clock=clock)
+    bucket.update(7200, burst=1)
+    assert bucket.tokens == 1
+    bucket.take()
+    assert bucket.delay() == 0.5
+
+def test_throttle_reason():
+    assert throttle_reason({'captcha': True, 'rate_limited': True}) == 'captcha page'
+    assert throttle_reason({'rate_limited': True}) == 'rate limit banner'
+    assert throttle_reason({'load_sec': 30}) is None
+
+def run_batch(tmp_path, config, page):
+    jobs = make_jobs(2)
+    driver = FakeDriver(pages={job['link']: page for job in jobs})
+    index = JobIndex(str(tmp_path / 'job_index.db'))
+    scheduler = AdaptiveScheduler(config, clock=SimulatedClock())
+    results = apply_batch_jobs(driver, jobs, config, index=index, scheduler=scheduler)
+    return jobs, index, scheduler, results
+
+def test_rate_limit_banner_is_recorded_as_failed_and_retried(tmp_path, make_config):
+    config = make_config()
+    jobs, index, scheduler, results = run_batch(tmp_path, config, load_fixture('linkedin_rate_limited.html'))
+    assert results['failed'] == 2 and results['manual_required'] == 0
+    assert not any(index.is_done(job) for job in jobs)
+    assert [row['error'] for row in logged(config)] == ['Throttled: rate limit banner'] * 2
+    assert scheduler.backoffs == 2
+
+def test_captcha_page_is_recorded_as_failed(tmp_path, make_config):
+    config = make_config()
+    jobs, index, scheduler, results = run_batch(tmp_path, config, CAPTCHA_PAGE)
+    assert results['failed'] == 2
+    assert not any(index.is_done(job) for job in jobs)
+    assert {row['status'] for row in logged(config)} == {'failed'}
+
+def test_external_job_page_is_still_manual_required(tmp_path, make_config):
+    config = make_config()
+    jobs, index, scheduler, results = run_batch(tmp_path, config, load_fixture('linkedin_job_external.html'))
+    assert results['manual_required'] == 2
+    assert all(index.is_done(job) for job in jobs)
+    assert scheduler.backoffs == 0
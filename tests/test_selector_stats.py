@@ -0,0 +1,46 @@
+# test_selector_stats.py - Waits record one selector outcome each, however often they poll
+from waits import Readiness, css
+from benchmarks.fake_driver import FakeDriver
+
+BUTTON = '<html><body><button class="apply">Apply</button></body></html>'
+LOCATORS = css('.easy-apply', '.apply')
+
+class SlowPage(FakeDriver):
+    """Renders BUTTON after `polls` lookups"""
+
+    def __init__(self, polls):
+        super().__init__(html='<html><body></body></html>')
+        self.polls = polls
+
+    def find_elements(self, by=None, value=None):
+        self.polls -= 1
+        if self.polls == 0:
+            self._set_html(BUTTON)
+        return super().find_elements(by, value)
+
+def counts(ready):
+    return {e['selector']: (e['hits'], e['tries']) for e in ready.stats.report(group='apply_button')}
+
+def make_ready(tmp_path, driver):
+    config = {'selector_stats': {'path': str(tmp_path / 'selector_stats.db')},
+              'wait_timeout_sec': 0.05, 'wait_poll_sec': 0.001}
+    return Readiness(driver, config)
+
+def test_timeout_records_one_miss_per_selector(tmp_path):
+    driver = SlowPage(polls=10 ** 6)
+    ready = make_ready(tmp_path, driver)
+    assert ready.present('apply_button', LOCATORS) is None
+    assert driver.commands['findElements'] > 4  # polled many times
+    assert counts(ready) == {'.easy-apply': (0, 1), '.apply': (0, 1)}
+
+def test_success_records_the_last_lookup_only(tmp_path):
+    driver = SlowPage(polls=20)
+    ready = make_ready(tmp_path, driver)
+    assert ready.present('apply_button', LOCATORS) is not None
+    assert counts(ready) == {'.easy-apply': (0, 1), '.apply': (1, 1)}
+
+def test_lookups_outside_a_wait_are_recorded_directly(tmp_path):
+    ready = make_ready(tmp_path, FakeDriver(html=BUTTON))
+    for _ in range(3):
+        ready.find(ready.driver, 'apply_button', LOCATORS)
+    assert counts(ready)['.apply'] == (3, 3)
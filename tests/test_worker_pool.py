@@ -0,0 +1,98 @@
+# test_worker_pool.py - Worker pool with injected fake browsers: the global cap, merged results, portal routing
+import threading
+import worker_pool
+from apply_jobs import apply_batch_jobs
+from job_index import JobIndex
+from worker_pool import WorkerPool, apply_with_worker_pool
+from benchmarks.fake_driver import FakeDriver, load_fixture
+
+PAGES = {
+    'https://www.linkedin.com/jobs/view/1': 'linkedin_job_easy_apply.html',
+    'https://www.linkedin.com/jobs/view/2': 'linkedin_job_external.html',
+    'https://www.indeed.com/viewjob': 'indeed_job_apply.html',
+}
+
+class RecordingDriver(FakeDriver):
+    def __init__(self, portal=None, profile_dir=None):
+        super().__init__(pages={url: load_fixture(name) for url, name in PAGES.items()})
+        self.portal = portal
+        self.profile_dir = profile_dir
+        self.visited = []
+        self.quit_called = False
+
+    def get(self, url):
+        self.visited.append(url)
+        super().get(url)
+
+    def quit(self):
+        self.quit_called = True
+
+def linkedin_jobs(n):
+    # Odd job IDs apply with Easy Apply, even ones on the company website
+    return [{'title': f'Job {i}', 'company': 'Acme', 'portal': 'linkedin', 'job_id': str(i),
+             'link': f'https://www.linkedin.com/jobs/view/{1 + i % 2}{i:04d}/'} for i in range(n)]
+
+def test_cap_is_global_across_workers(make_config):
+    config = make_config()
+    seen = []
+    lock = threading.Lock()
+
+    def on_result(job, status):
+        with lock:
+            seen.append(job['job_id'])
+
+    pool = WorkerPool([RecordingDriver() for _ in range(3)], config, max_applications=5, on_result=on_result)
+    results = pool.run(iter(linkedin_jobs(40)))
+    assert pool.attempted == 5
+    assert sum(results.values()) == 5
+    assert len(seen) == len(set(seen)) == 5
+
+def test_results_merge_like_a_serial_run(make_config):
+    jobs = linkedin_jobs(12)
+    serial = apply_batch_jobs(RecordingDriver(), jobs, make_config('serial'))
+    pool = WorkerPool([RecordingDriver() for _ in range(3)], make_config('pool'))
+    assert pool.run(jobs) == serial
+    assert serial['success'] == 6 and serial['manual_required'] == 6
+
+def test_a_crashed_session_reports_its_job(make_config, monkeypatch):
+    def crash(driver, job, config, **kwargs):
+        raise RuntimeError('invalid session id')
+
+    monkeypatch.setattr(worker_pool, 'apply_to_job', crash)
+    reported = []
+    pool = WorkerPool([RecordingDriver()], make_config(),
+                      on_result=lambda job, status: reported.append((job['job_id'], status)))
+    results = pool.run(linkedin_jobs(3))
+    assert results['failed'] == 1 and sum(results.values()) == 1
+    assert reported == [('0', 'failed')]
+
+def test_done_jobs_are_skipped(tmp_path, make_config):
+    jobs = linkedin_jobs(6)
+    index = JobIndex(str(tmp_path / 'job_index.db'))
+    for job in jobs[:4]:
+        index.record(job, 'success')
+    pool = WorkerPool([RecordingDriver() for _ in range(2)], make_config(), index=index)
+    results = pool.run(jobs)
+    assert pool.skipped == 4
+    assert sum(results.values()) == 2
+
+def test_each_portal_has_its_own_logged_in_workers(make_config):
+    config = make_config(job_portals=['LinkedIn', 'Indeed'])
+    started = []
+
+    def factory(portal, config, profile_dir=None):
+        driver = RecordingDriver(portal, profile_dir)
+        started.append(driver)
+        return driver
+
+    jobs = linkedin_jobs(6) + [{'title': f'Indeed job {i}', 'company': 'Initech', 'portal': 'indeed',
+                                'job_id': f'jk{i}', 'link': f'https://www.indeed.com/viewjob?jk={i}'}
+                               for i in range(6)]
+    results = apply_with_worker_pool(jobs, config, 2, driver_factory=factory)
+    assert sum(results.values()) == 12
+    assert [(d.portal, d.profile_dir.rsplit('/', 1)[-1]) for d in started] == [
+        ('LinkedIn', 'worker-1'), ('LinkedIn', 'worker-2'),
+        ('Indeed', 'worker-1-indeed'), ('Indeed', 'worker-2-indeed')]
+    for driver in started:
+        assert driver.quit_called
+        assert all(('linkedin' in url) == (driver.portal == 'LinkedIn') for url in driver.visited)
@@ -0,0 +1,225 @@
+# tracing.py - Lightweight spans per pipeline stage, exported as JSONL and Chrome trace, with a run summary
+import atexit, itertools, json, logging, os, threading, time
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = 'trace.jsonl'
+FLUSH_EVERY = 1000  # spans buffered before the JSONL file is appended to
+
+class _NoopSpan:
+    """What span() returns while tracing is off: entering and leaving it does nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Span:
+    __slots__ = ('tracer', 'name', 'attrs', 'id', 'parent', 'start', 'child_ns')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs if attrs is not None else {}
+        self.child_ns = 0
+
+    def __enter__(self):
+        self.tracer._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._exit(self)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes known only inside the span (e.g. the application status)"""
+        self.attrs.update(attrs)
+
+class Tracer:
+    """
+    Collects spans from every thread. Each finished span is buffered for the
+    JSONL file (`path`), kept for the Chrome trace (`chrome_trace`, loadable in
+    chrome://tracing and ui.perfetto.dev) and added to per-name totals: count,
+    total time and self time (minus child spans), which make the run summary.
+    """
+
+    def __init__(self, path=TRACE_FILE, chrome_trace=None, show_summary=True, origin=None):
+        self.path = path
+        self.chrome_trace = chrome_trace
+        self.show_summary = show_summary
+        self.origin = origin or time.perf_counter_ns()
+        self.totals = {}  # name -> [count, total_ns, self_ns]
+        self.events = []  # finished spans kept for the Chrome trace
+        self.buffer = []
+        self.threads = {}
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if path:
+            open(path, 'w').close()
+
+    def span(self, name, label=None, attrs=None):
+        return Span(self, f'{name}.{label}' if label else name, attrs)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+            thread = threading.current_thread()
+            self.threads[thread.ident] = thread.name
+        return stack
+
+    def _enter(self, span):
+        stack = self._stack()
+        span.id = next(self._ids)
+        span.parent = stack[-1] if stack else None
+        stack.append(span)
+        span.start = time.perf_counter_ns()
+
+    def _exit(self, span):
+        end = time.perf_counter_ns()
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        elif span in stack:  # spans of interleaved asyncio tasks on one thread may close out of order
+            stack.remove(span)
+        self.add(span.name, span.start, end, span.attrs, span.parent, span.id, span.child_ns)
+
+    def add(self, name, start, end, attrs=None, parent=None, span_id=None, child_ns=0):
+        """Record a finished span (perf_counter_ns timestamps)"""
+        duration = end - start
+        if parent is not None:
+            parent.child_ns += duration
+        thread = threading.get_ident()
+        record = {
+            'name': name, 'id': span_id or next(self._ids), 'parent': parent.id if parent is not None else None,
+            'thread': thread, 'start_us': (start - self.origin) // 1000, 'dur_us': duration // 1000,
+        }
+        if attrs:
+            record['attrs'] = attrs
+        with self._lock:
+            totals = self.totals.get(name)
+            if totals is None:
+                totals = self.totals[name] = [0, 0, 0]
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] += duration - child_ns
+            if self.chrome_trace:
+                self.events.append(record)
+            if self.path:
+                self.buffer.append(record)
+                if len(self.buffer) >= FLUSH_EVERY:
+                    self._flush()
+
+    def _flush(self):
+        lines = ''.join(json.dumps(r, default=str) + '\n' for r in self.buffer)
+        self.buffer = []
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def flush(self):
+        with self._lock:
+            if self.path and self.buffer:
+                self._flush()
+
+    def write_chrome_trace(self, path):
+        """Chrome trace-event JSON: one complete ("X") event per span, threads named"""
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in self.threads.items()]
+        for r in self.events:
+            events.append({'name': r['name'], 'cat': r['name'].split('.', 1)[0], 'ph': 'X', 'pid': pid,
+                           'tid': r['thread'], 'ts': r['start_us'], 'dur': r['dur_us'], 'args': r.get('attrs') or {}})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+    def summary(self, wall_ns=None):
+        """Per span name: count, total and self seconds, and self time as a share of `wall_ns`"""
+        wall_ns = wall_ns or (time.perf_counter_ns() - self.origin)
+        with self._lock:
+            rows = [(name, count, total / 1e9, own / 1e9, own / wall_ns if wall_ns else 0.0)
+                    for name, (count, total, own) in self.totals.items()]
+        return sorted(rows, key=lambda row: -row[3])
+
+def format_summary(rows, wall_sec):
+    """The run summary table: where the wall time went, heaviest stages first"""
+    lines = [f"Trace summary (wall {wall_sec:.2f}s; self time excludes nested spans, threads overlap):",
+             f"  {'stage':<28} {'count':>7} {'total s':>9} {'self s':>9} {'self %':>7}"]
+    traced = 0.0
+    for name, count, total, own, share in rows:
+        lines.append(f"  {name:<28} {count:>7} {total:>9.3f} {own:>9.3f} {share:>6.1%}")
+        traced += own
+    if wall_sec > traced:
+        lines.append(f"  {'(untraced)':<28} {'':>7} {'':>9} {wall_sec - traced:>9.3f} "
+                     f"{(wall_sec - traced) / wall_sec:>6.1%}")
+    return '\n'.join(lines)
+
+_tracer = None
+
+def span(name, label=None, **attrs):
+    """
+    Time a stage: `with span('wait', step): ...`. The label is appended to the
+    name ("wait.easy_apply_button"). Returns a shared no-op while tracing is off.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.span(name, label, attrs)
+
+def now():
+    """Timestamp for record()"""
+    return time.perf_counter_ns()
+
+def record(name, start, **attrs):
+    """Record a stage that ran from `start` (a now() value) until now, e.g. one that ran before tracing was configured"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.add(name, start, time.perf_counter_ns(), attrs or None)
+
+def enabled():
+    return _tracer is not None
+
+def configure_tracing(config, origin=None):
+    """
+    Start tracing from config 'tracing': true (spans to trace.jsonl), or e.g.
+    {"file": "trace.jsonl", "chrome_trace": "trace.json", "summary": true}.
+    `origin` (a now() value) backdates the trace start to include record()ed
+    earlier stages. Off by default; returns the Tracer or None.
+    """
+    global _tracer
+    options = config.get('tracing')
+    if not options:
+        return None
+    if options is True:
+        options = {}
+    finish_tracing()
+    _tracer = Tracer(options.get('file', TRACE_FILE), options.get('chrome_trace'), options.get('summary', True), origin)
+    atexit.register(finish_tracing)
+    logger.info(f"Tracing to {_tracer.path or '(no JSONL file)'}"
+                f"{', Chrome trace ' + _tracer.chrome_trace if _tracer.chrome_trace else ''}")
+    return _tracer
+
+def finish_tracing(wall_ns=None):
+    """Stop tracing: write the JSONL buffer and Chrome trace, log the summary; returns the summary text"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return None
+    atexit.unregister(finish_tracing)
+    tracer.flush()
+    if tracer.chrome_trace:
+        tracer.write_chrome_trace(tracer.chrome_trace)
+    wall_ns = wall_ns or (time.perf_counter_ns() - tracer.origin)
+    text = format_summary(tracer.summary(wall_ns), wall_ns / 1e9)
+    if tracer.show_summary:
+        logger.info(text)
+    return text
@@ -74,41 +74,50 @@ def check_config_file():
             config = json.load(f)
         print(f"   {Colors.GREEN}✓ config.json is valid JSON{Colors.RESET}")
         
-        # Check required fields
-        required_fields = ['job_portal', 'filters', 'resume_path']
-        missing = [f for f in required_fields if f not in config]
-        
-        if missing:
-            print(f"   {Colors.RED}✗ Missing fields: {', '.join(missing)}{Colors.RESET}\n")
+        # The same schema run.py loads the config with (config.py)
+        from config import validate_config
+        problems, warnings = validate_config(config)
+        for warning in warnings:
+            print(f"   {Colors.YELLOW}⚠ {warning}{Colors.RESET}")
+        if problems:
+            for problem in problems:
+                print(f"   {Colors.RED}✗ {problem}{Colors.RESET}")
+            print()
             return False
         else:
-            print(f"   {Colors.GREEN}✓ All required fields present{Colors.RESET}\n")
+            print(f"   {Colors.GREEN}✓ All fields valid{Colors.RESET}\n")
             return True
     except json.JSONDecodeError as e:
         print(f"   {Colors.RED}✗ Invalid JSON: {str(e)}{Colors.RESET}\n")
         return False
 
 def check_resume_file():
-    """Check if resume file exists"""
+    """Check the resume files (resume_path and any 'resumes' variants) as the upload step will"""
     print("4. Checking resume file...")
     
     try:
+        from resume_staging import resume_max_bytes, resume_variants, validate_resume
         with open('config.json', 'r') as f:
             config = json.load(f)
         
-        resume_path = config.get('resume_path', '')
-        if not resume_path:
+        variants = resume_variants(config)
+        if not variants:
             print(f"   {Colors.YELLOW}⚠ resume_path not configured{Colors.RESET}\n")
             return True
         
-        resume_file = Path(resume_path)
-        if resume_file.exists():
-            print(f"   {Colors.GREEN}✓ Resume found: {resume_path}{Colors.RESET}\n")
-            return True
-        else:
-            print(f"   {Colors.YELLOW}⚠ Resume not found: {resume_path}{Colors.RESET}")
-            print(f"   {Colors.YELLOW}   Place your resume in the resume/ folder{Colors.RESET}\n")
-            return False
+        max_bytes = resume_max_bytes(config)
+        all_ok = True
+        for variant in variants:
+            problems = validate_resume(variant['path'], max_bytes)
+            if not problems:
+                print(f"   {Colors.GREEN}✓ Resume found: {variant['path']}{Colors.RESET}")
+            else:
+                print(f"   {Colors.YELLOW}⚠ Resume {variant['path']}: {'; '.join(problems)}{Colors.RESET}")
+                if 'file not found' in problems:
+                    print(f"   {Colors.YELLOW}   Place your resume in the resume/ folder{Colors.RESET}")
+                all_ok = False
+        print()
+        return all_ok
     except Exception as e:
         print(f"   {Colors.RED}✗ Error checking resume: {str(e)}{Colors.RESET}\n")
         return False
@@ -138,6 +147,7 @@ def check_required_files():
         'apply_jobs.py',
         'logger.py',
         'run.py',
+        'cli.py',
         'requirements.txt'
     ]
     
@@ -152,6 +162,28 @@ def check_required_files():
     print()
     return all_ok
 
+def check_offline_replay():
+    """Run search and apply end-to-end against the recorded pages in benchmarks/fixtures"""
+    print("7. Replaying search and apply offline...")
+    try:
+        import logging
+        from benchmarks.replay import SCENARIOS, replay
+        logging.disable(logging.WARNING)
+        all_ok = True
+        for name in sorted(SCENARIOS):
+            metrics = replay(name, latency=0.0)
+            ok = metrics['jobs'] > 0 and metrics['statuses']['success'] == metrics['jobs']
+            all_ok = all_ok and ok
+            mark = f"{Colors.GREEN}✓" if ok else f"{Colors.RED}✗"
+            print(f"   {mark} {name}: {metrics['statuses']['success']}/{metrics['jobs']} applied, "
+                  f"{metrics['jobs_per_sec']:.0f} jobs/s{Colors.RESET}")
+        logging.disable(logging.NOTSET)
+    except Exception as e:
+        print(f"   {Colors.RED}✗ Replay failed: {e}{Colors.RESET}")
+        all_ok = False
+    print()
+    return all_ok
+
 def print_summary(results):
     """Print validation summary"""
     total = len(results)
@@ -184,7 +216,8 @@ def main():
         'Config File': check_config_file(),
         'Resume File': check_resume_file(),
         'Resume Folder': check_resume_folder(),
-        'Required Files': check_required_files()
+        'Required Files': check_required_files(),
+        'Offline Replay': check_offline_replay()
     }
     
     success = print_summary(results)
@@ -0,0 +1,170 @@
+# waits.py - Readiness waits on concrete page conditions, human-like jitter and wait metrics
+import time, random, logging
+from collections import defaultdict
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selector_stats import get_selector_stats
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SEC = 10
+OPTIONAL_TIMEOUT_SEC = 3  # for elements that may legitimately be absent (e.g. Easy Apply)
+POLL_SEC = 0.2
+
+# Idle time per pause kind when config has no 'jitter_sec'
+DEFAULT_JITTER_SEC = {'default': [0.5, 2.0], 'after_submit': [1.0, 3.0]}
+
+class WaitMetrics:
+    """Per-step time spent waiting on the page ('wait') versus deliberate jitter ('idle')"""
+
+    def __init__(self):
+        self.steps = defaultdict(lambda: {'wait': 0.0, 'idle': 0.0, 'timeouts': 0})
+
+    def add(self, step, kind, seconds, timed_out=False):
+        entry = self.steps[step]
+        entry[kind] += seconds
+        if timed_out:
+            entry['timeouts'] += 1
+
+    def merge(self, other):
+        for step, entry in other.steps.items():
+            for key, value in entry.items():
+                self.steps[step][key] += value
+
+    def totals(self):
+        return {
+            'wait': sum(e['wait'] for e in self.steps.values()),
+            'idle': sum(e['idle'] for e in self.steps.values()),
+        }
+
+    def format(self):
+        totals = self.totals()
+        parts = [f"{step} {e['wait']:.1f}s wait/{e['idle']:.1f}s idle" + (f" ({e['timeouts']} timeouts)" if e['timeouts'] else '')
+                 for step, e in self.steps.items()]
+        return f"waiting {totals['wait']:.1f}s, idle {totals['idle']:.1f}s [" + ', '.join(parts) + ']'
+
+class JitterPolicy:
+    """
+    Human-like pauses, kept separate from synchronization.
+    `ranges` maps a pause kind to [min, max] seconds; unknown kinds use 'default'.
+    `scale` stretches or shrinks every pause (set by scheduler.AdaptiveScheduler).
+    """
+
+    def __init__(self, ranges=None, sleep=time.sleep):
+        self.ranges = dict(DEFAULT_JITTER_SEC)
+        self.ranges.update(ranges or {})
+        self.sleep = sleep
+        self.scale = 1.0
+
+    @classmethod
+    def from_config(cls, config):
+        ranges = config.get('jitter_sec')
+        if ranges is None and config.get('delay_range_sec'):
+            ranges = {'default': config['delay_range_sec']}  # older configs
+        return cls(ranges)
+
+    def duration(self, kind='default'):
+        low, high = self.ranges.get(kind) or self.ranges['default']
+        return random.uniform(low, high) * self.scale
+
+    def pause(self, kind='default'):
+        t = self.duration(kind)
+        if t > 0:
+            self.sleep(t)
+        return t
+
+def find_first(driver, locators, require_clickable=False, stats=None, group='default'):
+    """
+    Return the first element matched by any locator; invalid locators are skipped.
+    With `stats` (a selector_stats.SelectorStats) the locators are tried in learned
+    order, quarantined ones not at all, and every try is recorded under `group`.
+    """
+    if stats is not None:
+        return stats.find_first(driver, locators, require_clickable, group)
+    for by, value in locators:
+        try:
+            for element in driver.find_elements(by, value):
+                if not require_clickable or (element.is_displayed() and element.is_enabled()):
+                    return element
+        except WebDriverException:
+            continue
+    return None
+
+def css(*selectors):
+    """Build a locator list from CSS selectors"""
+    return [(By.CSS_SELECTOR, s) for s in selectors]
+
+class Readiness:
+    """
+    Waits on concrete conditions for one driver, recording time per step into `metrics`.
+    Element lookups go through the selector registry (config 'selector_stats'), with
+    the step name as the selector group. A wait polls its lookups many times but
+    records them once, when it ends: the last poll's outcome per group (the winning
+    selector's hit, or a miss per selector after a timeout), so selector health does
+    not track page-load time or timeout length.
+    """
+
+    def __init__(self, driver, config, metrics=None, jitter=None):
+        self.driver = driver
+        self.timeout = config.get('wait_timeout_sec', DEFAULT_TIMEOUT_SEC)
+        self.optional_timeout = config.get('optional_wait_timeout_sec', OPTIONAL_TIMEOUT_SEC)
+        self.poll = config.get('wait_poll_sec', POLL_SEC)
+        self.metrics = metrics if metrics is not None else WaitMetrics()
+        # A config.Config carries its pause distributions ready-made
+        self.jitter = jitter or getattr(config, 'jitter', None) or JitterPolicy.from_config(config)
+        self.stats = get_selector_stats(config)
+        self._tries = None  # during a wait: group -> its last lookup's outcomes
+
+    def find(self, driver, group, locators, require_clickable=False):
+        if self.stats is None or self._tries is None:
+            return find_first(driver, locators, require_clickable, stats=self.stats, group=group)
+        tries = self._tries[group] = {}
+        return self.stats.find_first(driver, locators, require_clickable, group, tries=tries)
+
+    def until(self, step, condition, timeout=None):
+        """Wait until condition(driver) is truthy; returns its value, or None on timeout"""
+        # Imported here: selenium.webdriver.support.ui loads the whole remote WebDriver (~0.3 s)
+        from selenium.webdriver.support.ui import WebDriverWait
+        start = time.monotonic()
+        outer, self._tries = self._tries, {}
+        try:
+            with span('wait', step):
+                result = WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll).until(condition)
+            self.metrics.add(step, 'wait', time.monotonic() - start)
+            return result
+        except TimeoutException:
+            self.metrics.add(step, 'wait', time.monotonic() - start, timed_out=True)
+            logger.debug(f"Timed out waiting for {step}")
+            return None
+        finally:
+            tries, self._tries = self._tries, outer
+            for group, outcomes in tries.items():
+                self.stats.record_tries(group, outcomes)
+
+    def page_loaded(self, step='page_load', locators=None, timeout=None):
+        """Document no longer loading and (optionally) one of `locators` present"""
+        def condition(driver):
+            if driver.execute_script('return document.readyState') == 'loading':
+                return False
+            return True if not locators else self.find(driver, step, locators)
+        return self.until(step, condition, timeout)
+
+    def present(self, step, locators, timeout=None):
+        return self.until(step, lambda d: self.find(d, step, locators), timeout)
+
+    def clickable(self, step, locators, timeout=None):
+        return self.until(step, lambda d: self.find(d, step, locators, require_clickable=True), timeout)
+
+    def upload_accepted(self, step, upload_input, filename, confirm_locators=(), timeout=None):
+        """The file input holds `filename`, or the page shows an uploaded-file confirmation"""
+        def condition(driver):
+            if filename in (upload_input.get_attribute('value') or ''):
+                return True
+            return self.find(driver, step, confirm_locators) if confirm_locators else False
+        return self.until(step, condition, timeout)
+
+    def pause(self, step, kind='default'):
+        """Deliberate human-like jitter, recorded as idle time"""
+        with span('sleep', step):
+            self.metrics.add(step, 'idle', self.jitter.pause(kind))
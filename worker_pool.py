@@ -0,0 +1,192 @@
+# worker_pool.py - Apply to jobs from a shared queue with several browser sessions
+import logging, os, queue, threading
+from apply_jobs import apply_to_job
+from config import reload_config
+from portals import configured_portals, portal_key
+from scheduler import AdaptiveScheduler
+
+logger = logging.getLogger(__name__)
+
+PROFILES_DIR = 'profiles'
+_STOP = object()  # queue sentinel
+
+class WorkerPool:
+    """
+    Browser sessions pulling jobs from a shared queue per portal.
+    `drivers` is a list of browsers logged into one portal, or a dict of portal ->
+    such a list; each job goes to the workers of its own portal (the first portal's
+    when its portal has none). Each worker is paced as its own session by its
+    portal's scheduler.AdaptiveScheduler (which also enforces the per-portal rate),
+    while the global `max_applications` cap and the `results` counters are shared
+    under a lock. A `scheduler` given here paces every portal.
+    """
+
+    def __init__(self, drivers, config, max_applications=None, index=None, on_result=None, scheduler=None):
+        if not isinstance(drivers, dict):
+            drivers = {None: drivers}  # all jobs to these; the scheduler is named after config "job_portal"
+        self.drivers = {portal_key(portal): list(browsers) for portal, browsers in drivers.items()}
+        self.default_portal = next(iter(self.drivers))
+        self.config = config
+        self.max_applications = max_applications
+        self.index = index
+        self.on_result = on_result
+        self.schedulers = {key: scheduler or AdaptiveScheduler(config, portal=portal)
+                           for key, portal in zip(self.drivers, drivers)}
+        self.results = {'success': 0, 'failed': 0, 'manual_required': 0, 'partial': 0}
+        self.attempted = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        # Bounded, so a lazy search is only pulled a little ahead of the workers
+        self._queues = {key: queue.Queue(maxsize=len(browsers) * 2) for key, browsers in self.drivers.items()}
+
+    def _portal(self, job):
+        key = portal_key(job.get('portal'))
+        return key if key in self.drivers else self.default_portal
+
+    def _reserve_slot(self):
+        """Claim one application under the global cap; False once the cap is reached"""
+        with self._lock:
+            if self.max_applications and self.attempted >= self.max_applications:
+                self._done.set()
+                return False
+            self.attempted += 1
+            return True
+
+    def _record(self, status):
+        with self._lock:
+            if status in self.results:
+                self.results[status] += 1
+
+    def _worker(self, worker_id, driver, portal):
+        jobs = self._queues[portal]
+        pace = self.schedulers[portal]
+        while True:
+            job = jobs.get()
+            if job is _STOP:
+                break
+            if self._done.is_set():
+                continue  # drain the queue so the producer is never blocked
+            if self.index is not None and self.index.is_done(job):
+                with self._lock:
+                    self.skipped += 1
+                if self.on_result:
+                    self.on_result(job, 'skipped')
+                continue
+            if not self._reserve_slot():
+                continue
+
+            reload_config(self.config)
+            pace.wait(worker_id)
+            logger.info(f"[worker {worker_id}] Applying: {job.get('title')} at {job.get('company')}")
+            signals = {}
+            try:
+                status = apply_to_job(driver, job, self.config, index=self.index, jitter=pace.jitter,
+                                      signals=signals)
+            except Exception as e:
+                logger.error(f"[worker {worker_id}] Browser session failed: {e}")
+                self._record('failed')
+                pace.record(worker_id, 'failed')
+                if self.on_result:
+                    self.on_result(job, 'failed')
+                break
+            pace.after_job(worker_id, status, signals=signals)
+            self._record(status)
+            if self.on_result:
+                self.on_result(job, status)
+        logger.info(f"[worker {worker_id}] Finished")
+
+    def run(self, jobs):
+        """Feed `jobs` (list or generator) to the workers and wait for them; returns results"""
+        threads = {portal: [] for portal in self.drivers}
+        worker_id = 0
+        for portal, browsers in self.drivers.items():
+            for driver in browsers:
+                worker_id += 1
+                threads[portal].append(threading.Thread(target=self._worker, args=(worker_id, driver, portal),
+                                                        name=f'apply-worker-{worker_id}', daemon=True))
+        everyone = [t for portal_threads in threads.values() for t in portal_threads]
+        for t in everyone:
+            t.start()
+        try:
+            for job in jobs:
+                portal = self._portal(job)
+                while not self._put(portal, job):
+                    if self._stopped(threads[portal]):
+                        logger.warning(f"No {portal} worker left; skipping {job.get('title')} at {job.get('company')}")
+                        break
+                if self._stopped(everyone):
+                    break
+        finally:
+            for portal, portal_threads in threads.items():
+                for _ in portal_threads:
+                    while not self._put(portal, _STOP) and any(t.is_alive() for t in portal_threads):
+                        pass
+            for t in everyone:
+                t.join()
+        logger.info(f"Worker pool finished: {self.attempted} attempted, {self.skipped} skipped; "
+                    + '; '.join(f"pace ({pace.portal}) {pace.format()}" for pace in dict.fromkeys(self.schedulers.values())))
+        return self.results
+
+    def _stopped(self, threads):
+        return self._done.is_set() or not any(t.is_alive() for t in threads)
+
+    def _put(self, portal, item):
+        try:
+            self._queues[portal].put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            return False
+
+def start_worker_drivers(portal, config, workers, driver_factory, profiles_dir=PROFILES_DIR, suffix=''):
+    """Start one browser per worker, each with its own profile (worker-N`suffix`) so its login is reused"""
+    drivers = []
+    try:
+        for i in range(1, workers + 1):
+            profile_dir = os.path.join(profiles_dir, f'worker-{i}{suffix}')
+            drivers.append(driver_factory(portal, config, profile_dir=profile_dir))
+    except Exception:
+        for driver in drivers:
+            driver.quit()
+        raise
+    return drivers
+
+def start_portal_workers(config, workers, driver_factory, profiles_dir=PROFILES_DIR):
+    """
+    `workers` browsers for every configured portal, as {portal: [drivers]}, each
+    logged into its own portal. The first portal keeps the worker-N profiles,
+    the others use worker-N-<portal> (as run.open_browsers names its sessions).
+    """
+    drivers = {}
+    try:
+        for n, portal in enumerate(configured_portals(config)):
+            drivers[portal] = start_worker_drivers(portal, config, workers, driver_factory, profiles_dir,
+                                                   suffix=f'-{portal_key(portal)}' if n else '')
+    except Exception:
+        quit_drivers(drivers)
+        raise
+    return drivers
+
+def quit_drivers(drivers):
+    for browsers in drivers.values():
+        for driver in browsers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.debug(f"Error closing worker browser: {e}")
+
+def apply_with_worker_pool(jobs, config, workers, driver_factory=None, max_applications=None, index=None,
+                           on_result=None):
+    """
+    Apply to `jobs` using `workers` browser sessions per configured portal.
+    `driver_factory(portal, config, profile_dir=...)` defaults to
+    scraper.login_and_prepare_driver; inject a fake to run without a browser.
+    """
+    if driver_factory is None:
+        from scraper import login_and_prepare_driver as driver_factory
+    drivers = start_portal_workers(config, workers, driver_factory, config.get('profiles_dir', PROFILES_DIR))
+    try:
+        return WorkerPool(drivers, config, max_applications=max_applications, index=index,
+                          on_result=on_result).run(jobs)
+    finally:
+        quit_drivers(drivers)